@@ -0,0 +1,90 @@
+"""Compares the throughput and latency of the single order endpoint in the sync (threadpool)
+and async (event loop) modes under concurrent load. A server is started for each mode with
+the ASYNC_ENDPOINTS setting, and the same requests are sent to both.
+
+Run from the src folder with ```python3 -m benchmarks.bench_endpoint_modes```
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import httpx
+
+ORDER = {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-19T15:00:01Z"}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, async_endpoints: bool) -> subprocess.Popen:
+    """Starts the app with uvicorn and waits until it accepts connections.
+    """
+    environment = dict(os.environ, ASYNC_ENDPOINTS=str(async_endpoints).lower())
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+                              env=environment)
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("The server did not start.")
+
+
+async def run_load(url: str, requests: int, concurrency: int) -> tuple:
+    """Sends the requests with the given amount of concurrent clients.
+
+    Returns:
+        tuple: The elapsed seconds and the latencies of the requests in seconds.
+    """
+    latencies = []
+    remaining = iter(range(requests))
+
+    async def worker(client: httpx.AsyncClient):
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.post(url, json=ORDER)
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits) as client:
+        await client.post(url, json=ORDER)
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        return time.perf_counter() - started, latencies
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    arguments = parser.parse_args()
+
+    for async_endpoints in (False, True):
+        port = free_port()
+        server = start_server(port=port, async_endpoints=async_endpoints)
+        try:
+            elapsed, latencies = asyncio.run(run_load(url=f"http://127.0.0.1:{port}/", requests=arguments.requests,
+                                                      concurrency=arguments.concurrency))
+        finally:
+            server.terminate()
+            server.wait()
+        print(f"{'async' if async_endpoints else 'sync':5}: {arguments.requests / elapsed:8.0f} requests/s, "
+              f"p50 {percentile(latencies, 0.5) * 1000:.2f} ms, p99 {percentile(latencies, 0.99) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
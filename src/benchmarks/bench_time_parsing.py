@@ -0,0 +1,43 @@
+"""Compares parsing the request time once with parse_time to the previous path,
+where the validator parsed it with datetime.strptime and the calculator parsed it
+again with dateutil.
+
+Run from the src folder with ```python3 -m benchmarks.bench_time_parsing```
+"""
+import datetime
+import timeit
+from dateutil.parser import parse
+from services.time_parser import parse_time
+
+TIME = "2024-01-19T15:00:01Z"
+REPEAT = 5
+NUMBER = 20000
+
+
+def two_parse_path(time: str) -> tuple:
+    datetime.datetime.strptime(time, "%Y-%m-%dT%H:%M:%SZ")
+    parsed = parse(time)
+    return parsed.weekday(), parsed.time()
+
+
+def single_parse_path(time: str) -> tuple:
+    return parse_time(time)
+
+
+def best_time_per_call(function) -> float:
+    """The best time of REPEAT rounds, in microseconds per call.
+    """
+    timer = timeit.Timer(lambda: function(TIME))
+    return min(timer.repeat(repeat=REPEAT, number=NUMBER)) / NUMBER * 1e6
+
+
+def main():
+    two_parse = best_time_per_call(two_parse_path)
+    single_parse = best_time_per_call(single_parse_path)
+    print(f"strptime + dateutil: {two_parse:.2f} us per request")
+    print(f"parse_time:          {single_parse:.2f} us per request")
+    print(f"speedup:             {two_parse / single_parse:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
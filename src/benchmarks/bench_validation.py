@@ -0,0 +1,47 @@
+"""Compares the per request validation cost of the single pass parse_delivery_request to the previous path,
+where the request was checked field by field by DeliveryRequestValidator, with the time checked by
+datetime.strptime, and then validated again by constructing an OrderModel.
+
+Run from the src folder with ```python3 -m benchmarks.bench_validation```
+"""
+import datetime
+import timeit
+from models.order_model import OrderModel
+from services.request_validator import DeliveryRequestValidator
+
+DELIVERY = {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-19T15:00:01Z"}
+REPEAT = 5
+NUMBER = 20000
+
+validator = DeliveryRequestValidator()
+
+
+def validator_and_model_path(delivery: dict) -> OrderModel:
+    validator.valid_cart_value(delivery["cart_value"])
+    validator.valid_delivery_distance(delivery["delivery_distance"])
+    validator.valid_number_of_items(delivery["number_of_items"])
+    datetime.datetime.strptime(delivery["time"], "%Y-%m-%dT%H:%M:%SZ")
+    return OrderModel(**delivery)
+
+
+def single_pass_path(delivery: dict) -> tuple:
+    return validator.parse_delivery_request(delivery_request=delivery)
+
+
+def best_time_per_call(function) -> float:
+    """The best time of REPEAT rounds, in microseconds per call.
+    """
+    timer = timeit.Timer(lambda: function(DELIVERY))
+    return min(timer.repeat(repeat=REPEAT, number=NUMBER)) / NUMBER * 1e6
+
+
+def main():
+    validator_and_model = best_time_per_call(validator_and_model_path)
+    single_pass = best_time_per_call(single_pass_path)
+    print(f"field checks + OrderModel:   {validator_and_model:.2f} us per request")
+    print(f"parse_delivery_request:      {single_pass:.2f} us per request")
+    print(f"speedup:                     {validator_and_model / single_pass:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Load test that replays orders against a locally started server at a target rate.
+
+The orders are read from a JSONL file, one order object per line, or generated like in the benchmark
+suite. They are sent in order (from the start again if there are more requests than orders) to the
+single order endpoint at --rps requests per second, with at most --concurrency requests in flight.
+The latency of a request is measured from the moment it was scheduled to be sent, so requests that
+wait for a free slot count the wait too. Without --rps the requests are sent as fast as the
+concurrency allows.
+
+The server is started with the given amount of workers and endpoint mode, or an already running
+server is used with --url, so the same traffic can be compared between configurations, e.g.
+```python3 -m benchmarks.load_test --orders orders.jsonl --rps 2000 --workers 4```
+```python3 -m benchmarks.load_test --orders orders.jsonl --rps 2000 --workers 4 --async-endpoints```
+```python3 -m benchmarks.load_test --orders orders.jsonl --rps 2000 --workers 4 --micro-batch-size 64```
+
+Run from the src folder.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+import httpx
+from benchmarks.bench_endpoint_modes import free_port, percentile
+from benchmarks.orders import generate_orders
+
+SRC_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_orders(path: str) -> list:
+    """Reads the orders of a JSONL file, skipping the empty lines.
+    """
+    with open(path) as orders_file:
+        return [json.loads(line) for line in orders_file if line.strip()]
+
+
+def start_server(port: int, workers: int, async_endpoints: bool, micro_batch_size: int = 0,
+                 micro_batch_wait: int = 200) -> subprocess.Popen:
+    """Starts the server like in production, with main.py, and waits until it accepts connections.
+    """
+    environment = dict(os.environ, HOST="127.0.0.1", PORT=str(port), WORKERS=str(workers),
+                       ASYNC_ENDPOINTS=str(async_endpoints).lower(), MICRO_BATCH_SIZE=str(micro_batch_size),
+                       MICRO_BATCH_WAIT=str(micro_batch_wait))
+    server = subprocess.Popen([sys.executable, "main.py"], cwd=SRC_PATH, env=environment,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/docs", timeout=0.1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("The server did not start.")
+
+
+async def replay(url: str, orders: list, requests: int, rps: float, concurrency: int,
+                 transport: httpx.AsyncBaseTransport | None = None) -> dict:
+    """Sends the requests and collects the results.
+
+    Args:
+        url: The URL of the single order endpoint.
+        orders: The orders sent in turn.
+        requests: The amount of requests.
+        rps: The target requests per second, 0 sends them as fast as the concurrency allows.
+        concurrency: The maximum amount of requests in flight.
+        transport: The httpx transport, e.g. an ASGITransport to call the app without a server.
+
+    Returns:
+        dict: The amount of requests, the elapsed seconds, the achieved throughput, the response statuses,
+        the error rate and the latency percentiles in milliseconds.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = Counter()
+
+    async def send(client: httpx.AsyncClient, order, scheduled: float | None):
+        async with semaphore:
+            if scheduled is None:
+                scheduled = time.perf_counter()
+            try:
+                response = await client.post(url, json=order)
+            except httpx.HTTPError:
+                statuses["failed"] += 1
+                return
+            latencies.append(time.perf_counter() - scheduled)
+            statuses[response.status_code] += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30, transport=transport) as client:
+        tasks = []
+        started = time.perf_counter()
+        for index in range(requests):
+            scheduled = None
+            if rps:
+                scheduled = started + index / rps
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(client, orders[index % len(orders)], scheduled)))
+            if not rps and len(tasks) >= concurrency * 4:
+                # Without a target rate, only a few requests per slot are queued at a time.
+                await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                tasks = [task for task in tasks if not task.done()]
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    errors = sum(count for status, count in statuses.items() if status != 200)
+    result = {"requests": requests, "elapsed": elapsed, "throughput": sum(statuses.values()) / elapsed,
+              "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+              "error_rate": errors / requests if requests else 0.0}
+    for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("max", 1.0)):
+        result[f"{name}_ms"] = percentile(latencies, fraction) * 1000 if latencies else 0.0
+    return result
+
+
+def format_result(result: dict) -> str:
+    statuses = ", ".join(f"{status}: {count}" for status, count in result["statuses"].items())
+    return (f"{result['requests']} requests in {result['elapsed']:.2f} s, {result['throughput']:.0f} requests/s\n"
+            f"latency p50 {result['p50_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms, "
+            f"max {result['max_ms']:.2f} ms\n"
+            f"error rate {result['error_rate']:.2%} ({statuses})")
+
+
+def main(arguments: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", default="", help="JSONL file of orders, generated orders by default.")
+    parser.add_argument("--requests", type=int, default=0, help="The amount of requests, one per order by default.")
+    parser.add_argument("--rps", type=float, default=0, help="The target requests per second, 0 for no limit.")
+    parser.add_argument("--concurrency", type=int, default=64, help="The maximum amount of requests in flight.")
+    parser.add_argument("--workers", type=int, default=1, help="The amount of server worker processes.")
+    parser.add_argument("--async-endpoints", action="store_true", help="Runs the server with ASYNC_ENDPOINTS.")
+    parser.add_argument("--micro-batch-size", type=int, default=0, help="Runs the server with MICRO_BATCH_SIZE.")
+    parser.add_argument("--micro-batch-wait", type=int, default=200, help="Runs the server with MICRO_BATCH_WAIT.")
+    parser.add_argument("--url", default="", help="The URL of an already running server instead of starting one.")
+    parser.add_argument("--json", default="", help="Also writes the result to this JSON file.")
+    parsed_arguments = parser.parse_args(arguments)
+
+    orders = load_orders(parsed_arguments.orders) if parsed_arguments.orders else generate_orders(count=10000)
+    if not orders:
+        print("There are no orders to send.")
+        return 1
+    requests = parsed_arguments.requests or len(orders)
+
+    server = None
+    url = parsed_arguments.url
+    if not url:
+        port = free_port()
+        server = start_server(port=port, workers=max(parsed_arguments.workers, 1),
+                              async_endpoints=parsed_arguments.async_endpoints,
+                              micro_batch_size=parsed_arguments.micro_batch_size,
+                              micro_batch_wait=parsed_arguments.micro_batch_wait)
+        url = f"http://127.0.0.1:{port}/"
+    try:
+        result = asyncio.run(replay(url=url, orders=orders, requests=requests, rps=parsed_arguments.rps,
+                                    concurrency=max(parsed_arguments.concurrency, 1)))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(format_result(result))
+    if parsed_arguments.json:
+        with open(parsed_arguments.json, "w") as result_file:
+            json.dump({**vars(parsed_arguments), **result}, result_file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,41 @@
+"""Generates a reproducible set of orders with a realistic mix of values for the benchmarks.
+
+Most carts are between 5€ and 40€, with a few small orders under the minimum cart value and a few
+free deliveries over 200€. Most deliveries are within a few kilometres, and most orders have a few
+items with a long tail of bulk orders. The order times are spread over a week, with more orders
+around lunch and dinner and on Friday afternoon rush hours. A small share of the orders is not valid.
+"""
+import random
+from datetime import datetime, timedelta
+
+WEEK_START = datetime(2024, 1, 15)
+INVALID_ORDERS = (
+    {"cart_value": -1, "delivery_distance": 1000, "number_of_items": 1, "time": "2024-01-15T12:00:00Z"},
+    {"cart_value": 1000, "delivery_distance": "far", "number_of_items": 1, "time": "2024-01-15T12:00:00Z"},
+    {"cart_value": 1000, "delivery_distance": 1000, "number_of_items": 0, "time": "2024-01-15T12:00:00Z"},
+    {"cart_value": 1000, "delivery_distance": 1000, "number_of_items": 1, "time": "2024-01-15 12:00:00"},
+    {"cart_value": 1000, "delivery_distance": 1000, "number_of_items": 1},
+)
+
+
+def generate_order(generator: random.Random) -> dict:
+    cart_value = int(generator.lognormvariate(7.4, 0.6))
+    if generator.random() < 0.02:
+        cart_value = generator.randrange(20000, 40000)
+    delivery_distance = min(int(generator.lognormvariate(7.5, 0.6)), 30000)
+    number_of_items = min(1 + int(generator.expovariate(1 / 3)), 60)
+
+    day = generator.choices(range(7), weights=(13, 13, 13, 14, 19, 16, 12))[0]
+    hour = generator.choices(range(24), weights=(1, 1, 0, 0, 0, 0, 1, 2, 3, 4, 5, 8, 12, 10, 6, 7, 9, 12,
+                                                 13, 11, 8, 5, 3, 2))[0]
+    time = WEEK_START + timedelta(days=day, hours=hour, seconds=generator.randrange(3600))
+    return {"cart_value": cart_value, "delivery_distance": delivery_distance, "number_of_items": number_of_items,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%SZ")}
+
+
+def generate_orders(count: int, seed: int = 2024, invalid_share: float = 0.02) -> list:
+    """The same seed always generates the same orders.
+    """
+    generator = random.Random(seed)
+    return [dict(generator.choice(INVALID_ORDERS)) if generator.random() < invalid_share else generate_order(generator)
+            for _ in range(count)]
@@ -0,0 +1,125 @@
+"""Measures the cold start of a worker: the time to import the app and the modules it loads.
+
+Every run imports main in a new interpreter, like a new worker, in the production environment by
+default. The report has the fastest and the median import time of the runs, the amount of loaded
+modules and the slowest imports by their cumulative time (from ```python3 -X importtime```). With
+--server it also measures the time from starting ```python3 main.py``` until the server accepts
+connections. With --check it fails if the import is over the budget, or if a module that is not
+needed in production (e.g. test_config or uvicorn) was loaded by the import.
+
+Run from the src folder, e.g. ```python3 -m benchmarks.startup --runs 5 --check```
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from benchmarks.bench_endpoint_modes import free_port
+
+SRC_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_TIME_BUDGET = 2.0  # Seconds to import main.
+MODULE_COUNT_BUDGET = 450  # Modules loaded by importing main, including the interpreter's own.
+# Modules that importing main must not load: they are only needed by tests, the server process or bulk jobs.
+UNWANTED_MODULES = ("test_config", "uvicorn", "numpy", "dateutil", "multiprocessing")
+
+IMPORT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import main
+seconds = time.perf_counter() - started
+print(json.dumps({"seconds": seconds, "modules": sorted(sys.modules)}))
+"""
+
+
+def measure_import(environment: str = "dev", import_time: bool = False) -> dict:
+    """Imports main in a new interpreter.
+
+    Returns:
+        dict: The import time in seconds, the names of the loaded modules, and with import_time
+        the cumulative import time of every module in microseconds.
+    """
+    command = [sys.executable] + (["-X", "importtime"] if import_time else []) + ["-c", IMPORT_SCRIPT]
+    completed = subprocess.run(command, cwd=SRC_PATH, env=dict(os.environ, ENVIRONMENT=environment),
+                               capture_output=True, text=True, check=True)
+    result = json.loads(completed.stdout.splitlines()[-1])
+    if import_time:
+        cumulative_times = {}
+        for line in completed.stderr.splitlines():
+            fields = line.removeprefix("import time:").split("|")
+            if len(fields) == 3 and fields[1].strip().isdigit():
+                cumulative_times[fields[2].strip()] = int(fields[1])
+        result["cumulative_times"] = cumulative_times
+    return result
+
+
+def measure_server_startup(timeout: float = 30) -> float:
+    """Starts the server with one worker like in production and measures the seconds until it accepts connections.
+    """
+    port = free_port()
+    environment = dict(os.environ, HOST="127.0.0.1", PORT=str(port), WORKERS="1")
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "main.py"], cwd=SRC_PATH, env=environment,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("The server did not start.")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def check_budget(seconds: float, modules: list) -> list:
+    """The problems of an import of main against the budget.
+    """
+    problems = []
+    if seconds > IMPORT_TIME_BUDGET:
+        problems.append(f"Importing main took {seconds:.3f} s, the budget is {IMPORT_TIME_BUDGET} s.")
+    if len(modules) > MODULE_COUNT_BUDGET:
+        problems.append(f"Importing main loaded {len(modules)} modules, the budget is {MODULE_COUNT_BUDGET}.")
+    for name in UNWANTED_MODULES:
+        if name in modules:
+            problems.append(f"Importing main loaded {name}.")
+    return problems
+
+
+def main(arguments: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="The amount of imports to measure.")
+    parser.add_argument("--top", type=int, default=15, help="The amount of slowest imports to list.")
+    parser.add_argument("--environment", default="dev", help="The ENVIRONMENT of the imports.")
+    parser.add_argument("--server", action="store_true", help="Also measures the start of the server.")
+    parser.add_argument("--check", action="store_true", help="Fails if the import is over the budget.")
+    parsed_arguments = parser.parse_args(arguments)
+
+    results = [measure_import(environment=parsed_arguments.environment) for _ in range(max(parsed_arguments.runs, 1))]
+    seconds = [result["seconds"] for result in results]
+    modules = results[0]["modules"]
+    print(f"import main: best {min(seconds):.3f} s, median {statistics.median(seconds):.3f} s, "
+          f"{len(modules)} modules loaded")
+
+    cumulative_times = measure_import(environment=parsed_arguments.environment, import_time=True)["cumulative_times"]
+    print("Slowest imports (cumulative):")
+    for name, microseconds in sorted(cumulative_times.items(), key=lambda item: -item[1])[:parsed_arguments.top]:
+        print(f"  {microseconds / 1000:8.1f} ms  {name}")
+
+    if parsed_arguments.server:
+        print(f"Server accepts connections after {measure_server_startup():.3f} s")
+
+    if parsed_arguments.check:
+        problems = check_budget(min(seconds), modules)
+        for problem in problems:
+            print(problem)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,216 @@
+"""Benchmark suite for the fee calculation, the validation, the time parsing, the endpoints and the bulk paths.
+
+Every benchmark prices the same generated orders (see benchmarks/orders.py), and the throughput in orders
+per second is the best of a few rounds. The results can be saved as a baseline, and checked against it
+later: the check fails if the throughput of a benchmark has dropped more than the threshold.
+
+Run from the src folder, e.g.
+```python3 -m benchmarks.suite --save``` to save the baseline, and
+```python3 -m benchmarks.suite --check --threshold 0.2``` to check for regressions.
+"""
+import argparse
+import json
+import os
+import platform
+import time
+import numpy as np
+from fastapi.testclient import TestClient
+import config
+from benchmarks.orders import generate_orders
+from cli import price_chunk
+from main import app
+from services.fee_calculator import FeeCalculator
+from services.fee_policy import FeePolicy
+from services.order_pricer import price_order
+from services.request_validator import DeliveryRequestValidator
+from services.time_parser import parse_time
+from services.vectorized_fee_calculator import VectorizedFeeCalculator
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+BATCH_SIZE = 1000
+
+
+def build_benchmarks(orders: list, api_orders: int) -> dict:
+    """The benchmarks by name. Each one processes its orders once and returns the amount of orders.
+    """
+    validator = DeliveryRequestValidator()
+    calculator = FeeCalculator()
+    fee_policy = FeePolicy.from_config(config)
+    vectorized_calculator = VectorizedFeeCalculator()
+    client = TestClient(app)
+    parsed_orders = [order for _, order in map(validator.parse_delivery_request, orders) if order is not None]
+    valid_orders = [order for order in orders if validator.parse_delivery_request(order)[1] is not None]
+    columns = [np.array([order[field] for order in valid_orders])
+               for field in ("cart_value", "delivery_distance", "number_of_items", "time")]
+    lines = [json.dumps(order) + "\n" for order in orders]
+
+    def minimum_cart_value_surcharge():
+        for order in valid_orders:
+            calculator.calculate_minimum_cart_value_surcharge(cart_value=order["cart_value"],
+                                                              min_cart_value=config.MINIMUM_CART_VALUE)
+        return len(valid_orders)
+
+    def delivery_distance_surcharge():
+        for order in valid_orders:
+            calculator.calculate_delivery_distance_surcharge(
+                delivery_distance=order["delivery_distance"],
+                minimum_delivery_distance=config.MINIMUM_DELIVERY_DISTANCE,
+                minimum_delivery_fee=config.MINIMUM_DELIVERY_FEE,
+                delivery_fee_for_the_first_km=config.DELIVERY_FEE_FOR_THE_FIRST_KM,
+                additional_distance_after_first_km=config.ADDITIONAL_DISTANCE_AFTER_FIRST_KM,
+                delivery_fee_for_additional_distance=config.DELIVERY_FEE_FOR_ADDITIONAL_DISTANCE)
+        return len(valid_orders)
+
+    def number_of_items_surcharge():
+        for order in valid_orders:
+            calculator.calculate_number_of_items_surcharge(items_amount=order["number_of_items"],
+                                                           product_amount_for_surcharge=config.PRODUCT_AMOUNT_FOR_SURCHARGE,
+                                                           surcharge_fee=config.SURCHARGE_FEE,
+                                                           bulk_amount=config.BULK_AMOUNT,
+                                                           bulk_charge_fee=config.BULK_CHARGE_FEE)
+        return len(valid_orders)
+
+    def rush_hour_surcharge_multiplier():
+        for order in valid_orders:
+            calculator.calculate_rush_hour_surcharge_multiplier(time=order["time"], rush_hours=config.RUSH_HOURS)
+        return len(valid_orders)
+
+    def total_delivery_fee():
+        for order in valid_orders:
+            calculator.calculate_delivery_fee(order["cart_value"], order["delivery_distance"],
+                                              order["number_of_items"], order["time"])
+        return len(valid_orders)
+
+    def fee_policy_delivery_fee():
+        for order in parsed_orders:
+            fee_policy.calculate_delivery_fee_at(*order)
+        return len(parsed_orders)
+
+    def parse_delivery_request():
+        for order in orders:
+            validator.parse_delivery_request(delivery_request=order)
+        return len(orders)
+
+    def time_parsing():
+        for order in valid_orders:
+            parse_time(order["time"])
+        return len(valid_orders)
+
+    def bulk_price_order():
+        for order in orders:
+            price_order(validator=validator, fee_policy=fee_policy, delivery=order)
+        return len(orders)
+
+    def vectorized_delivery_fees():
+        vectorized_calculator.calculate_delivery_fees(*columns)
+        return len(valid_orders)
+
+    def cli_price_chunk():
+        price_chunk("jsonl", None, lines)
+        return len(lines)
+
+    def api_index():
+        for order in orders[:api_orders]:
+            client.post("/", json=order)
+        return min(len(orders), api_orders)
+
+    def api_batch():
+        for start in range(0, len(orders), BATCH_SIZE):
+            client.post("/batch", json=orders[start:start + BATCH_SIZE])
+        return len(orders)
+
+    return {
+        "fee_calculator.minimum_cart_value_surcharge": minimum_cart_value_surcharge,
+        "fee_calculator.delivery_distance_surcharge": delivery_distance_surcharge,
+        "fee_calculator.number_of_items_surcharge": number_of_items_surcharge,
+        "fee_calculator.rush_hour_surcharge_multiplier": rush_hour_surcharge_multiplier,
+        "fee_calculator.total_delivery_fee": total_delivery_fee,
+        "fee_policy.delivery_fee": fee_policy_delivery_fee,
+        "validator.parse_delivery_request": parse_delivery_request,
+        "time_parser.parse_time": time_parsing,
+        "bulk.price_order": bulk_price_order,
+        "bulk.vectorized_delivery_fees": vectorized_delivery_fees,
+        "bulk.cli_price_chunk": cli_price_chunk,
+        "api.index": api_index,
+        "api.batch": api_batch,
+    }
+
+
+def run_benchmark(benchmark, repeat: int) -> float:
+    """The best throughput of repeat rounds after a warm-up round, in orders per second.
+    """
+    benchmark()
+    best = 0.0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        orders = benchmark()
+        best = max(best, orders / (time.perf_counter() - started))
+    return best
+
+
+def find_regressions(results: dict, baseline: dict, threshold: float) -> list:
+    """The benchmarks whose throughput has dropped more than the threshold (e.g. 0.2 for 20 %) from the baseline.
+
+    Returns:
+        list: Tuples of the name, the baseline and the current throughput.
+    """
+    return [(name, baseline[name], throughput) for name, throughput in results.items()
+            if name in baseline and throughput < baseline[name] * (1 - threshold)]
+
+
+def main(arguments: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=20000, help="The amount of generated orders.")
+    parser.add_argument("--api-orders", type=int, default=2000,
+                        help="The amount of the orders sent one by one to the single order endpoint.")
+    parser.add_argument("--seed", type=int, default=2024, help="The seed of the generated orders.")
+    parser.add_argument("--repeat", type=int, default=5, help="The amount of rounds, the best one is reported.")
+    parser.add_argument("--only", default="", help="Runs only the benchmarks whose name contains this.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="The baseline file.")
+    parser.add_argument("--save", action="store_true", help="Saves the results as the baseline.")
+    parser.add_argument("--check", action="store_true", help="Fails if a benchmark is slower than the baseline.")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="The allowed drop of throughput from the baseline, 0.2 for 20 %%.")
+    parsed_arguments = parser.parse_args(arguments)
+
+    baseline = {}
+    if parsed_arguments.check:
+        if not os.path.exists(parsed_arguments.baseline):
+            print(f"There is no baseline in {parsed_arguments.baseline}, save one with --save first.")
+            return 1
+        with open(parsed_arguments.baseline) as baseline_file:
+            saved = json.load(baseline_file)
+        if (saved["orders"], saved["seed"]) != (parsed_arguments.orders, parsed_arguments.seed):
+            print(f"The baseline was run with {saved['orders']} orders and seed {saved['seed']}.")
+            return 1
+        baseline = saved["results"]
+
+    orders = generate_orders(count=parsed_arguments.orders, seed=parsed_arguments.seed)
+    benchmarks = build_benchmarks(orders=orders, api_orders=parsed_arguments.api_orders)
+    results = {}
+    for name, benchmark in benchmarks.items():
+        if parsed_arguments.only not in name:
+            continue
+        results[name] = run_benchmark(benchmark, repeat=max(parsed_arguments.repeat, 1))
+        change = f"  {results[name] / baseline[name] - 1:+.1%}" if name in baseline else ""
+        print(f"{name:<48} {results[name]:>14,.0f} orders/s{change}")
+
+    if parsed_arguments.save:
+        with open(parsed_arguments.baseline, "w") as baseline_file:
+            json.dump({"orders": parsed_arguments.orders, "seed": parsed_arguments.seed,
+                       "python": platform.python_version(), "machine": platform.machine(), "results": results},
+                      baseline_file, indent=2)
+        print(f"Saved the baseline to {parsed_arguments.baseline}")
+
+    if parsed_arguments.check:
+        regressions = find_regressions(results=results, baseline=baseline, threshold=parsed_arguments.threshold)
+        for name, baseline_throughput, throughput in regressions:
+            print(f"Regression in {name}: {throughput:,.0f} orders/s, baseline {baseline_throughput:,.0f} orders/s")
+        if regressions:
+            return 1
+        print(f"No benchmark is more than {parsed_arguments.threshold:.0%} slower than the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
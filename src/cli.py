@@ -0,0 +1,155 @@
+"""Command line tool for pricing order files without the HTTP server.
+
+Reads orders from a JSONL file (one order object per line) or a CSV file (with a header row
+including cart_value, delivery_distance, number_of_items and time), and writes every order
+with its delivery fee or error to the output file in the same format.
+
+Run from the src folder, e.g. ```python3 cli.py orders.jsonl priced.jsonl --workers 8```
+"""
+import argparse
+import csv
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from services.fee_policy import InvalidConfigException, get_fee_policies, get_fee_policy
+from services.order_pricer import INVALID_JSON_ERROR, ORDER_FIELDS, price_order
+from services.request_validator import DeliveryRequestValidator
+
+RESULT_FIELDS = ["delivery_fee", "error"]
+
+
+def file_format(path: str) -> str:
+    """The format of the file from its extension, csv or jsonl.
+    """
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def read_chunks(input_file, chunk_size: int):
+    """Yields the lines of the file in lists of chunk_size lines, so the file is never read whole.
+    """
+    while True:
+        lines = list(itertools.islice(input_file, chunk_size))
+        if not lines:
+            return
+        yield lines
+
+
+def parse_csv_value(value: str):
+    """CSV values are strings, so integers are converted back to int for the validation.
+    """
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def price_chunk(input_format: str, header: list | None, lines: list) -> tuple:
+    """Prices a chunk of lines. Run in the worker processes.
+
+    Returns:
+        tuple: The output text of the chunk and the amount of priced orders.
+    """
+    validator = DeliveryRequestValidator()
+    fee_policy = get_fee_policy()
+    output = io.StringIO()
+    orders = 0
+    if input_format == "csv":
+        writer = csv.writer(output, lineterminator="\n")
+        for row in csv.reader(lines):
+            if not row:
+                continue
+            delivery = {field: parse_csv_value(value) if field in ORDER_FIELDS else value
+                        for field, value in zip(header, row)}
+            result = price_order(validator=validator, fee_policy=fee_policy, delivery=delivery)
+            writer.writerow(row + ([result, ""] if isinstance(result, int) else ["", result]))
+            orders += 1
+    else:
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                delivery = json.loads(line)
+            except (ValueError, RecursionError):
+                # Deeply nested JSON exceeds the recursion limit of the parser.
+                delivery = None
+                result = INVALID_JSON_ERROR
+            else:
+                result = price_order(validator=validator, fee_policy=fee_policy, delivery=delivery)
+            result = {"delivery_fee": result} if isinstance(result, int) else {"error": result}
+            output.write(json.dumps({**delivery, **result} if isinstance(delivery, dict) else result,
+                                    separators=(",", ":")))
+            output.write("\n")
+            orders += 1
+    return output.getvalue(), orders
+
+
+def price_file(input_path: str, output_path: str, workers: int, chunk_size: int) -> int:
+    """Prices all the orders of the input file to the output file. With more than one worker, the chunks
+    are priced in a process pool. Only a few chunks per worker are in flight at a time, and they are
+    written in the input order.
+
+    Returns:
+        int: The amount of priced orders.
+    """
+    input_format = file_format(input_path)
+    orders = 0
+    with open(input_path, newline="") as input_file, open(output_path, "w", newline="") as output_file:
+        header = None
+        if input_format == "csv":
+            header = next(csv.reader([input_file.readline()]), [])
+            csv.writer(output_file, lineterminator="\n").writerow(header + RESULT_FIELDS)
+        chunks = read_chunks(input_file=input_file, chunk_size=chunk_size)
+
+        if workers == 1:
+            for lines in chunks:
+                output, chunk_orders = price_chunk(input_format, header, lines)
+                output_file.write(output)
+                orders += chunk_orders
+            return orders
+
+        with multiprocessing.get_context("fork").Pool(workers) as pool:
+            pending = deque()
+            for lines in chunks:
+                pending.append(pool.apply_async(price_chunk, (input_format, header, lines)))
+                if len(pending) >= workers * 2:
+                    output, chunk_orders = pending.popleft().get()
+                    output_file.write(output)
+                    orders += chunk_orders
+            while pending:
+                output, chunk_orders = pending.popleft().get()
+                output_file.write(output)
+                orders += chunk_orders
+    return orders
+
+
+def main(arguments: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="The order file, .csv or .jsonl.")
+    parser.add_argument("output", help="The file the priced orders are written to, in the same format.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="The amount of worker processes, one per CPU by default.")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="The amount of lines priced as one chunk.")
+    parsed_arguments = parser.parse_args(arguments)
+
+    try:
+        # The policies are compiled before the workers are forked, so they all share them.
+        get_fee_policy()
+        get_fee_policies()
+    except InvalidConfigException as exc:
+        print("Could not price the orders, due to the following error:")
+        print(exc.name)
+        return 1
+
+    started = time.perf_counter()
+    orders = price_file(input_path=parsed_arguments.input, output_path=parsed_arguments.output,
+                        workers=max(parsed_arguments.workers, 1), chunk_size=max(parsed_arguments.chunk_size, 1))
+    print(f"Priced {orders} orders in {time.perf_counter() - started:.2f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,32 @@
+"""Converts a JSONL order file (one order object per line) to a columnar order store file.
+
+The store keeps the valid orders as int32 columns with the times already parsed to the second of
+the week, see services/order_store.py. Jobs that price the same orders many times, e.g.
+simulate_fees.py, memory-map the store instead of parsing the JSON and the times on every run.
+Orders that are not valid are left out, and the index of every stored order in the JSONL file
+(counting only the non-empty lines) is kept.
+
+Run from the src folder, e.g. ```python3 convert_orders.py orders.jsonl orders.store```
+"""
+import argparse
+import time
+from services.order_files import read_orders
+from services.order_store import write_order_store
+
+
+def main(arguments: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("orders", help="JSONL file of orders.")
+    parser.add_argument("store", help="The order store file to write.")
+    parsed_arguments = parser.parse_args(arguments)
+
+    started = time.perf_counter()
+    stored_orders, skipped_orders = write_order_store(
+        parsed_arguments.store, (delivery for _, delivery in read_orders(parsed_arguments.orders)))
+    print(f"Stored {stored_orders} orders in {parsed_arguments.store} in {time.perf_counter() - started:.2f} s, "
+          f"skipped {skipped_orders} orders that are not valid.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,96 @@
+"""Compatibility report of the integer fee mode (INTEGER_FEES) against the default float calculation.
+
+The modes only differ in how the rush hour multiplier is applied to the fee before the max fee:
+int(fee * multiplier) with a float multiplier, or fee * basis points // 10000 in integers. The report
+checks every fee from 0 up to where both modes reach the max fee, for every rush hour multiplier of
+the fee policy (and the named policies of FEE_POLICIES_PATH), and lists the fees that differ.
+With an order file (JSONL, one order per line), it also lists the orders whose fee differs.
+
+Run from the src folder, e.g. ```python3 integer_fee_report.py orders.jsonl```
+"""
+import argparse
+import json
+from services.fee_policy import FeePolicy, InvalidConfigException, get_fee_policies, get_fee_policy
+from services.order_files import read_orders
+from services.request_validator import DeliveryRequestValidator
+from services.rush_hour_table import BASIS_POINTS
+
+
+def find_differing_fees(fee_policy: FeePolicy) -> list:
+    """Compares the modes for every fee before the rush hour multiplier, for every multiplier of the policy.
+
+    Returns:
+        list: Tuples of the fee before the multiplier, the multiplier, the float fee and the integer fee.
+    """
+    multipliers = {}
+    for day_multipliers, day_basis_points in zip(fee_policy.rush_hour_table.multipliers,
+                                                 fee_policy.rush_hour_table.basis_points):
+        multipliers.update(zip(day_multipliers, day_basis_points))
+    differing_fees = []
+    for surcharge_multiplier, surcharge_basis_points in sorted(multipliers.items()):
+        if surcharge_basis_points == 0:
+            continue
+        # Over this both modes give the max fee.
+        last_fee = fee_policy.max_delivery_fee * BASIS_POINTS // surcharge_basis_points + 1
+        for fee in range(last_fee + 1):
+            float_fee = int(min(fee * surcharge_multiplier, fee_policy.max_delivery_fee))
+            integer_fee = min(fee * surcharge_basis_points // BASIS_POINTS, fee_policy.max_delivery_fee)
+            if float_fee != integer_fee:
+                differing_fees.append((fee, surcharge_multiplier, float_fee, integer_fee))
+    return differing_fees
+
+
+def find_differing_orders(fee_policy: FeePolicy, orders) -> list:
+    """Prices the valid orders in both modes.
+
+    Returns:
+        list: Tuples of the line number, the order, the float fee and the integer fee.
+    """
+    validator = DeliveryRequestValidator()
+    differing_orders = []
+    for line_number, delivery in orders:
+        if not isinstance(delivery, dict):
+            continue
+        _, order = validator.parse_delivery_request(delivery_request=delivery)
+        if order is None:
+            continue
+        table = fee_policy.rush_hour_table
+        float_fee = fee_policy.calculate_multiplied_delivery_fee(
+            order.cart_value, order.delivery_distance, order.number_of_items,
+            table.multiplier(order.weekday, order.second_of_day))
+        integer_fee = fee_policy.calculate_basis_point_delivery_fee(
+            order.cart_value, order.delivery_distance, order.number_of_items,
+            table.multiplier_basis_points(order.weekday, order.second_of_day))
+        if float_fee != integer_fee:
+            differing_orders.append((line_number, delivery, float_fee, integer_fee))
+    return differing_orders
+
+
+def main(arguments: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("orders", nargs="?", default="", help="JSONL file of orders to compare.")
+    parser.add_argument("--limit", type=int, default=20, help="The maximum amount of listed fees and orders per policy.")
+    parsed_arguments = parser.parse_args(arguments)
+
+    try:
+        fee_policies = {"default": get_fee_policy(), **get_fee_policies()}
+    except InvalidConfigException as exc:
+        print("Could not compare the fees, due to the following error:")
+        print(exc.name)
+        return 1
+
+    for policy_id, fee_policy in fee_policies.items():
+        differing_fees = find_differing_fees(fee_policy)
+        print(f"Policy {policy_id}: {len(differing_fees)} fees differ between the float and the integer mode.")
+        for fee, surcharge_multiplier, float_fee, integer_fee in differing_fees[:parsed_arguments.limit]:
+            print(f"  fee {fee} x {surcharge_multiplier}: float {float_fee}, integer {integer_fee}")
+        if parsed_arguments.orders:
+            differing_orders = find_differing_orders(fee_policy, read_orders(parsed_arguments.orders))
+            print(f"Policy {policy_id}: {len(differing_orders)} orders of {parsed_arguments.orders} differ.")
+            for line_number, delivery, float_fee, integer_fee in differing_orders[:parsed_arguments.limit]:
+                print(f"  line {line_number}: {json.dumps(delivery)}: float {float_fee}, integer {integer_fee}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,12 +1,24 @@
-from fastapi import FastAPI, Request
-import uvicorn
-from fastapi.responses import JSONResponse
-from models.order_model import OrderModel
-from services.fee_calculator import FeeCalculator
+import json
+import time
+from contextlib import asynccontextmanager
+from functools import partial
+from fastapi import Body, FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from services.fee_cache import FeeCache
+from services.fee_config_watcher import FeeConfigWatcher, reload_fee_policies, reload_fee_policy
+from services.fee_encoder import encode_delivery_fee, encode_fee_breakdown, encode_result, encode_results
+from services.fee_policy import InvalidConfigException, get_fee_policy
+from services.metrics import BATCH_SIZE_BUCKETS, Metrics, escape_label
+from services.micro_batcher import MicroBatcher
+from services.ndjson_stream import NDJSONStreamingResponse, iter_lines
+from services.order_pricer import (INVALID_JSON_ERROR, UNKNOWN_POLICY_ERROR, calculate_delivery_fee,
+                                   calculate_delivery_fees, price_order, select_fee_policy)
 from services.request_validator import DeliveryRequestValidator
-from services.config_validator import ConfigValidator
+from services.warmup import warm_up
 from models.delivery_fee_model import DeliveryFeeModel
-import config
+from models.batch_delivery_fee_model import BatchDeliveryFeeModel
+from settings import settings
 
 
 class DeliveryValidatorException(Exception):
@@ -14,44 +26,320 @@ class DeliveryValidatorException(Exception):
         self.name = name
 
 
-app = FastAPI()
+async def send_warmup_request(app: FastAPI, method: str, path: str, body: bytes = b"") -> int:
+    """Sends a synthetic request straight to the ASGI app, so the middleware stack and the routing
+    are built before the first real request.
+
+    Returns:
+        int: The status code of the response.
+    """
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method, "scheme": "http",
+             "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+             "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+             "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 0)}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return next(message["status"] for message in messages if message["type"] == "http.response.start")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Watches the fee config and fee policies files for changes while the worker is running,
+    if FEE_CONFIG_PATH or FEE_POLICIES_PATH is set, and flushes the metrics of the worker if METRICS_DIR is set.
+
+    Before serving, the worker is warmed up: the fee policies are compiled and validated, synthetic orders
+    are priced through the whole calculation path, and the OpenAPI schema is built. The worker is ready,
+    see /readyz, only after the warm-up has passed, and stops being ready when it shuts down. A worker
+    that is not ready due to a config error becomes ready when the watcher swaps in a valid config.
+    """
+    fee_config_watchers = []
+    if settings.FEE_CONFIG_PATH:
+        fee_config_watchers.append(FeeConfigWatcher(path=settings.FEE_CONFIG_PATH,
+                                                    interval=settings.FEE_CONFIG_POLL_INTERVAL,
+                                                    reload=partial(reload_and_warm_up, reload=reload_fee_policy)))
+    if settings.FEE_POLICIES_PATH:
+        fee_config_watchers.append(FeeConfigWatcher(path=settings.FEE_POLICIES_PATH,
+                                                    interval=settings.FEE_CONFIG_POLL_INTERVAL,
+                                                    reload=partial(reload_and_warm_up, reload=reload_fee_policies)))
+    app.state.ready = False
+    app.state.readiness_error = None
+    for fee_config_watcher in fee_config_watchers:
+        fee_config_watcher.start()
+    if settings.METRICS_DIR:
+        metrics.start(interval=settings.METRICS_FLUSH_INTERVAL)
+    started = time.perf_counter()
+    readiness_error = None
+    try:
+        # Run in the threadpool, so its first thread is started before the first request.
+        await run_in_threadpool(warm_up, validator=validator)
+    except InvalidConfigException as exc:
+        print("The worker is not ready, due to the following error:")
+        print(exc.name)
+        readiness_error = exc.name
+    app.openapi()
+    await send_warmup_request(app, method="GET", path="/healthz")
+    # A body that is not an object is rejected by FastAPI before the endpoint, so it is not in the metrics.
+    await send_warmup_request(app, method="POST", path="/", body=b"[]")
+    if readiness_error is None:
+        app.state.warmup_seconds = time.perf_counter() - started
+        app.state.ready = True
+    else:
+        app.state.readiness_error = readiness_error
+    yield
+    for fee_config_watcher in fee_config_watchers:
+        fee_config_watcher.stop()
+    app.state.ready = False
+    metrics.stop()
+
+
+def reload_and_warm_up(path: str, reload):
+    """Reloads a changed fee config file with reload, and warms up the worker with the new policies.
+    A worker that is not ready due to a config error becomes ready once all its configs are valid.
+    Run in the watcher thread.
+    """
+    reload(path, fee_cache=fee_cache)
+    started = time.perf_counter()
+    try:
+        warm_up(validator=validator)
+    except InvalidConfigException as exc:
+        # The reloaded file is valid, but the other config file is still not.
+        app.state.readiness_error = exc.name
+        return
+    if app.state.readiness_error is not None:
+        app.state.warmup_seconds = time.perf_counter() - started
+        app.state.readiness_error = None
+        app.state.ready = True
+
+
+app = FastAPI(lifespan=lifespan)
+app.state.ready = False
+app.state.readiness_error = None
+app.state.warmup_seconds = None
+validator = DeliveryRequestValidator()
+fee_cache = FeeCache(max_size=settings.FEE_CACHE_SIZE, ttl=settings.FEE_CACHE_TTL) if settings.FEE_CACHE_SIZE > 0 else None
+metrics = Metrics(directory=settings.METRICS_DIR)
+
+
+def price_micro_batch(policy_orders: list) -> list:
+    """Prices the orders of concurrent single order requests together, and records the size of the batch.
+    """
+    metrics.observe('delivery_fee_micro_batch_size', len(policy_orders), buckets=BATCH_SIZE_BUCKETS)
+    return calculate_delivery_fees(policy_orders=policy_orders, fee_cache=fee_cache)
+
+
+micro_batcher = MicroBatcher(process_batch=price_micro_batch, max_batch_size=settings.MICRO_BATCH_SIZE,
+                             max_wait=settings.MICRO_BATCH_WAIT / 1000000)
 
 
 @app.exception_handler(DeliveryValidatorException)
 def delivery_exception_handler(request: Request, exc: DeliveryValidatorException):
+    metrics.increment(f'delivery_fee_errors_total{{error="{escape_label(exc.name)}"}}')
     return JSONResponse(
         status_code=400,
         content=exc.name,
     )
 
 
-@app.post("/", response_model=DeliveryFeeModel)
-def index(delivery: dict) -> DeliveryFeeModel:
+@app.exception_handler(InvalidConfigException)
+def config_exception_handler(request: Request, exc: InvalidConfigException):
+    """The fee config of the worker is not valid, so no order can be priced until the file is fixed.
+    """
+    metrics.increment(f'delivery_fee_errors_total{{error="{escape_label(exc.name)}"}}')
+    return JSONResponse(
+        status_code=503,
+        content=exc.name,
+    )
+
+
+def index(delivery: dict, breakdown: bool = False) -> Response:
     """Endpoint to get the delivery fee. Valid JSON request body follows the format:
     {
         "cart_value": int,
         "delivery_distance": int,
         "number_of_items": int,
-        "time": str in ISO 8601 format (UTC)
+        "time": str in ISO 8601 format (UTC),
+        "policy_id": str, optional name of the fee policy, see FEE_POLICIES_PATH
     }
 
+    With ?breakdown=true the response also has every component of the fee, calculated in the same pass
+    as the fee: the small order surcharge, the distance fee, the item surcharge, the bulk fee, the rush hour
+    multiplier, and whether the max fee or free delivery was applied.
+
+    The response is encoded straight to JSON bytes, DeliveryFeeModel only documents it in the OpenAPI schema.
+    The time of the validation, pricing and encoding stages is recorded to the metrics.
+
     Returns:
         JSON: JSON object with the delivery fee. e.g. {"delivery_fee": 500}
     """
-    request_validity = DeliveryRequestValidator().valid_delivery_request(delivery_request=delivery)
+    started = time.perf_counter()
+    metrics.increment('delivery_fee_requests_total{endpoint="index"}')
+    metrics.increment('delivery_fee_orders_total{endpoint="index"}')
+    request_validity, order = validator.parse_delivery_request(delivery_request=delivery)
+    if request_validity != "valid":
+        raise DeliveryValidatorException(name=request_validity)
+    validated = time.perf_counter()
+    fee_policy = select_fee_policy(fee_policy=get_fee_policy(), delivery=delivery)
+    if fee_policy is None:
+        raise DeliveryValidatorException(name=UNKNOWN_POLICY_ERROR)
+
+    if breakdown:
+        fee_breakdown = fee_policy.calculate_fee_breakdown_at(*order)
+        priced = time.perf_counter()
+        content = encode_fee_breakdown(fee_breakdown)
+    else:
+        delivery_fee = calculate_delivery_fee(fee_policy=fee_policy, order=order, fee_cache=fee_cache)
+        priced = time.perf_counter()
+        content = encode_delivery_fee(delivery_fee)
+    encoded = time.perf_counter()
+
+    metrics.observe('delivery_fee_stage_seconds{stage="validation"}', validated - started)
+    metrics.observe('delivery_fee_stage_seconds{stage="pricing"}', priced - validated)
+    metrics.observe('delivery_fee_stage_seconds{stage="encoding"}', encoded - priced)
+    metrics.observe('delivery_fee_request_seconds{endpoint="index"}', encoded - started)
+    return Response(content=content, media_type="application/json")
+
+
+async def index_async(delivery: dict, breakdown: bool = False) -> Response:
+    """Async variant of the index endpoint. Validating and pricing an order is short and never
+    waits for I/O, so it is run inline on the event loop instead of being dispatched to the threadpool.
+    Selected with the ASYNC_ENDPOINTS setting.
+    """
+    return index(delivery, breakdown)
+
+
+async def index_micro_batched(delivery: dict, breakdown: bool = False) -> Response:
+    """Micro-batched variant of the index endpoint, selected with the MICRO_BATCH_SIZE setting.
+    Every request is validated on its own, so the errors are the same as with the index endpoint,
+    and the valid orders of concurrent requests are priced together in batches of at most
+    MICRO_BATCH_SIZE orders, waiting at most MICRO_BATCH_WAIT microseconds for more orders.
+    Fee breakdowns are not batched.
+    """
+    if breakdown:
+        return index(delivery, breakdown)
+    started = time.perf_counter()
+    metrics.increment('delivery_fee_requests_total{endpoint="index"}')
+    metrics.increment('delivery_fee_orders_total{endpoint="index"}')
+    request_validity, order = validator.parse_delivery_request(delivery_request=delivery)
     if request_validity != "valid":
         raise DeliveryValidatorException(name=request_validity)
-    order_model = OrderModel(**delivery)
+    fee_policy = select_fee_policy(fee_policy=get_fee_policy(), delivery=delivery)
+    if fee_policy is None:
+        raise DeliveryValidatorException(name=UNKNOWN_POLICY_ERROR)
+    delivery_fee = await micro_batcher.submit((fee_policy, order))
+    content = encode_delivery_fee(delivery_fee)
+    metrics.observe('delivery_fee_request_seconds{endpoint="index"}', time.perf_counter() - started)
+    return Response(content=content, media_type="application/json")
+
+
+if settings.MICRO_BATCH_SIZE > 0:
+    app.post("/", response_model=DeliveryFeeModel)(index_micro_batched)
+else:
+    app.post("/", response_model=DeliveryFeeModel)(index_async if settings.ASYNC_ENDPOINTS else index)
+
+
+@app.post("/batch", response_model=list[BatchDeliveryFeeModel])
+def batch(deliveries: list = Body()) -> Response:
+    """Endpoint to get the delivery fees for multiple orders in one request. Valid JSON request body
+    is a list of orders, each following the format of the index endpoint.
+
+    The orders are priced in one pass with a single validator and fee policy, without
+    building an OrderModel per order. Every order gets its own result in the input order,
+    so one invalid order does not fail the whole batch. The results are encoded straight to
+    JSON bytes without a dict per order. The batch endpoint is always run in the threadpool,
+    so pricing a large batch does not block the event loop.
+
+    Returns:
+        JSON: JSON list with the delivery fee or the error of each order.
+        e.g. [{"delivery_fee": 710}, {"error": "Cart value must be a positive integer."}]
+    """
+    started = time.perf_counter()
+    metrics.increment('delivery_fee_requests_total{endpoint="batch"}')
+    if len(deliveries) > settings.MAX_BATCH_SIZE:
+        raise DeliveryValidatorException(name=f"Batch can contain at most {settings.MAX_BATCH_SIZE} orders.")
+    fee_policy = get_fee_policy()
+    results = [
+        price_order(validator=validator, fee_policy=fee_policy, delivery=delivery, fee_cache=fee_cache)
+        for delivery in deliveries
+    ]
+    content = encode_results(results)
+    metrics.increment('delivery_fee_orders_total{endpoint="batch"}', len(results))
+    metrics.count_errors(results)
+    metrics.observe('delivery_fee_request_seconds{endpoint="batch"}', time.perf_counter() - started)
+    return Response(content=content, media_type="application/json")
 
-    delivery_fee = FeeCalculator().calculate_total_delivery_fee(response_object=order_model)
 
-    return DeliveryFeeModel(delivery_fee=delivery_fee)
+@app.post("/stream", response_class=NDJSONStreamingResponse,
+          openapi_extra={"requestBody": {"content": {"application/x-ndjson": {"schema": {"type": "string"}}}}})
+async def stream(request: Request) -> NDJSONStreamingResponse:
+    """Endpoint to get the delivery fees for a newline delimited JSON (NDJSON) stream of orders.
+    Every line of the request body is an order in the format of the index endpoint.
+
+    The orders are priced as the body arrives, and the results are streamed back while the rest
+    of the body is still being read, so neither the request nor the response is kept in memory.
+
+    Returns:
+        NDJSON: One line with the delivery fee or the error of each order, in the input order.
+        e.g. {"delivery_fee":710}
+    """
+    started = time.perf_counter()
+    metrics.increment('delivery_fee_requests_total{endpoint="stream"}')
+    fee_policy = get_fee_policy()
+
+    async def price_lines():
+        async for lines in iter_lines(request.stream(), max_line_length=settings.MAX_STREAM_LINE_LENGTH):
+            results = []
+            for line in lines:
+                if line is None:
+                    results.append(f"Order can be at most {settings.MAX_STREAM_LINE_LENGTH} bytes.")
+                    continue
+                try:
+                    delivery = json.loads(line)
+                except (ValueError, RecursionError):
+                    # Deeply nested JSON fits within the line length but exceeds the recursion limit of the parser.
+                    result = INVALID_JSON_ERROR
+                else:
+                    result = price_order(validator=validator, fee_policy=fee_policy, delivery=delivery, fee_cache=fee_cache)
+                results.append(result)
+            metrics.increment('delivery_fee_orders_total{endpoint="stream"}', len(results))
+            metrics.count_errors(results)
+            yield b"\n".join([encode_result(result) for result in results]) + b"\n"
+        metrics.observe('delivery_fee_request_seconds{endpoint="stream"}', time.perf_counter() - started)
+
+    return NDJSONStreamingResponse(price_lines())
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint() -> Response:
+    """Endpoint for the metrics in the Prometheus text format: the requests and orders of the pricing endpoints,
+    the errors by the error message and the latency histograms, summed over all the workers if METRICS_DIR is set.
+    """
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/healthz")
+async def healthz() -> Response:
+    """Liveness probe: the worker is running and serving requests, whether it is ready or not.
+    """
+    return Response(content=b'{"status":"ok"}', media_type="application/json")
+
+
+@app.get("/readyz")
+async def readyz() -> Response:
+    """Readiness probe for the load balancer: 200 once the worker has been warmed up and its fee configs
+    have passed the validation, otherwise 503 with the config error if there is one.
+    """
+    if app.state.ready:
+        return JSONResponse(content={"status": "ready", "warmup_seconds": app.state.warmup_seconds})
+    return JSONResponse(status_code=503, content={"status": "not ready", "error": app.state.readiness_error})
 
 
 if __name__ == "__main__":
-    config_validity = ConfigValidator().valid_config(config=config)
-    if config_validity != "valid":
-        print("Could not start the server, due to the following error:")
-        print(config_validity)
-    else:
-        uvicorn.run(app, host="0.0.0.0", port=8000)
+    from server import run
+    raise SystemExit(run())
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class BatchDeliveryFeeModel(BaseModel):
+    delivery_fee: int | None = None
+    error: str | None = None
@@ -1,5 +1,7 @@
 from pydantic import BaseModel
+from models.fee_breakdown_model import FeeBreakdownModel
 
 
 class DeliveryFeeModel(BaseModel):
     delivery_fee: int
+    breakdown: FeeBreakdownModel | None = None
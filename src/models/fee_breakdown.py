@@ -0,0 +1,12 @@
+from typing import NamedTuple
+
+
+class FeeBreakdown(NamedTuple):
+    delivery_fee: int  # The total delivery fee in cents.
+    small_order_surcharge: int  # The difference to the minimum cart value.
+    distance_fee: int  # The fee of the first km (or the minimum fee) and of the additional distance.
+    number_of_items_surcharge: int  # The surcharge of the items after PRODUCT_AMOUNT_FOR_SURCHARGE.
+    bulk_fee: int  # The bulk fee for more than BULK_AMOUNT items.
+    rush_hour_multiplier: float  # The rush hour multiplier of the order time, 1.0 outside rush hours.
+    max_fee_applied: bool  # The fee was limited to MAX_DELIVERY_FEE.
+    free_delivery: bool  # The cart value is at least MIN_CART_VALUE_FOR_FREE_DELIVERY.
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+
+class FeeBreakdownModel(BaseModel):
+    small_order_surcharge: int
+    distance_fee: int
+    number_of_items_surcharge: int
+    bulk_fee: int
+    rush_hour_multiplier: float
+    max_fee_applied: bool
+    free_delivery: bool
@@ -0,0 +1,9 @@
+from typing import NamedTuple
+
+
+class ParsedOrder(NamedTuple):
+    cart_value: int
+    delivery_distance: int
+    number_of_items: int
+    weekday: int  # 0 = Monday,..., 6 = Sunday
+    second_of_day: int  # Seconds since midnight, UTC
@@ -0,0 +1,117 @@
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import socket
+import time
+import uvicorn
+from main import app
+from services.fee_policy import InvalidConfigException, get_fee_policies, get_fee_policy
+from services.metrics import clear_metrics_directory
+from settings import settings
+
+# Seconds a worker must have run before it is restarted after a crash. A worker that crashes sooner
+# fails on every start, e.g. when the port is taken, so the server stops instead of restarting it forever.
+WORKER_MIN_UPTIME = 1.0
+
+
+def worker_count() -> int:
+    """The amount of worker processes, WORKERS or the amount of CPUs if it is 0.
+    """
+    return settings.WORKERS or os.cpu_count() or 1
+
+
+def create_socket(host: str, port: int, reuse_port: bool) -> socket.socket:
+    """Creates the listening socket. With reuse_port every worker binds its own socket to the same port,
+    and the kernel balances the connections between them. Otherwise one socket is shared by all the workers.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+    return sock
+
+
+def serve(config: uvicorn.Config, sock: socket.socket | None):
+    """Runs one worker. The app is already imported and the fee policy compiled in the parent process,
+    so the worker starts serving right away.
+    """
+    if sock is None:
+        sock = create_socket(host=config.host, port=config.port, reuse_port=True)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def run() -> int:
+    """Validates and compiles the fee policy and the named policies once, then starts the workers.
+    The workers are forked from this process, so they share the preloaded app. A worker that crashes
+    is replaced with a new one, unless it crashed right after it was started.
+
+    Returns:
+        int: The exit code, 1 if the config is not valid or a worker failed.
+    """
+    try:
+        get_fee_policy()
+        get_fee_policies()
+    except InvalidConfigException as exc:
+        print("Could not start the server, due to the following error:")
+        print(exc.name)
+        return 1
+
+    if settings.METRICS_DIR:
+        clear_metrics_directory(settings.METRICS_DIR)
+
+    workers = worker_count()
+    config = uvicorn.Config(app, host=settings.HOST, port=settings.PORT, backlog=settings.BACKLOG)
+    if workers == 1:
+        uvicorn.Server(config).run()
+        return 0
+
+    shared_socket = None
+    if not settings.REUSE_PORT:
+        shared_socket = create_socket(host=settings.HOST, port=settings.PORT, reuse_port=False)
+    context = multiprocessing.get_context("fork")
+    started_at = {}
+
+    def start_worker() -> multiprocessing.Process:
+        process = context.Process(target=serve, args=(config, shared_socket))
+        process.start()
+        started_at[process] = time.monotonic()
+        return process
+
+    processes = [start_worker() for _ in range(workers)]
+    stopping = False
+
+    def stop_workers(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for process in list(processes):
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGINT, stop_workers)
+    signal.signal(signal.SIGTERM, stop_workers)
+    print(f"Started {workers} workers on {settings.HOST}:{settings.PORT}")
+    exit_code = 0
+    while processes:
+        multiprocessing.connection.wait([process.sentinel for process in processes])
+        for process in [process for process in processes if not process.is_alive()]:
+            processes.remove(process)
+            uptime = time.monotonic() - started_at.pop(process)
+            # A worker terminated by stop_workers before it handled the signal exits with -SIGTERM.
+            if process.exitcode == 0 or (stopping and process.exitcode == -signal.SIGTERM):
+                continue
+            if stopping or uptime < WORKER_MIN_UPTIME:
+                print(f"Worker {process.pid} failed with the exit code {process.exitcode}.")
+                exit_code = 1
+                stop_workers(None, None)
+                continue
+            print(f"Worker {process.pid} crashed with the exit code {process.exitcode}, starting a new worker.")
+            processes.append(start_worker())
+    return exit_code
+
+
+if __name__ == "__main__":
+    raise SystemExit(run())
@@ -1,3 +1,11 @@
+import math
+
+
+class InvalidConfigException(Exception):
+    def __init__(self, name: str):
+        self.name = name
+
+
 class ConfigValidator:
     def __init__(self):
         self._error = "valid"
@@ -39,7 +47,7 @@ class ConfigValidator:
 
     def validate_rush_hours(self, rush_hours: list) -> bool:
         """Checks if the rush hours are valid. The rush hour cannot end before
-        it starts and week cannot be negative or over 6.
+        it starts, week cannot be negative or over 6, and the fee must be a finite multiplier over 0.
         """
         if not isinstance(rush_hours, list):
             return False
@@ -48,4 +56,6 @@ class ConfigValidator:
                 return False
             if rush_hour.start >= rush_hour.end:
                 return False
+            if not math.isfinite(rush_hour.fee) or rush_hour.fee <= 0:
+                return False
         return True
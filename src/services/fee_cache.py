@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import OrderedDict
+from services.fee_policy import FeePolicy
+
+
+class FeeCache:
+    """Bounded LRU cache for delivery fees. The fees are cached by the order values and the rush hour
+    multiplier of the order time instead of the time itself, so repeated orders hit the cache
+    whenever they fall into the same rush hour interval.
+
+    The fees are cached per fee policy, so the named policies share one cache. When a policy is
+    replaced, e.g. after the config is reloaded, its fees are dropped with discard_fee_policies,
+    so the cache does not keep the old policy alive.
+    """
+
+    def __init__(self, max_size: int, ttl: float = 0):
+        """
+        Args:
+            max_size: The maximum amount of cached fees, the least recently used fee is dropped first.
+            ttl: Seconds a fee is kept in the cache, 0 keeps the fees until they are dropped.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._fees = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_delivery_fee(self, fee_policy: FeePolicy, cart_value: int, delivery_distance: int, number_of_items: int,
+                         weekday: int, second_of_day: int) -> int:
+        """Returns the fee from the cache, or calculates it with the policy and caches it.
+
+        Returns:
+            int: The total delivery fee in cents.
+        """
+        if fee_policy.integer_fees:
+            surcharge_multiplier = fee_policy.rush_hour_table.multiplier_basis_points(weekday, second_of_day)
+            calculate_delivery_fee = fee_policy.calculate_basis_point_delivery_fee
+        else:
+            surcharge_multiplier = fee_policy.rush_hour_table.multiplier(weekday, second_of_day)
+            calculate_delivery_fee = fee_policy.calculate_multiplied_delivery_fee
+        key = (fee_policy, cart_value, delivery_distance, number_of_items, surcharge_multiplier)
+        with self._lock:
+            cached = self._fees.get(key)
+            if cached is not None and (not self.ttl or cached[1] > time.monotonic()):
+                self._fees.move_to_end(key)
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+
+        delivery_fee = calculate_delivery_fee(cart_value, delivery_distance, number_of_items, surcharge_multiplier)
+        with self._lock:
+            self._fees[key] = (delivery_fee, time.monotonic() + self.ttl if self.ttl else 0)
+            self._fees.move_to_end(key)
+            if len(self._fees) > self.max_size:
+                self._fees.popitem(last=False)
+        return delivery_fee
+
+    def discard_fee_policies(self, fee_policies):
+        """Drops the cached fees of the given policies.
+        """
+        fee_policies = set(fee_policies)
+        with self._lock:
+            for key in [key for key in self._fees if key[0] in fee_policies]:
+                del self._fees[key]
+
+    def clear(self):
+        """Drops all the cached fees and resets the counters.
+        """
+        with self._lock:
+            self._fees.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._fees)
@@ -1,9 +1,9 @@
 import math
-from dateutil.parser import parse
-import config
-import test_config
+import datetime
 from models.order_model import OrderModel
+from services.fee_config_loader import environment_config
 from settings import settings
+from services.time_parser import parse_time
 
 
 class FeeCalculator:
@@ -11,13 +11,10 @@ class FeeCalculator:
     """
 
     def __init__(self):
-        """_summary_
+        """Selects the configuration by the environment. The calculator has no other state,
+        so the same instance can be reused for any number of orders.
         """
-        self._total_delivery_fee = 0
-        if settings.ENVIRONMENT == 'test':
-            self.config = test_config
-        else:
-            self.config = config
+        self.config = environment_config(settings.ENVIRONMENT)
 
     def calculate_total_delivery_fee(self, response_object: OrderModel) -> int:
         """Main function to calculate the fee for the delivery.
@@ -32,40 +29,52 @@ class FeeCalculator:
         Returns:
             int: The total delivery fee in cents.
         """
-
-        self._total_delivery_fee += self.calculate_minimum_cart_value_surcharge(
+        return self.calculate_delivery_fee(
             cart_value=response_object.cart_value,
+            delivery_distance=response_object.delivery_distance,
+            number_of_items=response_object.number_of_items,
+            time=response_object.time
+        )
+
+    def calculate_delivery_fee(self, cart_value: int, delivery_distance: int, number_of_items: int, time: str) -> int:
+        """Calculates the fee for a single delivery from its plain field values.
+
+        Returns:
+            int: The total delivery fee in cents.
+        """
+        total_delivery_fee = self.calculate_minimum_cart_value_surcharge(
+            cart_value=cart_value,
             min_cart_value=self.config.MINIMUM_CART_VALUE
         )
-        self._total_delivery_fee += self.calculate_delivery_distance_surcharge(
-            delivery_distance=response_object.delivery_distance,
+        total_delivery_fee += self.calculate_delivery_distance_surcharge(
+            delivery_distance=delivery_distance,
             minimum_delivery_fee=self.config.MINIMUM_DELIVERY_FEE,
             minimum_delivery_distance=self.config.MINIMUM_DELIVERY_DISTANCE,
             delivery_fee_for_additional_distance=self.config.DELIVERY_FEE_FOR_ADDITIONAL_DISTANCE,
             delivery_fee_for_the_first_km=self.config.DELIVERY_FEE_FOR_THE_FIRST_KM,
             additional_distance_after_first_km=self.config.ADDITIONAL_DISTANCE_AFTER_FIRST_KM
         )
-        self._total_delivery_fee += self.calculate_number_of_items_surcharge(
-            items_amount=response_object.number_of_items,
+        total_delivery_fee += self.calculate_number_of_items_surcharge(
+            items_amount=number_of_items,
             product_amount_for_surcharge=self.config.PRODUCT_AMOUNT_FOR_SURCHARGE,
             surcharge_fee=self.config.SURCHARGE_FEE,
             bulk_amount=self.config.BULK_AMOUNT,
             bulk_charge_fee=self.config.BULK_CHARGE_FEE
         )
-        self._total_delivery_fee *= self.calculate_rush_hour_surcharge_multiplier(
-            time=response_object.time,
+        total_delivery_fee *= self.calculate_rush_hour_surcharge_multiplier(
+            time=time,
             rush_hours=self.config.RUSH_HOURS
         )
-        self._total_delivery_fee = self.check_max_total_delivery_fee(
-            total_delivery_fee=self._total_delivery_fee,
+        total_delivery_fee = self.check_max_total_delivery_fee(
+            total_delivery_fee=total_delivery_fee,
             max_total_delivery_fee=self.config.MAX_DELIVERY_FEE
         )
         if self.check_free_total_delivery_fee(
-            cart_value=response_object.cart_value,
+            cart_value=cart_value,
             min_cart_value_for_free_delivery=self.config.MIN_CART_VALUE_FOR_FREE_DELIVERY
         ):
-            self._total_delivery_fee = 0
-        return int(self._total_delivery_fee)
+            total_delivery_fee = 0
+        return int(total_delivery_fee)
 
     def check_max_total_delivery_fee(self, total_delivery_fee: int, max_total_delivery_fee: int) -> int:
         """Makes sure the max fee is not crossed.
@@ -134,10 +143,13 @@ class FeeCalculator:
         so the function loops through them.
         """
         surcharge_multiplier = 1
-        parsed = parse(time)
-        time_of_day = parsed.time()
+        parsed_time = parse_time(time)
+        if parsed_time is None:
+            raise ValueError(f"Time {time} is not in UTC, ISO 8601 format.")
+        weekday, second_of_day = parsed_time
+        time_of_day = datetime.time(second_of_day // 3600, second_of_day // 60 % 60, second_of_day % 60)
         for rush_time in rush_hours:
-            if parsed.weekday() == rush_time.day:
+            if weekday == rush_time.day:
                 if time_of_day >= rush_time.start and time_of_day <= rush_time.end:
                     surcharge_multiplier *= rush_time.fee
         return round(float(surcharge_multiplier), 1)
@@ -0,0 +1,126 @@
+import json
+import math
+from types import SimpleNamespace
+from pydantic import ValidationError
+import config
+from config import RushHours
+from services.config_validator import InvalidConfigException
+
+CONFIG_NAMES = (
+    "MINIMUM_CART_VALUE",
+    "MINIMUM_DELIVERY_DISTANCE",
+    "DELIVERY_FEE_FOR_THE_FIRST_KM",
+    "ADDITIONAL_DISTANCE_AFTER_FIRST_KM",
+    "DELIVERY_FEE_FOR_ADDITIONAL_DISTANCE",
+    "MINIMUM_DELIVERY_FEE",
+    "BULK_AMOUNT",
+    "BULK_CHARGE_FEE",
+    "PRODUCT_AMOUNT_FOR_SURCHARGE",
+    "SURCHARGE_FEE",
+    "MAX_DELIVERY_FEE",
+    "MIN_CART_VALUE_FOR_FREE_DELIVERY",
+    "RUSH_HOURS",
+)
+
+
+def environment_config(environment: str):
+    """The config module of the environment: config.py, or test_config.py in the test environment.
+    test_config is imported only when it is used, so it is never loaded in production.
+    """
+    if environment == 'test':
+        import test_config
+        return test_config
+    return config
+
+
+def parse_config(values: dict, source: str) -> SimpleNamespace:
+    """Converts the values of a config file to a config with the same attributes as config.py.
+    Rush hours are given as objects with day, start, end and fee, where start and end are
+    times like "15:00:00" (or TOML local times).
+
+    Every value except the rush hours must be a non-negative integer, the additional distance
+    step must be over 0, and the rush hour fees must be finite multipliers over 0, so that a config
+    that passed here can always be compiled to a policy.
+
+    Raises:
+        InvalidConfigException: If a value is missing or not valid, or a rush hour is not valid.
+    """
+    for name in CONFIG_NAMES:
+        if name not in values:
+            raise InvalidConfigException(name=f"Error in {source}: {name} is missing.")
+        value = values[name]
+        if name != "RUSH_HOURS" and (not isinstance(value, int) or isinstance(value, bool) or value < 0):
+            raise InvalidConfigException(name=f"Error in {source}: {name} must be a positive integer.")
+    if values["ADDITIONAL_DISTANCE_AFTER_FIRST_KM"] == 0:
+        raise InvalidConfigException(name=f"Error in {source}: ADDITIONAL_DISTANCE_AFTER_FIRST_KM must be over 0.")
+    config = SimpleNamespace(**{name: values[name] for name in CONFIG_NAMES})
+    if not isinstance(config.RUSH_HOURS, list):
+        raise InvalidConfigException(name=f"Error in {source}: Rush hours are not valid.")
+    try:
+        config.RUSH_HOURS = [rush_hour if isinstance(rush_hour, RushHours) else RushHours(**rush_hour)
+                             for rush_hour in config.RUSH_HOURS]
+    except (TypeError, ValidationError):
+        raise InvalidConfigException(name=f"Error in {source}: Rush hours are not valid.")
+    for rush_hour in config.RUSH_HOURS:
+        if not math.isfinite(rush_hour.fee) or rush_hour.fee <= 0:
+            raise InvalidConfigException(name=f"Error in {source}: Rush hour fee must be a number over 0.")
+    return config
+
+
+def read_config_file(path: str) -> dict:
+    """Reads the values of a JSON or TOML (.toml) file.
+
+    Raises:
+        InvalidConfigException: If the file cannot be read or it is not an object.
+    """
+    try:
+        if path.lower().endswith(".toml"):
+            # The TOML parser is imported only when a TOML file is read.
+            try:
+                import tomllib
+            except ModuleNotFoundError:  # Python 3.10
+                import tomli as tomllib
+            with open(path, "rb") as config_file:
+                values = tomllib.load(config_file)
+        else:
+            with open(path) as config_file:
+                values = json.load(config_file)
+    except (OSError, ValueError) as exc:
+        raise InvalidConfigException(name=f"Error in {path}: {exc}")
+    if not isinstance(values, dict):
+        raise InvalidConfigException(name=f"Error in {path}: The config must be an object.")
+    return values
+
+
+def load_config_file(path: str) -> SimpleNamespace:
+    """Reads a JSON or TOML (.toml) config file, with the same names as in config.py.
+
+    Raises:
+        InvalidConfigException: If the file cannot be read or a value is missing.
+    """
+    return parse_config(values=read_config_file(path), source=path)
+
+
+def load_policies_file(path: str) -> dict:
+    """Reads a JSON or TOML (.toml) file of named fee policies. The file has a "policies" object
+    with a config per policy id, and an optional "defaults" config with the values the policies
+    do not set themselves.
+
+    Returns:
+        dict: The config of every policy by the policy id.
+
+    Raises:
+        InvalidConfigException: If the file cannot be read or a value of a policy is missing.
+    """
+    values = read_config_file(path)
+    defaults = values.get("defaults", {})
+    policies = values.get("policies")
+    if not isinstance(defaults, dict) or not isinstance(policies, dict):
+        raise InvalidConfigException(name=f"Error in {path}: The file must have a policies object.")
+    configs = {}
+    for policy_id, policy_values in policies.items():
+        source = f"{path} policy {policy_id}"
+        if not isinstance(policy_values, dict):
+            raise InvalidConfigException(name=f"Error in {source}: The policy must be an object.")
+        configs[policy_id] = parse_config(values={**defaults, **policy_values}, source=source)
+    return configs
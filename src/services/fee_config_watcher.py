@@ -0,0 +1,94 @@
+import os
+import threading
+from services.config_validator import InvalidConfigException
+from services.fee_cache import FeeCache
+from services.fee_config_loader import load_config_file
+from services.fee_policy import FeePolicy, load_fee_policies, set_fee_policies, set_fee_policy
+
+
+def reload_fee_policy(path: str, fee_cache: FeeCache | None = None):
+    """Compiles the fee config file and swaps it in as the policy of the current environment.
+    The cached fees of the replaced policy are dropped from fee_cache.
+    """
+    replaced_fee_policy = set_fee_policy(FeePolicy.from_config(load_config_file(path)))
+    if fee_cache is not None and replaced_fee_policy is not None:
+        fee_cache.discard_fee_policies([replaced_fee_policy])
+
+
+def reload_fee_policies(path: str, fee_cache: FeeCache | None = None):
+    """Compiles the fee policies file and swaps in all the named policies.
+    The cached fees of the replaced policies are dropped from fee_cache.
+    """
+    replaced_fee_policies = set_fee_policies(load_fee_policies(path))
+    if fee_cache is not None and replaced_fee_policies is not None:
+        fee_cache.discard_fee_policies(replaced_fee_policies.values())
+
+
+class FeeConfigWatcher:
+    """Watches the fee config file and swaps in a new fee policy when the file changes.
+    The file is checked in a background thread, so requests never read it. If the changed
+    config is not valid, or compiling it fails in any other way, the error is printed and the
+    old policy is kept.
+    """
+
+    def __init__(self, path: str, interval: float, reload=reload_fee_policy):
+        """
+        Args:
+            path: The watched file.
+            interval: Seconds between the checks.
+            reload: Function called with the path when the file changes, reload_fee_policy
+                for FEE_CONFIG_PATH or reload_fee_policies for FEE_POLICIES_PATH.
+        """
+        self.path = path
+        self.interval = interval
+        self.reload = reload
+        self._file_version = self.file_version()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def file_version(self) -> tuple | None:
+        """The modification time and size of the file, None if the file cannot be read.
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def check(self) -> bool:
+        """Reloads the policy if the file has changed since the last check.
+
+        Returns:
+            bool: True if the changed file was swapped in.
+        """
+        file_version = self.file_version()
+        if file_version is None or file_version == self._file_version:
+            return False
+        self._file_version = file_version
+        try:
+            self.reload(self.path)
+        except InvalidConfigException as exc:
+            print("Could not reload the fee config, due to the following error:")
+            print(exc.name)
+            return False
+        except Exception as exc:
+            # Any other error must not stop the watcher thread, or the file would never be reloaded again.
+            print("Could not reload the fee config, due to the following error:")
+            print(repr(exc))
+            return False
+        return True
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._watch, name="fee-config-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval):
+            self.check()
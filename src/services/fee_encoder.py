@@ -0,0 +1,43 @@
+import json
+from functools import lru_cache
+from models.fee_breakdown import FeeBreakdown
+
+
+def encode_delivery_fee(delivery_fee: int) -> bytes:
+    """Encodes the response of one order straight to JSON bytes, e.g. b'{"delivery_fee":710}'.
+    """
+    return b'{"delivery_fee":%d}' % delivery_fee
+
+
+def encode_fee_breakdown(breakdown: FeeBreakdown) -> bytes:
+    """Encodes the response of one order with the breakdown of the fee,
+    e.g. b'{"delivery_fee":710,"breakdown":{"small_order_surcharge":210,...}}'.
+    """
+    return (b'{"delivery_fee":%d,"breakdown":{"small_order_surcharge":%d,"distance_fee":%d,'
+            b'"number_of_items_surcharge":%d,"bulk_fee":%d,"rush_hour_multiplier":%s,'
+            b'"max_fee_applied":%s,"free_delivery":%s}}') % (
+        breakdown.delivery_fee, breakdown.small_order_surcharge, breakdown.distance_fee,
+        breakdown.number_of_items_surcharge, breakdown.bulk_fee, repr(breakdown.rush_hour_multiplier).encode(),
+        b"true" if breakdown.max_fee_applied else b"false", b"true" if breakdown.free_delivery else b"false")
+
+
+@lru_cache(maxsize=256)
+def encode_error(error: str) -> bytes:
+    """Encodes the result of an order that is not valid, e.g. b'{"error":"..."}'.
+    There are only a few different error messages, so each one is encoded once.
+    """
+    return b'{"error":%s}' % json.dumps(error).encode()
+
+
+def encode_result(result: int | str) -> bytes:
+    """Encodes the result of price_order, the delivery fee or the error message.
+    """
+    if isinstance(result, int):
+        return b'{"delivery_fee":%d}' % result
+    return encode_error(result)
+
+
+def encode_results(results: list) -> bytes:
+    """Encodes the results of a batch to a JSON list, without building a dict per result.
+    """
+    return b"[" + b",".join(map(encode_result, results)) + b"]"
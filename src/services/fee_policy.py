@@ -0,0 +1,333 @@
+from models.fee_breakdown import FeeBreakdown
+from services.config_validator import ConfigValidator, InvalidConfigException
+from services.fee_config_loader import environment_config, load_config_file, load_policies_file
+from services.fee_tables import compile_number_of_items_fee_table, delivery_distance_fee, number_of_items_fee
+from services.rush_hour_table import BASIS_POINTS, compile_rush_hour_table
+from services.time_parser import parse_time
+from settings import settings
+
+
+class FeePolicy:
+    """Immutable fee policy compiled once from a configuration module. The policy holds the
+    config values as slots, so calculating a fee does not look up the config module or
+    create any objects. The same policy can be shared by all requests.
+
+    The item fees are precomputed to a table up to FEE_TABLE_MAX_ITEMS items, so they are an index
+    lookup, and larger orders are calculated with the same integer formula the table is built with.
+    The distance fee is calculated in integer arithmetic, without floats.
+
+    With INTEGER_FEES, the rush hour multiplier is applied in integer basis points and the fee is
+    rounded down, so the whole calculation is integer arithmetic. The float multiplication may give
+    one cent less for some fees, see integer_fee_report.py.
+    """
+
+    __slots__ = (
+        "minimum_cart_value",
+        "minimum_delivery_distance",
+        "delivery_fee_for_the_first_km",
+        "additional_distance_after_first_km",
+        "delivery_fee_for_additional_distance",
+        "minimum_delivery_fee",
+        "bulk_amount",
+        "bulk_charge_fee",
+        "product_amount_for_surcharge",
+        "surcharge_fee",
+        "max_delivery_fee",
+        "min_cart_value_for_free_delivery",
+        "rush_hour_table",
+        "number_of_items_fee_table",
+        "integer_fees",
+    )
+
+    def __init__(self, config):
+        """Copies the values from the config. Use from_config to also validate the config.
+        """
+        set_value = super().__setattr__
+        set_value("minimum_cart_value", config.MINIMUM_CART_VALUE)
+        set_value("minimum_delivery_distance", config.MINIMUM_DELIVERY_DISTANCE)
+        set_value("delivery_fee_for_the_first_km", config.DELIVERY_FEE_FOR_THE_FIRST_KM)
+        set_value("additional_distance_after_first_km", config.ADDITIONAL_DISTANCE_AFTER_FIRST_KM)
+        set_value("delivery_fee_for_additional_distance", config.DELIVERY_FEE_FOR_ADDITIONAL_DISTANCE)
+        set_value("minimum_delivery_fee", config.MINIMUM_DELIVERY_FEE)
+        set_value("bulk_amount", config.BULK_AMOUNT)
+        set_value("bulk_charge_fee", config.BULK_CHARGE_FEE)
+        set_value("product_amount_for_surcharge", config.PRODUCT_AMOUNT_FOR_SURCHARGE)
+        set_value("surcharge_fee", config.SURCHARGE_FEE)
+        set_value("max_delivery_fee", config.MAX_DELIVERY_FEE)
+        set_value("min_cart_value_for_free_delivery", config.MIN_CART_VALUE_FOR_FREE_DELIVERY)
+        set_value("rush_hour_table", compile_rush_hour_table(config.RUSH_HOURS))
+        set_value("number_of_items_fee_table", compile_number_of_items_fee_table(settings.FEE_TABLE_MAX_ITEMS,
+                                                                                 *self.number_of_items_fee_values()))
+        set_value("integer_fees", settings.INTEGER_FEES)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FeePolicy is immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError("FeePolicy is immutable.")
+
+    def distance_fee_values(self) -> tuple:
+        return (self.minimum_delivery_distance, self.minimum_delivery_fee, self.delivery_fee_for_the_first_km,
+                self.additional_distance_after_first_km, self.delivery_fee_for_additional_distance)
+
+    def number_of_items_fee_values(self) -> tuple:
+        return (self.product_amount_for_surcharge, self.surcharge_fee, self.bulk_amount, self.bulk_charge_fee)
+
+    @classmethod
+    def from_config(cls, config) -> "FeePolicy":
+        """Validates the config with ConfigValidator and compiles it to a policy.
+
+        Raises:
+            InvalidConfigException: If the config is not valid.
+        """
+        config_validity = ConfigValidator().valid_config(config=config)
+        if config_validity != "valid":
+            raise InvalidConfigException(name=config_validity)
+        return cls(config)
+
+    def calculate_delivery_fee(self, cart_value: int, delivery_distance: int, number_of_items: int, time: str) -> int:
+        """Calculates the fee for a valid delivery with the same steps and results as
+        FeeCalculator.calculate_total_delivery_fee, without calling a method per step.
+
+        Returns:
+            int: The total delivery fee in cents.
+        """
+        weekday, second_of_day = parse_time(time)
+        return self.calculate_delivery_fee_at(cart_value=cart_value, delivery_distance=delivery_distance,
+                                              number_of_items=number_of_items, weekday=weekday,
+                                              second_of_day=second_of_day)
+
+    def calculate_delivery_fee_at(self, cart_value: int, delivery_distance: int, number_of_items: int,
+                                  weekday: int, second_of_day: int) -> int:
+        """Calculates the fee like calculate_delivery_fee, for a time that is already parsed
+        with parse_time, e.g. by DeliveryRequestValidator.
+
+        Returns:
+            int: The total delivery fee in cents.
+        """
+        if self.integer_fees:
+            surcharge_basis_points = self.rush_hour_table.multiplier_basis_points(weekday, second_of_day)
+            return self.calculate_basis_point_delivery_fee(cart_value=cart_value, delivery_distance=delivery_distance,
+                                                           number_of_items=number_of_items,
+                                                           surcharge_basis_points=surcharge_basis_points)
+        surcharge_multiplier = self.rush_hour_table.multiplier(weekday, second_of_day)
+        return self.calculate_multiplied_delivery_fee(cart_value=cart_value, delivery_distance=delivery_distance,
+                                                      number_of_items=number_of_items,
+                                                      surcharge_multiplier=surcharge_multiplier)
+
+    def calculate_fee_breakdown_at(self, cart_value: int, delivery_distance: int, number_of_items: int,
+                                   weekday: int, second_of_day: int) -> FeeBreakdown:
+        """Calculates the fee like calculate_delivery_fee_at, keeping every component of it.
+        The total is calculated from the same components, so it is always the same fee.
+
+        Returns:
+            FeeBreakdown: The total delivery fee and its components.
+        """
+        table = self.rush_hour_table
+        surcharge_multiplier = table.multiplier(weekday, second_of_day)
+        small_order_surcharge = self.minimum_cart_value - cart_value if cart_value < self.minimum_cart_value else 0
+        distance_fee = delivery_distance_fee(delivery_distance, *self.distance_fee_values())
+        number_of_items_surcharge = 0
+        if number_of_items > self.product_amount_for_surcharge:
+            number_of_items_surcharge = (number_of_items - self.product_amount_for_surcharge) * self.surcharge_fee
+        bulk_fee = self.bulk_charge_fee if number_of_items > self.bulk_amount else 0
+
+        free_delivery = cart_value >= self.min_cart_value_for_free_delivery
+        max_fee_applied = False
+        delivery_fee = 0
+        if not free_delivery:
+            total_delivery_fee = small_order_surcharge + distance_fee + number_of_items_surcharge + bulk_fee
+            if self.integer_fees:
+                total_delivery_fee = total_delivery_fee * table.multiplier_basis_points(weekday, second_of_day) \
+                    // BASIS_POINTS
+            else:
+                total_delivery_fee *= surcharge_multiplier
+            max_fee_applied = total_delivery_fee > self.max_delivery_fee
+            delivery_fee = int(min(total_delivery_fee, self.max_delivery_fee))
+        return FeeBreakdown(delivery_fee=delivery_fee, small_order_surcharge=small_order_surcharge,
+                            distance_fee=distance_fee, number_of_items_surcharge=number_of_items_surcharge,
+                            bulk_fee=bulk_fee, rush_hour_multiplier=surcharge_multiplier,
+                            max_fee_applied=max_fee_applied, free_delivery=free_delivery)
+
+    def calculate_multiplied_delivery_fee(self, cart_value: int, delivery_distance: int, number_of_items: int,
+                                          surcharge_multiplier: float) -> int:
+        """Calculates the fee with the rush hour multiplier of the order time already looked up
+        from rush_hour_table. Orders with the same values and multiplier always have the same fee.
+
+        Returns:
+            int: The total delivery fee in cents.
+        """
+        if cart_value >= self.min_cart_value_for_free_delivery:
+            return 0
+        total_delivery_fee = self.calculate_base_delivery_fee(cart_value=cart_value, delivery_distance=delivery_distance,
+                                                              number_of_items=number_of_items)
+        total_delivery_fee *= surcharge_multiplier
+        return int(min(total_delivery_fee, self.max_delivery_fee))
+
+    def calculate_basis_point_delivery_fee(self, cart_value: int, delivery_distance: int, number_of_items: int,
+                                           surcharge_basis_points: int) -> int:
+        """Calculates the fee like calculate_multiplied_delivery_fee in integer arithmetic, with the rush hour
+        multiplier in basis points from rush_hour_table. The multiplied fee is rounded down.
+
+        Returns:
+            int: The total delivery fee in cents.
+        """
+        if cart_value >= self.min_cart_value_for_free_delivery:
+            return 0
+        total_delivery_fee = self.calculate_base_delivery_fee(cart_value=cart_value, delivery_distance=delivery_distance,
+                                                              number_of_items=number_of_items)
+        return min(total_delivery_fee * surcharge_basis_points // BASIS_POINTS, self.max_delivery_fee)
+
+    def calculate_base_delivery_fee(self, cart_value: int, delivery_distance: int, number_of_items: int) -> int:
+        """The sum of the small order surcharge, the distance fee and the item fee, before the rush hour
+        multiplier and the max fee.
+
+        Returns:
+            int: The fee in cents.
+        """
+        total_delivery_fee = 0
+        if cart_value < self.minimum_cart_value:
+            total_delivery_fee = self.minimum_cart_value - cart_value
+
+        # Like delivery_distance_fee, inlined. A table per metre would cost every policy with its own
+        # distance values tens of kilobytes, so the fee is calculated in integer arithmetic instead.
+        if delivery_distance < self.minimum_delivery_distance:
+            total_delivery_fee += self.minimum_delivery_fee
+        else:
+            total_delivery_fee += self.delivery_fee_for_the_first_km
+        if delivery_distance > 1000:
+            total_delivery_fee += -((1000 - delivery_distance) // self.additional_distance_after_first_km) \
+                * self.delivery_fee_for_additional_distance
+
+        number_of_items_fee_table = self.number_of_items_fee_table
+        if number_of_items < len(number_of_items_fee_table):
+            total_delivery_fee += number_of_items_fee_table[number_of_items]
+        else:
+            total_delivery_fee += number_of_items_fee(number_of_items, *self.number_of_items_fee_values())
+        return total_delivery_fee
+
+
+_fee_policies = {}
+# The errors of the fee configs that could not be compiled by the environment, until a valid policy is set.
+_fee_policy_errors = {}
+_named_fee_policies = None
+_named_fee_policies_error = None
+
+
+def load_fee_config(environment: str):
+    """The fee config of the environment, from the FEE_CONFIG_PATH file if it is set,
+    otherwise config.py, or test_config.py in the test environment.
+
+    Raises:
+        InvalidConfigException: If the FEE_CONFIG_PATH file cannot be read.
+    """
+    if settings.FEE_CONFIG_PATH:
+        return load_config_file(settings.FEE_CONFIG_PATH)
+    return environment_config(environment)
+
+
+def load_fee_policy(environment: str) -> FeePolicy:
+    """Compiles the policy of the environment from its fee config, see load_fee_config.
+
+    Raises:
+        InvalidConfigException: If the config is not valid.
+    """
+    return FeePolicy.from_config(load_fee_config(environment))
+
+
+def get_fee_policy() -> FeePolicy:
+    """Returns the compiled policy of the current environment. The policy is compiled
+    on the first call and reused until it is replaced with set_fee_policy. If the config is
+    not valid, the error is remembered and raised again without reading the config, until
+    a valid policy is set.
+
+    Raises:
+        InvalidConfigException: If the config is not valid.
+    """
+    environment = settings.ENVIRONMENT
+    fee_policy = _fee_policies.get(environment)
+    if fee_policy is None:
+        error = _fee_policy_errors.get(environment)
+        if error is not None:
+            raise InvalidConfigException(name=error)
+        try:
+            fee_policy = load_fee_policy(environment)
+        except InvalidConfigException as exc:
+            _fee_policy_errors[environment] = exc.name
+            raise
+        _fee_policies[environment] = fee_policy
+    return fee_policy
+
+
+def set_fee_policy(fee_policy: FeePolicy | None) -> FeePolicy | None:
+    """Replaces the policy of the current environment. The policy is swapped as a whole, so every request
+    prices with either the old or the new policy, and requests that already got the old one finish with it.
+    None compiles the policy again from the config on the next call of get_fee_policy.
+
+    Returns:
+        FeePolicy | None: The replaced policy, None if there was no valid policy.
+    """
+    environment = settings.ENVIRONMENT
+    replaced_fee_policy = _fee_policies.get(environment)
+    if fee_policy is None:
+        _fee_policies.pop(environment, None)
+    else:
+        _fee_policies[environment] = fee_policy
+    _fee_policy_errors.pop(environment, None)
+    return replaced_fee_policy
+
+
+def load_fee_policies(path: str) -> dict:
+    """Compiles every policy of a FEE_POLICIES_PATH file, see load_policies_file.
+
+    Returns:
+        dict: The compiled policies by the policy id.
+
+    Raises:
+        InvalidConfigException: If the config of a policy is not valid.
+    """
+    fee_policies = {}
+    for policy_id, policy_config in load_policies_file(path).items():
+        try:
+            fee_policies[policy_id] = FeePolicy.from_config(policy_config)
+        except InvalidConfigException as exc:
+            error = exc.name.removeprefix("Error in config.py: ")
+            raise InvalidConfigException(name=f"Error in {path} policy {policy_id}: {error}")
+    return fee_policies
+
+
+def get_fee_policies() -> dict:
+    """Returns the named policies by the policy id, empty if FEE_POLICIES_PATH is not set.
+    The policies are compiled on the first call and reused until they are replaced with set_fee_policies,
+    so selecting the policy of a request is a single dict lookup. If the file is not valid, the error
+    is remembered like in get_fee_policy.
+
+    Raises:
+        InvalidConfigException: If the config of a policy is not valid.
+    """
+    global _named_fee_policies, _named_fee_policies_error
+    fee_policies = _named_fee_policies
+    if fee_policies is None:
+        if _named_fee_policies_error is not None:
+            raise InvalidConfigException(name=_named_fee_policies_error)
+        try:
+            fee_policies = load_fee_policies(settings.FEE_POLICIES_PATH) if settings.FEE_POLICIES_PATH else {}
+        except InvalidConfigException as exc:
+            _named_fee_policies_error = exc.name
+            raise
+        _named_fee_policies = fee_policies
+    return fee_policies
+
+
+def set_fee_policies(fee_policies: dict | None) -> dict | None:
+    """Replaces all the named policies at once, like set_fee_policy. None compiles them again
+    from FEE_POLICIES_PATH on the next call of get_fee_policies.
+
+    Returns:
+        dict | None: The replaced policies, None if there were no valid policies.
+    """
+    global _named_fee_policies, _named_fee_policies_error
+    replaced_fee_policies = _named_fee_policies
+    _named_fee_policies = fee_policies
+    _named_fee_policies_error = None
+    return replaced_fee_policies
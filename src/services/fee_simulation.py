@@ -0,0 +1,122 @@
+import numpy as np
+from services.config_validator import ConfigValidator, InvalidConfigException
+from services.order_store import OrderStore
+from services.request_validator import DeliveryRequestValidator
+from services.vectorized_fee_calculator import VectorizedFeeCalculator
+
+
+class FeeSimulation:
+    """What-if simulation of candidate fee configs over a set of orders, e.g. historical orders.
+
+    The orders are kept as NumPy columns, with the times parsed once, and every config prices all
+    the orders at once with VectorizedFeeCalculator. The fees of all the configs are compared to the
+    first config, the baseline, order by order.
+    """
+
+    def __init__(self, cart_values, delivery_distances, numbers_of_items, weekdays, microseconds_of_day,
+                 order_indexes=None):
+        """
+        Args:
+            cart_values, delivery_distances, numbers_of_items, weekdays, microseconds_of_day: Columns of valid
+                orders, like the arguments of VectorizedFeeCalculator.calculate_delivery_fees_at.
+            order_indexes: The index of every order in the original orders, if some were left out.
+        """
+        self.cart_values = np.asarray(cart_values, dtype=np.int64)
+        self.delivery_distances = np.asarray(delivery_distances, dtype=np.int64)
+        self.numbers_of_items = np.asarray(numbers_of_items, dtype=np.int64)
+        self.weekdays = np.asarray(weekdays, dtype=np.int64)
+        self.microseconds_of_day = np.asarray(microseconds_of_day, dtype=np.int64)
+        self.order_indexes = np.arange(len(self.cart_values)) if order_indexes is None else np.asarray(order_indexes)
+
+    @classmethod
+    def from_orders(cls, orders) -> "FeeSimulation":
+        """Collects the valid orders of order objects to columns. Orders that are not valid are skipped.
+        """
+        validator = DeliveryRequestValidator()
+        columns = ([], [], [], [])
+        order_indexes = []
+        for order_index, delivery in enumerate(orders):
+            if not isinstance(delivery, dict) or validator.parse_delivery_request(delivery_request=delivery)[1] is None:
+                continue
+            for column, field in zip(columns, ("cart_value", "delivery_distance", "number_of_items", "time")):
+                column.append(delivery[field])
+            order_indexes.append(order_index)
+        cart_values, delivery_distances, numbers_of_items, times = columns
+        weekdays, microseconds_of_day = VectorizedFeeCalculator().parse_times(times=times)
+        return cls(cart_values, delivery_distances, numbers_of_items, weekdays, microseconds_of_day,
+                   order_indexes=order_indexes)
+
+    @classmethod
+    def from_order_store(cls, order_store: OrderStore) -> "FeeSimulation":
+        """Takes the orders of a memory-mapped order store, which are already valid and parsed.
+        """
+        return cls(order_store.cart_values, order_store.delivery_distances, order_store.numbers_of_items,
+                   order_store.weekdays, order_store.microseconds_of_day, order_indexes=order_store.order_indexes)
+
+    def __len__(self) -> int:
+        return len(self.cart_values)
+
+    def calculate_fees(self, configs: dict) -> np.ndarray:
+        """Prices all the orders with every config.
+
+        Args:
+            configs: The configs by name, with the same attributes as config.py.
+
+        Returns:
+            np.ndarray: The fees in cents with a row per config, in the order of configs.
+
+        Raises:
+            InvalidConfigException: If a config is not valid.
+        """
+        config_validator = ConfigValidator()
+        for name, fee_config in configs.items():
+            config_validity = config_validator.valid_config(config=fee_config)
+            if config_validity != "valid":
+                error = config_validity.removeprefix("Error in config.py: ")
+                raise InvalidConfigException(name=f"Error in config {name}: {error}")
+        fees = np.empty((len(configs), len(self)), dtype=np.int64)
+        for row, fee_config in enumerate(configs.values()):
+            fees[row] = VectorizedFeeCalculator(fee_config=fee_config).calculate_delivery_fees_at(
+                cart_values=self.cart_values, delivery_distances=self.delivery_distances,
+                numbers_of_items=self.numbers_of_items, weekdays=self.weekdays,
+                microseconds_of_day=self.microseconds_of_day)
+        return fees
+
+    def run(self, configs: dict, bins: int = 20) -> dict:
+        """Prices the orders with every config and compares the fees to the first config.
+
+        Args:
+            configs: The configs by name, the first one is the baseline, e.g. the current config.
+            bins: The amount of fee histogram bins, shared by all the configs.
+
+        Returns:
+            dict: "fees" and "deltas" (the fees minus the baseline fees) with a row per config,
+            "histogram_edges", and "configs" with the statistics of every config by name: the total,
+            mean, median and 90th percentile fee, the shares of free and max fee deliveries,
+            the histogram counts, the total change from the baseline and the amounts of orders
+            with a higher and a lower fee than with the baseline.
+
+        Raises:
+            InvalidConfigException: If a config is not valid.
+        """
+        fees = self.calculate_fees(configs)
+        deltas = fees - fees[0]
+        histogram_edges = np.linspace(0, max(int(fees.max(initial=0)), 1), bins + 1)
+        statistics = {}
+        for row, (name, fee_config) in enumerate(configs.items()):
+            config_fees = fees[row]
+            has_orders = len(config_fees) > 0
+            statistics[name] = {
+                "total": int(config_fees.sum()),
+                "mean": float(config_fees.mean()) if has_orders else 0.0,
+                "median": float(np.median(config_fees)) if has_orders else 0.0,
+                "p90": float(np.percentile(config_fees, 90)) if has_orders else 0.0,
+                "free_share": float((self.cart_values >= fee_config.MIN_CART_VALUE_FOR_FREE_DELIVERY).mean())
+                if has_orders else 0.0,
+                "max_fee_share": float((config_fees == fee_config.MAX_DELIVERY_FEE).mean()) if has_orders else 0.0,
+                "histogram": np.histogram(config_fees, bins=histogram_edges)[0].tolist(),
+                "total_change": int(deltas[row].sum()),
+                "higher": int((deltas[row] > 0).sum()),
+                "lower": int((deltas[row] < 0).sum()),
+            }
+        return {"fees": fees, "deltas": deltas, "histogram_edges": histogram_edges.tolist(), "configs": statistics}
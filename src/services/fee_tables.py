@@ -0,0 +1,38 @@
+from functools import lru_cache
+
+
+def delivery_distance_fee(delivery_distance: int, minimum_delivery_distance: int, minimum_delivery_fee: int,
+                          delivery_fee_for_the_first_km: int, additional_distance_after_first_km: int,
+                          delivery_fee_for_additional_distance: int) -> int:
+    """The distance fee like FeeCalculator.calculate_delivery_distance_surcharge, with the additional distances
+    rounded upwards with integer division instead of math.ceil of a float division. The result is the same
+    for every distance under 2^53 metres, where the float division is exact enough.
+    """
+    if delivery_distance < minimum_delivery_distance:
+        distance_fee = minimum_delivery_fee
+    else:
+        distance_fee = delivery_fee_for_the_first_km
+    if delivery_distance > 1000:
+        distance_fee += -((1000 - delivery_distance) // additional_distance_after_first_km) \
+            * delivery_fee_for_additional_distance
+    return distance_fee
+
+
+def number_of_items_fee(number_of_items: int, product_amount_for_surcharge: int, surcharge_fee: int,
+                        bulk_amount: int, bulk_charge_fee: int) -> int:
+    """The item fee like FeeCalculator.calculate_number_of_items_surcharge.
+    """
+    items_fee = 0
+    if number_of_items > product_amount_for_surcharge:
+        items_fee += (number_of_items - product_amount_for_surcharge) * surcharge_fee
+    if number_of_items > bulk_amount:
+        items_fee += bulk_charge_fee
+    return items_fee
+
+
+@lru_cache(maxsize=1024)
+def compile_number_of_items_fee_table(max_number_of_items: int, *fee_values: int) -> tuple:
+    """The item fee of every amount of items from 0 to max_number_of_items, indexed by the amount.
+    The fee_values are the arguments of number_of_items_fee after the amount.
+    """
+    return tuple(number_of_items_fee(number_of_items, *fee_values) for number_of_items in range(max_number_of_items + 1))
@@ -0,0 +1,237 @@
+import glob
+import json
+import os
+import threading
+from bisect import bisect_left
+
+# Upper bounds of the latency histogram buckets in seconds.
+BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+           0.25, 0.5, 1.0)
+# Upper bounds of the batch size histogram buckets in orders.
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+# The buckets of the histograms that are not latencies, by the metric name.
+HISTOGRAM_BUCKETS = {
+    "delivery_fee_micro_batch_size": BATCH_SIZE_BUCKETS,
+}
+
+METRICS = {
+    "delivery_fee_requests_total": ("counter", "Requests to the pricing endpoints."),
+    "delivery_fee_orders_total": ("counter", "Orders priced or rejected by the pricing endpoints."),
+    "delivery_fee_errors_total": ("counter", "Rejected requests and orders by the error message."),
+    "delivery_fee_request_seconds": ("histogram", "Time spent in the pricing endpoints."),
+    "delivery_fee_stage_seconds": ("histogram", "Time spent in each stage of pricing a single order."),
+    "delivery_fee_micro_batch_size": ("histogram", "Single orders priced together in one micro-batch."),
+}
+
+
+class MetricsShard:
+    """The counters and histograms of one thread. Only the owning thread writes to a shard,
+    so recording a metric needs no lock.
+    """
+
+    __slots__ = ("counters", "histograms")
+
+    def __init__(self):
+        self.counters = {}
+        # Every histogram is a list of the bucket counts, the count of the +Inf bucket and the sum.
+        self.histograms = {}
+
+
+class Metrics:
+    """Request metrics in the Prometheus text format. The metrics are identified by the metric name
+    and the labels, e.g. 'delivery_fee_errors_total{error="Cart value must be a positive integer."}'.
+
+    Every thread records to its own shard, and the shards are summed only when the metrics are read.
+    The shards of threads that have ended are folded into one retired snapshot when the metrics are read
+    or a new thread records its first metric, so threads that come and go do not keep their shards forever.
+    With multiple worker processes, every worker flushes its snapshot to a file in the metrics
+    directory, and the worker serving /metrics sums its own metrics with the files of the others.
+    """
+
+    def __init__(self, directory: str = ""):
+        """
+        Args:
+            directory: The directory the snapshots of the workers are flushed to, "" for a single process.
+        """
+        self.directory = directory
+        self._local = threading.local()
+        # The shards of the running threads, as (thread, shard) pairs.
+        self._shards = []
+        self._retired = {"counters": {}, "histograms": {}}
+        self._shards_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def _shard(self) -> MetricsShard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = MetricsShard()
+            self._local.shard = shard
+            with self._shards_lock:
+                self._retire_ended_shards()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _retire_ended_shards(self):
+        """Folds the shards of the threads that have ended into the retired metrics. A thread that has ended
+        no longer writes to its shard. Called with the shards lock held.
+        """
+        ended_shards = [shard_snapshot(shard) for thread, shard in self._shards if not thread.is_alive()]
+        if ended_shards:
+            self._retired = merge_snapshots([self._retired, *ended_shards])
+            self._shards = [(thread, shard) for thread, shard in self._shards if thread.is_alive()]
+
+    def increment(self, key: str, amount: int = 1):
+        counters = self._shard().counters
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe(self, key: str, value: float, buckets: tuple = BUCKETS):
+        """Records a value to a histogram, by default a latency in seconds. Histograms with other
+        buckets must be listed in HISTOGRAM_BUCKETS, so they are rendered with the same buckets.
+        """
+        histograms = self._shard().histograms
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = [0] * (len(buckets) + 2)
+        histogram[bisect_left(buckets, value)] += 1
+        histogram[-1] += value
+
+    def count_errors(self, results: list):
+        """Counts the error messages of the priced orders of a batch or a stream.
+        """
+        for result in results:
+            if result.__class__ is str:
+                self.increment(f'delivery_fee_errors_total{{error="{escape_label(result)}"}}')
+
+    def snapshot(self) -> dict:
+        """The metrics of this process, summed from the shards of all the threads.
+        """
+        with self._shards_lock:
+            self._retire_ended_shards()
+            shards = [shard for _, shard in self._shards]
+            retired = self._retired
+        return merge_snapshots([retired, *(shard_snapshot(shard) for shard in shards)])
+
+    def snapshot_path(self, pid: int) -> str:
+        return os.path.join(self.directory, f"metrics-{pid}.json")
+
+    def flush(self):
+        """Writes the snapshot of this process to the metrics directory. The file is replaced atomically,
+        so a worker reading it never sees a partial snapshot.
+        """
+        path = self.snapshot_path(os.getpid())
+        with open(f"{path}.tmp", "w") as snapshot_file:
+            json.dump(self.snapshot(), snapshot_file)
+        os.replace(f"{path}.tmp", path)
+
+    def collect(self) -> dict:
+        """The metrics of all the workers: the snapshot of this process and the flushed snapshots
+        of the other workers in the metrics directory.
+        """
+        snapshots = [self.snapshot()]
+        if self.directory:
+            own_path = self.snapshot_path(os.getpid())
+            for path in glob.glob(self.snapshot_path("*")):
+                if path == own_path:
+                    continue
+                try:
+                    with open(path) as snapshot_file:
+                        snapshots.append(json.load(snapshot_file))
+                except (OSError, ValueError):
+                    continue
+        return merge_snapshots(snapshots)
+
+    def render(self) -> str:
+        """The collected metrics in the Prometheus text exposition format.
+        """
+        return render_snapshot(self.collect())
+
+    def start(self, interval: float):
+        """Flushes the snapshot to the metrics directory every interval seconds in a background thread.
+        """
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._flush_periodically, args=(interval,), name="metrics-flusher",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            self.flush()
+
+    def _flush_periodically(self, interval: float):
+        while not self._stopped.wait(interval):
+            try:
+                self.flush()
+            except OSError as exc:
+                print(f"Could not flush the metrics: {exc}")
+
+
+def shard_snapshot(shard: MetricsShard) -> dict:
+    """Copies the metrics of a shard. Copying a dict or a list is atomic, so the shard can be read
+    while its thread writes to it.
+    """
+    return {"counters": shard.counters.copy(),
+            "histograms": {key: list(histogram) for key, histogram in shard.histograms.copy().items()}}
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def merge_snapshots(snapshots: list) -> dict:
+    """Sums the counters and histograms of the snapshots.
+    """
+    counters = {}
+    histograms = {}
+    for snapshot in snapshots:
+        for key, value in snapshot["counters"].items():
+            counters[key] = counters.get(key, 0) + value
+        for key, histogram in snapshot["histograms"].items():
+            total = histograms.get(key)
+            if total is None:
+                histograms[key] = list(histogram)
+            else:
+                histograms[key] = [count + other for count, other in zip(total, histogram)]
+    return {"counters": counters, "histograms": histograms}
+
+
+def render_snapshot(snapshot: dict) -> str:
+    """Renders a snapshot in the Prometheus text exposition format, with HELP and TYPE lines for every metric.
+    """
+    series = {}
+    for key, value in snapshot["counters"].items():
+        series.setdefault(key.partition("{")[0], []).append((key, [f"{key} {value}"]))
+    for key, histogram in snapshot["histograms"].items():
+        name, _, labels = key.partition("{")
+        labels = labels[:-1]
+        label_prefix = f"{labels}," if labels else ""
+        lines = []
+        series.setdefault(name, []).append((key, lines))
+        cumulative = 0
+        for bound, count in zip(HISTOGRAM_BUCKETS.get(name, BUCKETS) + ("+Inf",), histogram):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{label_prefix}le="{bound}"}} {cumulative}')
+        label_suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{label_suffix} {histogram[-1]}")
+        lines.append(f"{name}_count{label_suffix} {cumulative}")
+
+    output = []
+    for name in sorted(series):
+        metric_type, help_text = METRICS.get(name, ("untyped", ""))
+        output.append(f"# HELP {name} {help_text}")
+        output.append(f"# TYPE {name} {metric_type}")
+        for _, lines in sorted(series[name]):
+            output.extend(lines)
+    return "\n".join(output) + "\n" if output else ""
+
+
+def clear_metrics_directory(directory: str):
+    """Creates the metrics directory, and removes the snapshots of a previous run so they are not summed
+    with the new workers.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "metrics-*.json")):
+        os.remove(path)
@@ -0,0 +1,61 @@
+import asyncio
+
+
+class MicroBatcher:
+    """Coalesces items submitted concurrently on the event loop into batches, e.g. the orders of
+    concurrent single order requests, and processes every batch with one call.
+
+    A batch is processed when it has max_batch_size items, or max_wait seconds after its first item
+    was submitted, whichever comes first. Every caller waits for the result of its own item, so the
+    extra latency of a request is at most max_wait. The batches are processed on the event loop,
+    so process_batch must be short and never wait for I/O.
+    """
+
+    def __init__(self, process_batch, max_batch_size: int, max_wait: float):
+        """
+        Args:
+            process_batch: Function that takes a list of items and returns a list with the result of every item.
+            max_batch_size: The maximum amount of items in a batch.
+            max_wait: The maximum seconds to wait for more items after the first item of a batch.
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending = []
+        self._timer = None
+
+    async def submit(self, item):
+        """Adds the item to the current batch and waits for its result.
+
+        Raises:
+            Exception: The exception of process_batch, if it failed for the batch of the item.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self.flush)
+        return await future
+
+    def flush(self):
+        """Processes the pending items as one batch and resolves the future of every item.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            results = self.process_batch([item for item, _ in pending])
+        except Exception as exc:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), result in zip(pending, results):
+            # The future of a caller that was cancelled, e.g. because the client disconnected, is already done.
+            if not future.done():
+                future.set_result(result)
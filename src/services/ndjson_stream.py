@@ -0,0 +1,64 @@
+from typing import AsyncIterator
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """Streaming response for NDJSON, that can be sent while the request body is still being read.
+
+    StreamingResponse listens for the client disconnecting by reading the request messages,
+    which would take chunks of a request body that is streamed at the same time. This response
+    only sends, and the disconnect is noticed by the request stream instead.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_length: int) -> AsyncIterator[list]:
+    """Splits a stream of body chunks to lines. The complete lines of every chunk are yielded together,
+    and only the unfinished last line is kept between chunks, so memory use does not grow with the body.
+    Empty lines are skipped.
+
+    A line longer than max_line_length bytes is yielded as None as soon as it is too long, and the rest
+    of it is dropped until the next newline, so a body without newlines cannot fill the memory.
+    """
+    parts = []  # The pieces of the unfinished last line, joined once the line is complete.
+    length = 0
+    skipping = False
+    async for chunk in chunks:
+        lines = chunk.split(b"\n")
+        last = lines.pop()
+        complete_lines = []
+        for index, line in enumerate(lines):
+            if index == 0:
+                if skipping:
+                    skipping = False
+                    continue
+                if parts:
+                    line = b"".join(parts) + line
+                    parts = []
+                    length = 0
+            if len(line) > max_line_length:
+                complete_lines.append(None)
+            elif line.strip():
+                complete_lines.append(line)
+        if not skipping and last:
+            length += len(last)
+            if length > max_line_length:
+                complete_lines.append(None)
+                parts = []
+                length = 0
+                skipping = True
+            else:
+                parts.append(last)
+        if complete_lines:
+            yield complete_lines
+    if parts:
+        line = b"".join(parts)
+        if line.strip():
+            yield [line]
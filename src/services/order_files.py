@@ -0,0 +1,16 @@
+import json
+
+
+def read_orders(path: str):
+    """Yields the line number and the order of every line of a JSONL file, None for lines that cannot be parsed as JSON.
+    Empty lines are skipped.
+    """
+    with open(path) as orders_file:
+        for line_number, line in enumerate(orders_file, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except (ValueError, RecursionError):
+                # Deeply nested JSON exceeds the recursion limit of the parser.
+                yield line_number, None
@@ -0,0 +1,62 @@
+from models.parsed_order import ParsedOrder
+from services.fee_cache import FeeCache
+from services.fee_policy import FeePolicy, get_fee_policies
+from services.request_validator import DeliveryRequestValidator
+
+ORDER_FIELDS = ("cart_value", "delivery_distance", "number_of_items", "time")
+MISSING_FIELDS_ERROR = "Order must be an object with cart_value, delivery_distance, number_of_items and time."
+INVALID_JSON_ERROR = "Order must be valid JSON."
+UNKNOWN_POLICY_ERROR = "Fee policy does not exist."
+
+
+def select_fee_policy(fee_policy: FeePolicy, delivery: dict) -> FeePolicy | None:
+    """Selects the named policy of the order's optional policy_id field, see FEE_POLICIES_PATH.
+
+    Returns:
+        FeePolicy | None: The named policy, the given default policy if the order has no policy_id,
+        or None if the policy does not exist.
+    """
+    policy_id = delivery.get("policy_id")
+    if policy_id is None:
+        return fee_policy
+    if not isinstance(policy_id, str):
+        return None
+    return get_fee_policies().get(policy_id)
+
+
+def calculate_delivery_fee(fee_policy: FeePolicy, order: ParsedOrder, fee_cache: FeeCache | None = None) -> int:
+    """Calculates the fee of a validated order with the policy, through the fee cache if one is given.
+    """
+    if fee_cache is None:
+        return fee_policy.calculate_delivery_fee_at(*order)
+    return fee_cache.get_delivery_fee(fee_policy, *order)
+
+
+def calculate_delivery_fees(policy_orders: list, fee_cache: FeeCache | None = None) -> list:
+    """Calculates the fees of validated orders, given as (fee policy, order) pairs, e.g. a micro-batch
+    of single order requests.
+    """
+    if fee_cache is None:
+        return [fee_policy.calculate_delivery_fee_at(*order) for fee_policy, order in policy_orders]
+    return [fee_cache.get_delivery_fee(fee_policy, *order) for fee_policy, order in policy_orders]
+
+
+def price_order(validator: DeliveryRequestValidator, fee_policy: FeePolicy, delivery,
+                fee_cache: FeeCache | None = None) -> int | str:
+    """Validates and prices one order of a batch, a stream or an order file, with the named policy
+    of the order if it has a policy_id and otherwise with fee_policy.
+
+    Returns:
+        int | str: The delivery fee, or the error message if the order is not valid.
+    """
+    if not isinstance(delivery, dict):
+        return MISSING_FIELDS_ERROR
+    request_validity, order = validator.parse_delivery_request(delivery_request=delivery)
+    if order is None:
+        if not all(field in delivery for field in ORDER_FIELDS):
+            return MISSING_FIELDS_ERROR
+        return request_validity
+    fee_policy = select_fee_policy(fee_policy=fee_policy, delivery=delivery)
+    if fee_policy is None:
+        return UNKNOWN_POLICY_ERROR
+    return calculate_delivery_fee(fee_policy=fee_policy, order=order, fee_cache=fee_cache)
@@ -0,0 +1,102 @@
+import os
+import struct
+from array import array
+import numpy as np
+from services.request_validator import DeliveryRequestValidator
+
+MAGIC = b"ORDERS01"
+HEADER = struct.Struct("<8sQ")  # The magic and the amount of orders.
+COLUMNS = ("order_indexes", "cart_values", "delivery_distances", "numbers_of_items", "seconds_of_week")
+INT32_MAX = 2 ** 31 - 1
+SECONDS_IN_DAY = 86400
+MICROSECONDS_IN_SECOND = 1000000
+
+
+def write_order_store(path: str, orders) -> tuple:
+    """Writes the valid orders to a columnar order store file, see OrderStore. The times are stored
+    as the second of the week, so they are never parsed again. Orders that are not valid, or with
+    values over the int32 range, are skipped, and the index of every stored order in orders is kept.
+    The file is written to a temporary file first and then renamed, so readers never see a partial file.
+
+    Returns:
+        tuple: The amount of stored orders and the amount of skipped orders.
+    """
+    validator = DeliveryRequestValidator()
+    columns = {name: array("i") for name in COLUMNS}
+    skipped_orders = 0
+    for order_index, delivery in enumerate(orders):
+        if not isinstance(delivery, dict):
+            skipped_orders += 1
+            continue
+        _, order = validator.parse_delivery_request(delivery_request=delivery)
+        if order is None or max(order.cart_value, order.delivery_distance, order.number_of_items, order_index) > INT32_MAX:
+            skipped_orders += 1
+            continue
+        columns["order_indexes"].append(order_index)
+        columns["cart_values"].append(order.cart_value)
+        columns["delivery_distances"].append(order.delivery_distance)
+        columns["numbers_of_items"].append(order.number_of_items)
+        columns["seconds_of_week"].append(order.weekday * SECONDS_IN_DAY + order.second_of_day)
+
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as store_file:
+        store_file.write(HEADER.pack(MAGIC, len(columns["order_indexes"])))
+        for name in COLUMNS:
+            store_file.write(np.asarray(columns[name], dtype="<i4").tobytes())
+    os.replace(temporary_path, path)
+    return len(columns["order_indexes"]), skipped_orders
+
+
+def is_order_store(path: str) -> bool:
+    """Checks if the file starts like an order store file.
+    """
+    with open(path, "rb") as store_file:
+        return store_file.read(len(MAGIC)) == MAGIC
+
+
+class OrderStore:
+    """Read-only columnar order store, memory-mapped from a file written with write_order_store.
+
+    The file has a 16 byte header (the magic and the amount of orders) followed by the columns
+    as little-endian int32 arrays, one after the other: the index of the order in the original
+    orders, the cart values, the delivery distances, the amounts of items and the second of the
+    week of the time (0 = Monday 00:00:00 UTC). Opening a store only maps the file, nothing is
+    parsed or copied, and processes that map the same file share its pages in the page cache.
+    """
+
+    def __init__(self, path: str):
+        """
+        Raises:
+            ValueError: If the file is not an order store file or it is truncated.
+        """
+        with open(path, "rb") as store_file:
+            header = store_file.read(HEADER.size)
+            file_size = os.fstat(store_file.fileno()).st_size
+        if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not an order store file.")
+        _, order_count = HEADER.unpack(header)
+        if file_size < HEADER.size + len(COLUMNS) * 4 * order_count:
+            raise ValueError(f"{path} is truncated.")
+        if order_count:
+            self._columns = np.memmap(path, dtype="<i4", mode="r", offset=HEADER.size, shape=(len(COLUMNS), order_count))
+        else:
+            # An empty file region cannot be mapped.
+            self._columns = np.zeros((len(COLUMNS), 0), dtype="<i4")
+        self.path = path
+        (self.order_indexes, self.cart_values, self.delivery_distances, self.numbers_of_items,
+         self.seconds_of_week) = self._columns
+
+    def __len__(self) -> int:
+        return self._columns.shape[1]
+
+    @property
+    def weekdays(self) -> np.ndarray:
+        """The weekdays of the times, 0 = Monday,..., 6 = Sunday.
+        """
+        return self.seconds_of_week // SECONDS_IN_DAY
+
+    @property
+    def microseconds_of_day(self) -> np.ndarray:
+        """The times of the day in microseconds, like VectorizedFeeCalculator.parse_times.
+        """
+        return (self.seconds_of_week % SECONDS_IN_DAY).astype(np.int64) * MICROSECONDS_IN_SECOND
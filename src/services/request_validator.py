@@ -1,4 +1,10 @@
-import datetime
+from models.parsed_order import ParsedOrder
+from services.time_parser import parse_time
+
+CART_VALUE_ERROR = "Cart value must be a positive integer."
+DELIVERY_DISTANCE_ERROR = "Delivery distance must be a positive integer."
+NUMBER_OF_ITEMS_ERROR = "Number of items must be an integer with a value over 1."
+TIME_ERROR = "Time must be string type in UTC, ISO 8601 format."
 
 
 class DeliveryRequestValidator:
@@ -6,18 +12,38 @@ class DeliveryRequestValidator:
         self._error = "valid"
 
     def valid_delivery_request(self, delivery_request: dict) -> str:
-        """Checks if the delivery request is valid.
+        """Checks if the delivery request is valid. The error is reset on every call,
+        so the same validator can be reused for multiple requests.
         """
-        if self.valid_cart_value(delivery_request["cart_value"]) is False:
-            self._error = "Cart value must be a positive integer."
-        if self.valid_delivery_distance(delivery_request["delivery_distance"]) is False:
-            self._error = "Delivery distance must be a positive integer."
-        if self.valid_number_of_items(delivery_request["number_of_items"]) is False:
-            self._error = "Number of items must be an integer with a value over 1."
-        if self.valid_time(delivery_request["time"]) is False:
-            self._error = "Time must be string type in UTC, ISO 8601 format."
+        self._error, _ = self.parse_delivery_request(delivery_request=delivery_request)
         return self._error
 
+    def parse_delivery_request(self, delivery_request: dict) -> tuple:
+        """Validates the delivery request and parses it to an order in a single pass. The checks are the same
+        as in the valid_* methods, and if multiple fields are not valid, the error of the last one is returned.
+        Missing fields are not valid.
+
+        Returns:
+            tuple: "valid" and the ParsedOrder, or the error message and None if the request is not valid.
+        """
+        cart_value = delivery_request.get("cart_value")
+        delivery_distance = delivery_request.get("delivery_distance")
+        number_of_items = delivery_request.get("number_of_items")
+        parsed_time = parse_time(delivery_request.get("time"))
+
+        error = "valid"
+        if not isinstance(cart_value, int) or cart_value < 0:
+            error = CART_VALUE_ERROR
+        if not isinstance(delivery_distance, int) or delivery_distance < 0:
+            error = DELIVERY_DISTANCE_ERROR
+        if not isinstance(number_of_items, int) or number_of_items < 1:
+            error = NUMBER_OF_ITEMS_ERROR
+        if parsed_time is None:
+            error = TIME_ERROR
+        if error != "valid":
+            return error, None
+        return error, ParsedOrder(cart_value, delivery_distance, number_of_items, *parsed_time)
+
     def valid_cart_value(self, cart_value) -> bool:
         """Checks if the cart value is a positive integer.
         """
@@ -48,10 +74,4 @@ class DeliveryRequestValidator:
     def valid_time(self, time) -> bool:
         """Checks if the time is in right format (UTC, ISO 8601)
         """
-        if not isinstance(time, str):
-            return False
-        try:
-            datetime.datetime.strptime(time, "%Y-%m-%dT%H:%M:%SZ")
-            return True
-        except ValueError:
-            return False
+        return parse_time(time) is not None
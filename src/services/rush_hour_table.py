@@ -0,0 +1,85 @@
+import weakref
+from bisect import bisect_right
+from services.time_parser import seconds_of_day
+
+BASIS_POINTS = 10000  # A multiplier of 1.0 in basis points.
+
+
+class RushHourTable:
+    """Rush hours compiled to a lookup table. For every weekday the table has the sorted seconds
+    of the day where the active rush hours change, and the rounded multiplier from each of them
+    until the next one. Looking up a multiplier is a binary search, however many rush hours there are.
+    The multipliers are also stored as integer basis points (1.2 = 12000) for the integer fee mode.
+    """
+
+    __slots__ = ("breakpoints", "multipliers", "basis_points", "__weakref__")
+
+    def __init__(self, rush_hours: list):
+        """Compiles the rush hours. The multiplier of each interval is the product of the fees
+        of the rush hours covering it, multiplied in the config order and rounded to one decimal,
+        like in FeeCalculator.calculate_rush_hour_surcharge_multiplier.
+        """
+        windows = [
+            (rush_hour.day, seconds_of_day(rush_hour.start, round_up=True), seconds_of_day(rush_hour.end), rush_hour.fee)
+            for rush_hour in rush_hours
+        ]
+        breakpoints = []
+        multipliers = []
+        for weekday in range(7):
+            day_windows = [(start, end, fee) for day, start, end, fee in windows if day == weekday and start <= end]
+            # Rush hours include both the start and the end second, so each one changes
+            # the multiplier at its start and one second after its end.
+            candidate_breakpoints = sorted({0} | {start for start, _, _ in day_windows}
+                                           | {end + 1 for _, end, _ in day_windows if end + 1 < 86400})
+            day_breakpoints = []
+            day_multipliers = []
+            for interval_start in candidate_breakpoints:
+                surcharge_multiplier = 1
+                for start, end, fee in day_windows:
+                    if start <= interval_start <= end:
+                        surcharge_multiplier *= fee
+                surcharge_multiplier = round(float(surcharge_multiplier), 1)
+                # Neighbouring intervals with the same multiplier are merged.
+                if day_multipliers and day_multipliers[-1] == surcharge_multiplier:
+                    continue
+                day_breakpoints.append(interval_start)
+                day_multipliers.append(surcharge_multiplier)
+            breakpoints.append(tuple(day_breakpoints))
+            multipliers.append(tuple(day_multipliers))
+        super().__setattr__("breakpoints", tuple(breakpoints))
+        super().__setattr__("multipliers", tuple(multipliers))
+        # The multipliers are rounded to one decimal, so they are exact in basis points.
+        super().__setattr__("basis_points", tuple(tuple(round(surcharge_multiplier * BASIS_POINTS)
+                                                        for surcharge_multiplier in day_multipliers)
+                                                  for day_multipliers in multipliers))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RushHourTable is immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError("RushHourTable is immutable.")
+
+    def multiplier(self, weekday: int, second_of_day: int) -> float:
+        """The rounded rush hour multiplier of a weekday (0 = Monday,..., 6 = Sunday) and second of the day.
+        """
+        return self.multipliers[weekday][bisect_right(self.breakpoints[weekday], second_of_day) - 1]
+
+    def multiplier_basis_points(self, weekday: int, second_of_day: int) -> int:
+        """The rush hour multiplier like multiplier, as integer basis points.
+        """
+        return self.basis_points[weekday][bisect_right(self.breakpoints[weekday], second_of_day) - 1]
+
+
+_rush_hour_tables = weakref.WeakValueDictionary()
+
+
+def compile_rush_hour_table(rush_hours: list) -> RushHourTable:
+    """Returns the compiled table of the rush hours. Policies with the same rush hours share one table,
+    so thousands of policies do not each keep their own copy. A table is dropped when no policy uses it.
+    """
+    key = tuple((rush_hour.day, rush_hour.start, rush_hour.end, rush_hour.fee) for rush_hour in rush_hours)
+    rush_hour_table = _rush_hour_tables.get(key)
+    if rush_hour_table is None:
+        rush_hour_table = RushHourTable(rush_hours)
+        _rush_hour_tables[key] = rush_hour_table
+    return rush_hour_table
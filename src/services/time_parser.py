@@ -0,0 +1,34 @@
+import re
+from datetime import datetime
+
+TIME_FORMAT = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z", re.ASCII)
+
+
+def parse_time(time) -> tuple | None:
+    """Parses a time in the fixed UTC, ISO 8601 format "YYYY-MM-DDTHH:MM:SSZ".
+    The format is strict: every field is zero-padded ASCII digits and the separators
+    and the "Z" suffix are required.
+
+    Returns:
+        tuple: The weekday (0 = Monday,..., 6 = Sunday) and the second of the day,
+        or None if the time is not a valid time in the format.
+    """
+    if not isinstance(time, str) or TIME_FORMAT.fullmatch(time) is None:
+        return None
+    try:
+        # The shape is already checked, so fromisoformat only checks the ranges of the values.
+        parsed = datetime.fromisoformat(time[:19])
+    except ValueError:
+        return None
+    return parsed.weekday(), (parsed.hour * 60 + parsed.minute) * 60 + parsed.second
+
+
+def seconds_of_day(time_of_day, round_up: bool = False) -> int:
+    """Converts a datetime.time to whole seconds since midnight. Microseconds are dropped,
+    or rounded up to the next second with round_up, so that comparisons with parsed times
+    give the same results as comparisons with the datetime.time.
+    """
+    seconds = (time_of_day.hour * 60 + time_of_day.minute) * 60 + time_of_day.second
+    if round_up and time_of_day.microsecond:
+        seconds += 1
+    return seconds
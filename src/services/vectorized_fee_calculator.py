@@ -0,0 +1,146 @@
+import numpy as np
+from services.rush_hour_table import BASIS_POINTS
+from services.fee_config_loader import environment_config
+from settings import settings
+
+SECONDS_IN_DAY = 86400
+MICROSECONDS_IN_SECOND = 1000000
+EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday, 0 = Monday,..., 6 = Sunday
+
+
+class VectorizedFeeCalculator:
+    """This class makes the same calculations as FeeCalculator, but for whole columns
+    of orders at once with NumPy. The results are identical to FeeCalculator, so it can be used
+    for bulk pricing, e.g. re-pricing historical orders.
+
+    The inputs are expected to be valid orders, validated e.g. with DeliveryRequestValidator.
+    """
+
+    def __init__(self, fee_config=None):
+        """
+        Args:
+            fee_config: The config to calculate with, e.g. a candidate config of a simulation.
+                By default config.py, or test_config.py in the test environment.
+        """
+        if fee_config is not None:
+            self.config = fee_config
+        else:
+            self.config = environment_config(settings.ENVIRONMENT)
+        self.integer_fees = settings.INTEGER_FEES
+
+    def calculate_delivery_fees(self, cart_values, delivery_distances, numbers_of_items, times) -> np.ndarray:
+        """Calculates the delivery fees for arrays of orders. The steps are the same as in
+        FeeCalculator.calculate_total_delivery_fee, done for all the orders at once.
+
+        Args:
+            cart_values: Array-like of cart values in cents.
+            delivery_distances: Array-like of delivery distances in meters.
+            numbers_of_items: Array-like of item amounts.
+            times: Array-like of times as strings in UTC, ISO 8601 format, or as datetime64 values.
+
+        Returns:
+            np.ndarray: The total delivery fees in cents as int64 values.
+        """
+        weekdays, microseconds_of_day = self.parse_times(times=times)
+        return self.calculate_delivery_fees_at(cart_values=cart_values, delivery_distances=delivery_distances,
+                                               numbers_of_items=numbers_of_items, weekdays=weekdays,
+                                               microseconds_of_day=microseconds_of_day)
+
+    def calculate_delivery_fees_at(self, cart_values, delivery_distances, numbers_of_items, weekdays,
+                                   microseconds_of_day) -> np.ndarray:
+        """Calculates the delivery fees like calculate_delivery_fees, for times already parsed with parse_times,
+        so the same orders can be priced with many configs while parsing the times once.
+
+        Returns:
+            np.ndarray: The total delivery fees in cents as int64 values.
+        """
+        cart_values = np.asarray(cart_values, dtype=np.int64)
+        delivery_distances = np.asarray(delivery_distances, dtype=np.int64)
+        numbers_of_items = np.asarray(numbers_of_items, dtype=np.int64)
+
+        total_delivery_fees = self.calculate_minimum_cart_value_surcharges(cart_values=cart_values)
+        total_delivery_fees += self.calculate_delivery_distance_surcharges(delivery_distances=delivery_distances)
+        total_delivery_fees += self.calculate_number_of_items_surcharges(numbers_of_items=numbers_of_items)
+        surcharge_multipliers = self.calculate_rush_hour_surcharge_multipliers_at(
+            weekdays=weekdays, microseconds_of_day=microseconds_of_day)
+        if self.integer_fees:
+            # Like FeePolicy with INTEGER_FEES, the multipliers are applied in basis points and rounded down.
+            surcharge_basis_points = np.rint(surcharge_multipliers * BASIS_POINTS).astype(np.int64)
+            total_delivery_fees = np.minimum(total_delivery_fees * surcharge_basis_points // BASIS_POINTS,
+                                             self.config.MAX_DELIVERY_FEE)
+        else:
+            # The multiplier is a float, so the fees are floats until the max fee check truncates them like int().
+            total_delivery_fees = total_delivery_fees * surcharge_multipliers
+            total_delivery_fees = np.trunc(np.minimum(total_delivery_fees, self.config.MAX_DELIVERY_FEE)).astype(np.int64)
+        total_delivery_fees[cart_values >= self.config.MIN_CART_VALUE_FOR_FREE_DELIVERY] = 0
+        return total_delivery_fees
+
+    def calculate_minimum_cart_value_surcharges(self, cart_values: np.ndarray) -> np.ndarray:
+        """Small order surcharges, the difference to the minimum cart value if the cart value is under it.
+        """
+        return np.maximum(self.config.MINIMUM_CART_VALUE - cart_values, 0)
+
+    def calculate_delivery_distance_surcharges(self, delivery_distances: np.ndarray) -> np.ndarray:
+        """Distance fees. The additional distances are counted with the same float division
+        and rounding upwards as in FeeCalculator.
+        """
+        delivery_distance_surcharges = np.where(delivery_distances < self.config.MINIMUM_DELIVERY_DISTANCE,
+                                                self.config.MINIMUM_DELIVERY_FEE,
+                                                self.config.DELIVERY_FEE_FOR_THE_FIRST_KM).astype(np.int64)
+        extra_charge_multipliers = np.ceil(
+            (delivery_distances - 1000) / self.config.ADDITIONAL_DISTANCE_AFTER_FIRST_KM).astype(np.int64)
+        delivery_distance_surcharges += np.where(delivery_distances > 1000,
+                                                 extra_charge_multipliers * self.config.DELIVERY_FEE_FOR_ADDITIONAL_DISTANCE,
+                                                 0)
+        return delivery_distance_surcharges
+
+    def calculate_number_of_items_surcharges(self, numbers_of_items: np.ndarray) -> np.ndarray:
+        """Surcharges for every item after PRODUCT_AMOUNT_FOR_SURCHARGE, and the bulk fee
+        for orders with more than BULK_AMOUNT items.
+        """
+        number_of_items_surcharges = np.maximum(numbers_of_items - self.config.PRODUCT_AMOUNT_FOR_SURCHARGE, 0) \
+            * self.config.SURCHARGE_FEE
+        number_of_items_surcharges += np.where(numbers_of_items > self.config.BULK_AMOUNT, self.config.BULK_CHARGE_FEE, 0)
+        return number_of_items_surcharges
+
+    def calculate_rush_hour_surcharge_multipliers(self, times) -> np.ndarray:
+        """Rush hour multipliers. The fees of all the rush hours the order falls into are multiplied
+        in the config order, and the product is rounded with Python's round like in FeeCalculator.
+        """
+        weekdays, microseconds_of_day = self.parse_times(times=times)
+        return self.calculate_rush_hour_surcharge_multipliers_at(weekdays=weekdays,
+                                                                 microseconds_of_day=microseconds_of_day)
+
+    def calculate_rush_hour_surcharge_multipliers_at(self, weekdays: np.ndarray,
+                                                     microseconds_of_day: np.ndarray) -> np.ndarray:
+        """Rush hour multipliers like calculate_rush_hour_surcharge_multipliers, for parsed times.
+        """
+        surcharge_multipliers = np.ones(weekdays.shape, dtype=np.float64)
+        for rush_time in self.config.RUSH_HOURS:
+            in_rush_hour = (weekdays == rush_time.day) \
+                & (microseconds_of_day >= self.microseconds_of_day(rush_time.start)) \
+                & (microseconds_of_day <= self.microseconds_of_day(rush_time.end))
+            surcharge_multipliers[in_rush_hour] *= rush_time.fee
+        # np.round rounds differently than round() for some floats, but there are only a few
+        # distinct multipliers, so they are rounded one by one with round().
+        unique_multipliers, inverse = np.unique(surcharge_multipliers, return_inverse=True)
+        rounded_multipliers = np.array([round(float(multiplier), 1) for multiplier in unique_multipliers],
+                                       dtype=np.float64)
+        return rounded_multipliers[inverse].reshape(surcharge_multipliers.shape)
+
+    def parse_times(self, times) -> tuple:
+        """Parses the times to weekdays and microseconds of the day.
+        Strings are truncated to the "YYYY-MM-DDTHH:MM:SS" part, dropping the UTC "Z" suffix.
+        """
+        times = np.asarray(times)
+        if not np.issubdtype(times.dtype, np.datetime64):
+            times = times.astype("U19")
+        seconds = times.astype("datetime64[s]").astype(np.int64)
+        days, seconds_of_day = np.divmod(seconds, SECONDS_IN_DAY)
+        return (days + EPOCH_WEEKDAY) % 7, seconds_of_day * MICROSECONDS_IN_SECOND
+
+    def microseconds_of_day(self, time_of_day) -> int:
+        """Converts a datetime.time to microseconds since midnight.
+        """
+        return ((time_of_day.hour * 60 + time_of_day.minute) * 60 + time_of_day.second) * MICROSECONDS_IN_SECOND \
+            + time_of_day.microsecond
@@ -0,0 +1,43 @@
+from services.fee_encoder import encode_delivery_fee, encode_fee_breakdown, encode_results
+from services.fee_policy import get_fee_policies, get_fee_policy
+from services.order_pricer import price_order
+from services.request_validator import DeliveryRequestValidator
+
+# Synthetic orders that go through every branch of the validation and the fee calculation: the small order
+# surcharge, the additional distance, the item surcharge and the bulk fee, the rush hour, the max fee,
+# free delivery, a long distance, and orders that are not valid.
+WARMUP_ORDERS = (
+    {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"},
+    {"cart_value": 1000, "delivery_distance": 499, "number_of_items": 13, "time": "2024-01-19T15:00:00Z"},
+    {"cart_value": 100, "delivery_distance": 30000, "number_of_items": 100, "time": "2024-01-19T18:59:59Z"},
+    {"cart_value": 20000, "delivery_distance": 1501, "number_of_items": 1, "time": "2024-01-21T23:59:59Z"},
+    {"cart_value": 1500, "delivery_distance": 1000, "number_of_items": 5, "time": "2024-02-30T10:00:00Z"},
+    {"cart_value": -1, "delivery_distance": 1000, "number_of_items": 0, "time": "2024-01-15T13:00:00"},
+    {"cart_value": 1500},
+)
+
+
+def warm_up(validator: DeliveryRequestValidator) -> int:
+    """Compiles the fee policy and the named policies, which also validates their configs,
+    and runs the synthetic orders through the validation, every fee policy, the fee breakdown
+    and the encoders, so the first requests do not pay for anything built on first use.
+    The fee cache and the metrics are not touched.
+
+    Returns:
+        int: The amount of priced synthetic orders.
+
+    Raises:
+        InvalidConfigException: If a config is not valid.
+    """
+    priced_orders = 0
+    for fee_policy in (get_fee_policy(), *get_fee_policies().values()):
+        results = [price_order(validator=validator, fee_policy=fee_policy, delivery=delivery)
+                   for delivery in WARMUP_ORDERS]
+        encode_results(results)
+        for delivery in WARMUP_ORDERS:
+            _, order = validator.parse_delivery_request(delivery_request=delivery)
+            if order is not None:
+                encode_delivery_fee(fee_policy.calculate_delivery_fee_at(*order))
+                encode_fee_breakdown(fee_policy.calculate_fee_breakdown_at(*order))
+        priced_orders += len(results)
+    return priced_orders
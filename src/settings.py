@@ -3,6 +3,25 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     ENVIRONMENT: str = "dev"
+    HOST: str = "0.0.0.0"  # The address the server listens on.
+    PORT: int = 8000  # The port the server listens on.
+    WORKERS: int = 0  # The amount of worker processes, 0 starts one worker per CPU.
+    BACKLOG: int = 2048  # The maximum amount of connections waiting to be accepted.
+    REUSE_PORT: bool = False  # Bind a socket per worker with SO_REUSEPORT instead of sharing one socket.
+    MAX_BATCH_SIZE: int = 100000  # The maximum amount of orders priced in one batch request.
+    MAX_STREAM_LINE_LENGTH: int = 65536  # The maximum length of an order line in a stream request in bytes.
+    ASYNC_ENDPOINTS: bool = False  # Run the single order endpoint on the event loop instead of the threadpool.
+    MICRO_BATCH_SIZE: int = 0  # The maximum amount of concurrent single orders priced together, 0 disables micro-batching.
+    MICRO_BATCH_WAIT: int = 200  # Microseconds a micro-batch waits for more orders after its first order.
+    FEE_CONFIG_PATH: str = ""  # JSON or TOML fee config file used instead of config.py, watched for changes.
+    FEE_CONFIG_POLL_INTERVAL: float = 1  # Seconds between checks of the fee config and policies files for changes.
+    FEE_POLICIES_PATH: str = ""  # JSON or TOML file of named fee policies, selected with policy_id, watched for changes.
+    FEE_TABLE_MAX_ITEMS: int = 100  # Amounts of items up to this have a precomputed item fee.
+    INTEGER_FEES: bool = False  # Apply the rush hour multipliers in integer basis points instead of floats.
+    FEE_CACHE_SIZE: int = 0  # The maximum amount of cached fees, 0 disables the fee cache.
+    FEE_CACHE_TTL: float = 0  # Seconds a fee is kept in the fee cache, 0 keeps the fees until they are dropped.
+    METRICS_DIR: str = ""  # Directory the workers flush their metrics to, so /metrics covers all the workers.
+    METRICS_FLUSH_INTERVAL: float = 1  # Seconds between flushes of the metrics of a worker to METRICS_DIR.
 
 
 settings = Settings()
@@ -0,0 +1,103 @@
+"""What-if simulation of candidate fee configs over historical orders.
+
+The orders of a JSONL file (one order per line), or of an order store file written with convert_orders.py,
+are priced with the current fee config, the baseline, and with every candidate config file (TOML or JSON,
+like FEE_CONFIG_PATH). A candidate only needs the values that differ from the current config, e.g.
+```SURCHARGE_FEE = 60```. All the configs price the same parsed order columns at once, without
+FeeCalculator calls per order. The report lists the total, mean, median and 90th percentile fee of every
+config, the change from the baseline and the amounts of orders whose fee goes up or down, and a fee
+histogram. With --deltas, the fee of every order with every config and the change from the baseline are
+written to a CSV file.
+
+Run from the src folder, e.g. ```python3 simulate_fees.py orders.jsonl candidate.toml --deltas deltas.csv```
+"""
+import argparse
+import csv
+from services.config_validator import InvalidConfigException
+from services.fee_config_loader import CONFIG_NAMES, parse_config, read_config_file
+from services.fee_policy import load_fee_config
+from services.fee_simulation import FeeSimulation
+from services.order_files import read_orders
+from services.order_store import OrderStore, is_order_store
+from settings import settings
+
+
+def format_report(result: dict, skipped_orders: int) -> str:
+    """The statistics of every config as a table, followed by the histograms.
+    """
+    lines = [f"{'config':<24} {'total':>12} {'change':>10} {'mean':>8} {'median':>8} {'p90':>8} "
+             f"{'free':>6} {'max fee':>8} {'higher':>7} {'lower':>7}"]
+    for name, statistics in result["configs"].items():
+        lines.append(f"{name:<24} {statistics['total']:>12} {statistics['total_change']:>+10} {statistics['mean']:>8.1f} "
+                     f"{statistics['median']:>8.1f} {statistics['p90']:>8.1f} {statistics['free_share']:>6.1%} "
+                     f"{statistics['max_fee_share']:>8.1%} {statistics['higher']:>7} {statistics['lower']:>7}")
+    edges = result["histogram_edges"]
+    lines.append("")
+    lines.append("Fee histogram (cents): " + ", ".join(f"{edges[i]:.0f}-{edges[i + 1]:.0f}" for i in range(len(edges) - 1)))
+    for name, statistics in result["configs"].items():
+        lines.append(f"{name:<24} " + " ".join(str(count) for count in statistics["histogram"]))
+    if skipped_orders:
+        lines.append("")
+        lines.append(f"{skipped_orders} orders that are not valid were skipped.")
+    return "\n".join(lines)
+
+
+def write_deltas(path: str, simulation: FeeSimulation, result: dict, names: list):
+    """Writes the order index, the fee with every config and the change from the baseline of every order.
+    """
+    with open(path, "w", newline="") as deltas_file:
+        writer = csv.writer(deltas_file)
+        writer.writerow(["order", *names, *(f"{name} change" for name in names[1:])])
+        columns = [simulation.order_indexes, *result["fees"], *result["deltas"][1:]]
+        writer.writerows(zip(*(column.tolist() for column in columns)))
+
+
+def load_candidate_config(path: str, baseline):
+    """Reads a candidate config file, with the values it does not set taken from the baseline config.
+
+    Raises:
+        InvalidConfigException: If the file cannot be read or a rush hour is not valid.
+    """
+    values = {name: getattr(baseline, name) for name in CONFIG_NAMES}
+    values["RUSH_HOURS"] = [rush_hour.model_dump() for rush_hour in baseline.RUSH_HOURS]
+    values.update(read_config_file(path))
+    return parse_config(values=values, source=path)
+
+
+def main(arguments: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("orders", help="JSONL or order store file of orders.")
+    parser.add_argument("candidates", nargs="+", help="Candidate fee config files, TOML or JSON, with the values to change.")
+    parser.add_argument("--bins", type=int, default=10, help="The amount of fee histogram bins.")
+    parser.add_argument("--deltas", default="", help="Writes the fees and the changes of every order to this CSV file.")
+    parsed_arguments = parser.parse_args(arguments)
+
+    try:
+        configs = {"current": load_fee_config(settings.ENVIRONMENT)}
+        for path in parsed_arguments.candidates:
+            configs[path] = load_candidate_config(path, configs["current"])
+        if is_order_store(parsed_arguments.orders):
+            order_store = OrderStore(parsed_arguments.orders)
+            simulation = FeeSimulation.from_order_store(order_store)
+            order_count = len(order_store)
+        else:
+            orders = [delivery for _, delivery in read_orders(parsed_arguments.orders)]
+            simulation = FeeSimulation.from_orders(orders)
+            order_count = len(orders)
+        result = simulation.run(configs, bins=max(parsed_arguments.bins, 1))
+    except InvalidConfigException as exc:
+        print("Could not simulate the fees, due to the following error:")
+        print(exc.name)
+        return 1
+    except ValueError as exc:
+        print(f"Could not read the orders: {exc}")
+        return 1
+
+    print(format_report(result, skipped_orders=order_count - len(simulation)))
+    if parsed_arguments.deltas:
+        write_deltas(parsed_arguments.deltas, simulation, result, list(configs))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
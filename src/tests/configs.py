@@ -0,0 +1,9 @@
+from types import SimpleNamespace
+import test_config
+
+
+def copy_config(config=test_config, **changes) -> SimpleNamespace:
+    """Copies the config values of a config module, test_config by default, with the given values changed.
+    """
+    values = {name: getattr(config, name) for name in dir(config) if name.isupper()}
+    return SimpleNamespace(**{**values, **changes})
@@ -1,8 +1,23 @@
 import unittest
+import asyncio
+import io
+import os
+import tempfile
+import time
+from contextlib import redirect_stdout
+from unittest import mock
 from settings import settings
 from fastapi.testclient import TestClient
+from services.fee_cache import FeeCache
+from services.fee_policy import FeePolicy, InvalidConfigException, set_fee_policies, set_fee_policy
+from services.metrics import Metrics
+from services.warmup import WARMUP_ORDERS, warm_up
+import main
+import test_config
 from main import app
 
+EXAMPLE_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "fee_config.example.toml")
+
 
 class TestApi(unittest.TestCase):
     def setUp(self):
@@ -39,6 +54,65 @@ class TestApi(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), {"delivery_fee": 0})
 
+    def test_invalid_fee_config(self):
+        """While the fee config is not valid, requests should get 503 with the config error.
+        """
+        error = InvalidConfigException(name="Error in fee_config.json: MAX_DELIVERY_FEE must be a positive integer.")
+        example_delivery = {"cart_value": 790, "delivery_distance": 2235,
+                            "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}
+        with mock.patch.object(main, "get_fee_policy", side_effect=error):
+            response = self.client.post("/", json=example_delivery)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), error.name)
+
+    def test_valid_delivery_fee_cache(self):
+        """With the fee cache enabled, the repeated order should get the same fee from the cache.
+        """
+        example_delivery = {"cart_value": 790, "delivery_distance": 2235,
+                            "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}
+        with mock.patch.object(main, "fee_cache", FeeCache(max_size=10)):
+            first_response = self.client.post("/", json=example_delivery)
+            second_response = self.client.post("/", json=example_delivery)
+            self.assertEqual((main.fee_cache.hits, main.fee_cache.misses), (1, 1))
+        self.assertEqual(first_response.json(), {"delivery_fee": 710})
+        self.assertEqual(second_response.json(), {"delivery_fee": 710})
+
+    def test_valid_delivery_breakdown(self):
+        """With ?breakdown=true, the components of the fee should be returned with it.
+        Example: 210 small order surcharge + 500 distance fee, during rush hour.
+        """
+        example_delivery = {"cart_value": 790, "delivery_distance": 2235,
+                            "number_of_items": 4, "time": "2024-01-19T15:00:01Z"}
+        response = self.client.post("/?breakdown=true", json=example_delivery)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"delivery_fee": 852, "breakdown": {
+            "small_order_surcharge": 210, "distance_fee": 500, "number_of_items_surcharge": 0, "bulk_fee": 0,
+            "rush_hour_multiplier": 1.2, "max_fee_applied": False, "free_delivery": False}})
+
+    def test_valid_delivery_async_endpoint(self):
+        """The async variant of the endpoint should give the same fee as the sync one.
+        """
+        example_delivery = {"cart_value": 790, "delivery_distance": 2235,
+                            "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}
+        response = asyncio.run(main.index_async(example_delivery))
+        self.assertEqual(response.body, b'{"delivery_fee":710}')
+
+    def test_non_valid_delivery_async_endpoint(self):
+        example_delivery = {"cart_value": -1, "delivery_distance": 2235,
+                            "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}
+        with self.assertRaises(main.DeliveryValidatorException) as context:
+            asyncio.run(main.index_async(example_delivery))
+        self.assertEqual(context.exception.name, "Cart value must be a positive integer.")
+
+    def test_openapi_schema_documents_responses(self):
+        """The responses are encoded directly, but the schema should still document the response models.
+        """
+        paths = self.client.get("/openapi.json").json()["paths"]
+        self.assertEqual(paths["/"]["post"]["responses"]["200"]["content"]["application/json"]["schema"],
+                         {"$ref": "#/components/schemas/DeliveryFeeModel"})
+        self.assertEqual(paths["/batch"]["post"]["responses"]["200"]["content"]["application/json"]["schema"]["items"],
+                         {"$ref": "#/components/schemas/BatchDeliveryFeeModel"})
+
 
 class TestApiRequests(unittest.TestCase):
     def setUp(self):
@@ -108,6 +182,25 @@ class TestApiCartValueValidation(unittest.TestCase):
         self.assertEqual(response.json(), "Cart value must be a positive integer.")
 
 
+class TestApiMissingFields(unittest.TestCase):
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+        self.client = TestClient(app)
+
+    def test_missing_time(self):
+        """Missing fields should return 400 error with the message of the missing field.
+        """
+        example_delivery = {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4}
+        response = self.client.post("/", json=example_delivery)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), "Time must be string type in UTC, ISO 8601 format.")
+
+    def test_empty_body(self):
+        response = self.client.post("/", json={})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), "Time must be string type in UTC, ISO 8601 format.")
+
+
 class TestApiNumberOfItemsValidation(unittest.TestCase):
     def setUp(self):
         settings.ENVIRONMENT = 'test'
@@ -188,3 +281,267 @@ class TestApiTimeValidation(unittest.TestCase):
         response = self.client.post("/", json=example_delivery)
         self.assertEqual(response.status_code, 400)
         self.assertEqual(response.json(), "Time must be string type in UTC, ISO 8601 format.")
+
+
+class TestApiBatch(unittest.TestCase):
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+        self.client = TestClient(app)
+
+    def test_batch_valid_deliveries(self):
+        """Every order in the batch should be priced the same way as in the index endpoint,
+        and the results should be returned in the input order.
+        """
+        example_deliveries = [
+            {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"},
+            {"cart_value": 1200, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-19T15:00:01Z"},
+            {"cart_value": 20000, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-19T15:00:01Z"},
+        ]
+        response = self.client.post("/batch", json=example_deliveries)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{"delivery_fee": 710}, {"delivery_fee": 600}, {"delivery_fee": 0}])
+
+    def test_batch_invalid_delivery_does_not_fail_batch(self):
+        """Invalid orders should get their own error message, while the other orders are still priced.
+        """
+        example_deliveries = [
+            {"cart_value": "value", "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"},
+            {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"},
+            {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4},
+            "not an order",
+        ]
+        response = self.client.post("/batch", json=example_deliveries)
+        self.assertEqual(response.status_code, 200)
+        missing_fields_error = "Order must be an object with cart_value, delivery_distance, number_of_items and time."
+        self.assertEqual(response.json(), [{"error": "Cart value must be a positive integer."},
+                                           {"delivery_fee": 710},
+                                           {"error": missing_fields_error},
+                                           {"error": missing_fields_error}])
+
+    def test_batch_empty(self):
+        """An empty batch should return an empty list.
+        """
+        response = self.client.post("/batch", json=[])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+    def test_batch_too_large(self):
+        """Batches over the maximum batch size should be rejected with 400 error.
+        """
+        original_max_batch_size = settings.MAX_BATCH_SIZE
+        settings.MAX_BATCH_SIZE = 1
+        example_delivery = {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}
+        response = self.client.post("/batch", json=[example_delivery, example_delivery])
+        settings.MAX_BATCH_SIZE = original_max_batch_size
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), "Batch can contain at most 1 orders.")
+
+
+class TestApiStream(unittest.TestCase):
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+        self.client = TestClient(app)
+
+    def test_stream_valid_deliveries(self):
+        """Every line should get its result line in the input order.
+        """
+        body = (b'{"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}\n'
+                b'{"cart_value": 1200, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-19T15:00:01Z"}\n')
+        response = self.client.post("/stream", content=body)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        self.assertEqual(response.text, '{"delivery_fee":710}\n{"delivery_fee":600}\n')
+
+    def test_stream_lines_split_between_chunks(self):
+        """Orders split between body chunks, empty lines and a missing last newline should be handled.
+        """
+        def chunks():
+            yield b'{"cart_value": 790, "delivery_distance": 2235, '
+            yield b'"number_of_items": 4, "time": "2024-01-15T13:00:00Z"}\n\n{"cart_value": 20000, '
+            yield b'"delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-19T15:00:01Z"}'
+        response = self.client.post("/stream", content=chunks())
+        self.assertEqual(response.text, '{"delivery_fee":710}\n{"delivery_fee":0}\n')
+
+    def test_stream_invalid_deliveries(self):
+        body = (b'{"cart_value": -1, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}\n'
+                b'not json\n'
+                b'[1, 2]\n')
+        response = self.client.post("/stream", content=body)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text.splitlines(), [
+            '{"error":"Cart value must be a positive integer."}',
+            '{"error":"Order must be valid JSON."}',
+            '{"error":"Order must be an object with cart_value, delivery_distance, number_of_items and time."}',
+        ])
+
+    def test_stream_line_too_long(self):
+        """A line over the maximum length should get an error and be dropped, also when it is split
+        between chunks, and the next lines should still be priced.
+        """
+        delivery = b'{"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}'
+
+        def chunks():
+            yield b'{"cart_value": ' + b" " * 100
+            yield b" " * 100
+            yield b'790}\n' + delivery + b'\n' + b" " * 300 + b'\n'
+            yield delivery
+        original_max_line_length = settings.MAX_STREAM_LINE_LENGTH
+        settings.MAX_STREAM_LINE_LENGTH = 200
+        response = self.client.post("/stream", content=chunks())
+        settings.MAX_STREAM_LINE_LENGTH = original_max_line_length
+        self.assertEqual(response.text.splitlines(), [
+            '{"error":"Order can be at most 200 bytes."}',
+            '{"delivery_fee":710}',
+            '{"error":"Order can be at most 200 bytes."}',
+            '{"delivery_fee":710}',
+        ])
+
+    def test_stream_deeply_nested_line(self):
+        """A line nested too deep to parse should get the JSON error, and the next lines should still be priced.
+        """
+        body = (b"[" * 5000 + b"\n"
+                b'{"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}\n')
+        response = self.client.post("/stream", content=body)
+        self.assertEqual(response.text.splitlines(), ['{"error":"Order must be valid JSON."}', '{"delivery_fee":710}'])
+
+    def test_stream_empty(self):
+        response = self.client.post("/stream", content=b"")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text, "")
+
+
+class TestApiFeePolicies(unittest.TestCase):
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+        self.client = TestClient(app)
+        test_policy = FeePolicy.from_config(test_config)
+        free_policy = FeePolicy.from_config(test_config)
+        object.__setattr__(free_policy, "min_cart_value_for_free_delivery", 700)
+        set_fee_policies({"helsinki": test_policy, "free": free_policy})
+        self.delivery = {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}
+
+    def test_named_policy(self):
+        """The order should be priced with the policy of its policy_id.
+        """
+        response = self.client.post("/", json={**self.delivery, "policy_id": "free"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"delivery_fee": 0})
+        response = self.client.post("/", json={**self.delivery, "policy_id": "helsinki"})
+        self.assertEqual(response.json(), {"delivery_fee": 710})
+
+    def test_unknown_policy(self):
+        for policy_id in ["berlin", 1]:
+            response = self.client.post("/", json={**self.delivery, "policy_id": policy_id})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json(), "Fee policy does not exist.")
+
+    def test_batch_named_policies(self):
+        response = self.client.post("/batch", json=[self.delivery, {**self.delivery, "policy_id": "free"},
+                                                    {**self.delivery, "policy_id": "berlin"}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{"delivery_fee": 710}, {"delivery_fee": 0},
+                                           {"error": "Fee policy does not exist."}])
+
+    def tearDown(self):
+        set_fee_policies(None)
+
+
+class TestApiMetrics(unittest.TestCase):
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+        self.client = TestClient(app)
+        self.delivery = {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}
+
+    def test_metrics(self):
+        """The requests, orders, errors and stage latencies of the endpoints should be in the metrics.
+        """
+        with mock.patch.object(main, "metrics", Metrics()):
+            self.client.post("/", json=self.delivery)
+            self.client.post("/", json={**self.delivery, "cart_value": -1})
+            self.client.post("/batch", json=[self.delivery, {**self.delivery, "number_of_items": 0}])
+            response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        lines = response.text.splitlines()
+        self.assertIn('delivery_fee_requests_total{endpoint="index"} 2', lines)
+        self.assertIn('delivery_fee_requests_total{endpoint="batch"} 1', lines)
+        self.assertIn('delivery_fee_orders_total{endpoint="batch"} 2', lines)
+        self.assertIn('delivery_fee_errors_total{error="Cart value must be a positive integer."} 1', lines)
+        self.assertIn('delivery_fee_errors_total{error="Number of items must be an integer with a value over 1."} 1',
+                      lines)
+        for stage in ["validation", "pricing", "encoding"]:
+            self.assertIn(f'delivery_fee_stage_seconds_count{{stage="{stage}"}} 1', lines)
+
+
+class TestApiProbes(unittest.TestCase):
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+        self.delivery = {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}
+
+    def test_ready_after_warmup(self):
+        """The worker should be ready only while the app is running, after the warm-up, and the warm-up
+        should not be in the metrics.
+        """
+        with mock.patch.object(main, "metrics", Metrics()):
+            client = TestClient(app)
+            self.assertEqual(client.get("/readyz").status_code, 503)
+            with TestClient(app) as client:
+                self.assertEqual(client.get("/healthz").json(), {"status": "ok"})
+                response = client.get("/readyz")
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()["status"], "ready")
+                self.assertGreater(response.json()["warmup_seconds"], 0)
+                self.assertEqual(main.metrics.render(), "")
+            self.assertEqual(client.get("/readyz").status_code, 503)
+
+    def test_not_ready_with_invalid_config(self):
+        error = InvalidConfigException(name="Error in config.py: Surcharge fee is not valid.")
+        with mock.patch.object(main, "warm_up", side_effect=error), redirect_stdout(io.StringIO()):
+            with TestClient(app) as client:
+                self.assertEqual(client.get("/healthz").status_code, 200)
+                response = client.get("/readyz")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {"status": "not ready", "error": error.name})
+
+    def test_ready_after_invalid_config_is_fixed(self):
+        """A worker that started with a config file that is not valid should become ready, and price orders,
+        once the watcher has swapped in the fixed file.
+        """
+        settings.ENVIRONMENT = 'test-readiness'
+        original_poll_interval = settings.FEE_CONFIG_POLL_INTERVAL
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "fee_config.toml")
+            with open(EXAMPLE_CONFIG_PATH) as example_file:
+                example_config = example_file.read()
+            with open(path, "w") as config_file:
+                config_file.write(example_config.replace("SURCHARGE_FEE = 50", "SURCHARGE_FEE = -1"))
+            settings.FEE_CONFIG_PATH = path
+            settings.FEE_CONFIG_POLL_INTERVAL = 0.01
+            try:
+                with redirect_stdout(io.StringIO()), TestClient(app) as client:
+                    self.assertEqual(client.get("/readyz").status_code, 503)
+                    self.assertEqual(client.post("/", json=self.delivery).status_code, 503)
+                    with open(path, "w") as config_file:
+                        config_file.write(example_config)
+                    # The modification time may not change between quick writes, so it is moved forward.
+                    stat = os.stat(path)
+                    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+                    for _ in range(200):
+                        response = client.get("/readyz")
+                        if response.status_code == 200:
+                            break
+                        time.sleep(0.01)
+                    self.assertEqual(response.json()["status"], "ready")
+                    self.assertEqual(client.post("/", json=self.delivery).json(), {"delivery_fee": 710})
+            finally:
+                set_fee_policy(None)
+                settings.FEE_CONFIG_PATH = ""
+                settings.FEE_CONFIG_POLL_INTERVAL = original_poll_interval
+                settings.ENVIRONMENT = 'test'
+
+    def test_warm_up_prices_orders_with_every_policy(self):
+        set_fee_policies({"helsinki": FeePolicy.from_config(test_config)})
+        try:
+            self.assertEqual(warm_up(validator=main.validator), 2 * len(WARMUP_ORDERS))
+        finally:
+            set_fee_policies(None)
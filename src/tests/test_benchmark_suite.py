@@ -0,0 +1,42 @@
+import unittest
+import io
+import os
+import tempfile
+from contextlib import redirect_stdout
+from settings import settings
+from benchmarks.orders import generate_orders
+from benchmarks.suite import find_regressions, main
+from services.request_validator import DeliveryRequestValidator
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+
+    def test_generated_orders_are_reproducible(self):
+        self.assertEqual(generate_orders(count=100, seed=1), generate_orders(count=100, seed=1))
+        self.assertNotEqual(generate_orders(count=100, seed=1), generate_orders(count=100, seed=2))
+
+    def test_generated_orders_are_mostly_valid(self):
+        validator = DeliveryRequestValidator()
+        orders = generate_orders(count=2000)
+        valid_orders = [order for order in orders if validator.parse_delivery_request(order)[1] is not None]
+        self.assertGreater(len(valid_orders), 1900)
+        self.assertLess(len(valid_orders), 2000)
+
+    def test_find_regressions(self):
+        """Only a drop of throughput over the threshold should be a regression.
+        """
+        baseline = {"fast": 1000, "slow": 1000, "new_baseline": 1000}
+        results = {"fast": 1100, "slow": 700, "not_in_baseline": 1}
+        self.assertEqual(find_regressions(results=results, baseline=baseline, threshold=0.2), [("slow", 1000, 700)])
+        self.assertEqual(find_regressions(results=results, baseline=baseline, threshold=0.35), [])
+
+    def test_check_without_baseline(self):
+        """--check without a saved baseline should fail with a message before running the benchmarks.
+        """
+        with tempfile.TemporaryDirectory() as directory, redirect_stdout(io.StringIO()) as output:
+            path = os.path.join(directory, "baseline.json")
+            self.assertEqual(main(["--check", "--baseline", path]), 1)
+        self.assertEqual(output.getvalue(), f"There is no baseline in {path}, save one with --save first.\n")
@@ -0,0 +1,83 @@
+import unittest
+import os
+import tempfile
+from settings import settings
+import cli
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+        self.directory = tempfile.TemporaryDirectory()
+
+    def write_input(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as input_file:
+            input_file.write(content)
+        return path
+
+    def read_output(self, name: str) -> str:
+        with open(os.path.join(self.directory.name, name)) as output_file:
+            return output_file.read()
+
+    def test_price_jsonl(self):
+        input_path = self.write_input("orders.jsonl", (
+            '{"id": 1, "cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}\n'
+            '\n'
+            '{"id": 2, "cart_value": -1, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}\n'
+            'not json\n'
+        ))
+        exit_code = cli.main([input_path, os.path.join(self.directory.name, "priced.jsonl"), "--workers", "1"])
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(self.read_output("priced.jsonl").splitlines(), [
+            '{"id":1,"cart_value":790,"delivery_distance":2235,"number_of_items":4,"time":"2024-01-15T13:00:00Z",'
+            '"delivery_fee":710}',
+            '{"id":2,"cart_value":-1,"delivery_distance":2235,"number_of_items":4,"time":"2024-01-15T13:00:00Z",'
+            '"error":"Cart value must be a positive integer."}',
+            '{"error":"Order must be valid JSON."}',
+        ])
+
+    def test_price_jsonl_deeply_nested_line(self):
+        """A line nested too deep to parse should get the JSON error and not stop the job.
+        """
+        input_path = self.write_input("orders.jsonl", (
+            "[" * 5000 + "\n"
+            '{"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}\n'
+        ))
+        exit_code = cli.main([input_path, os.path.join(self.directory.name, "priced.jsonl"), "--workers", "1"])
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(self.read_output("priced.jsonl").splitlines()[0], '{"error":"Order must be valid JSON."}')
+        self.assertTrue(self.read_output("priced.jsonl").splitlines()[1].endswith('"delivery_fee":710}'))
+
+    def test_price_csv(self):
+        input_path = self.write_input("orders.csv", (
+            "id,cart_value,delivery_distance,number_of_items,time\n"
+            "1,790,2235,4,2024-01-15T13:00:00Z\n"
+            "2,1200,2235,4,2024-01-19T15:00:01Z\n"
+            "3,790,2235,four,2024-01-15T13:00:00Z\n"
+        ))
+        exit_code = cli.main([input_path, os.path.join(self.directory.name, "priced.csv"), "--workers", "1"])
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(self.read_output("priced.csv").splitlines(), [
+            "id,cart_value,delivery_distance,number_of_items,time,delivery_fee,error",
+            "1,790,2235,4,2024-01-15T13:00:00Z,710,",
+            "2,1200,2235,4,2024-01-19T15:00:01Z,600,",
+            "3,790,2235,four,2024-01-15T13:00:00Z,,Number of items must be an integer with a value over 1.",
+        ])
+
+    def test_price_with_process_pool_keeps_order(self):
+        """Chunks priced in multiple processes should be written in the input order.
+        """
+        lines = [f'{{"cart_value": {cart_value}, "delivery_distance": 2235, "number_of_items": 4, '
+                 f'"time": "2024-01-15T13:00:00Z"}}\n' for cart_value in range(0, 1100, 10)]
+        input_path = self.write_input("orders.jsonl", "".join(lines))
+        output_path = os.path.join(self.directory.name, "priced.jsonl")
+        orders = cli.price_file(input_path=input_path, output_path=output_path, workers=2, chunk_size=7)
+        self.assertEqual(orders, len(lines))
+        single_process_path = os.path.join(self.directory.name, "single.jsonl")
+        cli.price_file(input_path=input_path, output_path=single_process_path, workers=1, chunk_size=1000)
+        self.assertEqual(self.read_output("priced.jsonl"), self.read_output("single.jsonl"))
+
+    def tearDown(self):
+        self.directory.cleanup()
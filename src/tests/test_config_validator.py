@@ -99,5 +99,13 @@ class TestConfigValidatorRushHours(unittest.TestCase):
         self.assertEqual(self.config_validator.valid_config(config=self.test_config),
                          "Error in config.py: Rush hours are not valid.")
 
+    def test_rush_hours_fee_not_valid(self):
+        for fee in [float("nan"), float("inf"), 0, -1.2]:
+            self.test_config.RUSH_HOURS = [
+                RushHours(day=4, start=time(15, 00, 00), end=time(19, 00, 00), fee=fee)
+            ]
+            self.assertEqual(self.config_validator.valid_config(config=self.test_config),
+                             "Error in config.py: Rush hours are not valid.")
+
     def tearDown(self):
         self.test_config.RUSH_HOURS = self.original_rush_hours
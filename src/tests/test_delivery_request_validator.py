@@ -1,4 +1,5 @@
 import unittest
+from models.parsed_order import ParsedOrder
 from services.request_validator import DeliveryRequestValidator
 
 
@@ -78,3 +79,29 @@ class TestDeliveryRquestValidator(unittest.TestCase):
         self.assertEqual(self.delivery_request_validator.valid_delivery_request(
             delivery_request={"cart_value": 1, "delivery_distance": 1, "number_of_items": 1, "time": "2024-01-01 12:00:00"}),
             "Time must be string type in UTC, ISO 8601 format.")
+
+    def test_valid_delivery_request_reused_validator(self):
+        self.delivery_request_validator.valid_delivery_request(
+            delivery_request={"cart_value": -1, "delivery_distance": 1, "number_of_items": 1, "time": "2024-01-01T12:00:00Z"})
+        self.assertEqual(self.delivery_request_validator.valid_delivery_request(
+            delivery_request={"cart_value": 1, "delivery_distance": 1, "number_of_items": 1, "time": "2024-01-01T12:00:00Z"}),
+            "valid")
+
+    def test_parse_delivery_request_valid(self):
+        parsed_order = ParsedOrder(cart_value=790, delivery_distance=2235, number_of_items=4, weekday=4, second_of_day=54001)
+        self.assertEqual(self.delivery_request_validator.parse_delivery_request(
+            delivery_request={"cart_value": 790, "delivery_distance": 2235,
+                              "number_of_items": 4, "time": "2024-01-19T15:00:01Z"}
+        ), ("valid", parsed_order))
+
+    def test_parse_delivery_request_last_error(self):
+        """If multiple fields are not valid, the error of the last one is returned, like in valid_delivery_request.
+        """
+        self.assertEqual(self.delivery_request_validator.parse_delivery_request(
+            delivery_request={"cart_value": -1, "delivery_distance": -1, "number_of_items": 1, "time": "2024-01-01T12:00:00Z"}
+        ), ("Delivery distance must be a positive integer.", None))
+
+    def test_parse_delivery_request_missing_field(self):
+        self.assertEqual(self.delivery_request_validator.parse_delivery_request(
+            delivery_request={"cart_value": 1, "delivery_distance": 1, "time": "2024-01-01T12:00:00Z"}),
+            ("Number of items must be an integer with a value over 1.", None))
@@ -0,0 +1,79 @@
+import unittest
+from unittest import mock
+from settings import settings
+from services.fee_cache import FeeCache
+from services.fee_policy import FeePolicy
+import test_config
+
+
+class TestFeeCache(unittest.TestCase):
+
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+        self.fee_policy = FeePolicy.from_config(test_config)
+        self.fee_cache = FeeCache(max_size=2)
+
+    def get_delivery_fee(self, fee_policy=None, cart_value=790, weekday=0, second_of_day=46800):
+        return self.fee_cache.get_delivery_fee(fee_policy=fee_policy or self.fee_policy, cart_value=cart_value,
+                                               delivery_distance=2235, number_of_items=4,
+                                               weekday=weekday, second_of_day=second_of_day)
+
+    def test_cached_fee_is_same_as_calculated(self):
+        self.assertEqual(self.get_delivery_fee(), 710)
+        self.assertEqual(self.get_delivery_fee(), 710)
+        self.assertEqual((self.fee_cache.hits, self.fee_cache.misses), (1, 1))
+
+    def test_same_rush_hour_multiplier_hits_cache(self):
+        """Orders at different times with the same rush hour multiplier share the cached fee.
+        Friday 15:00:01 and 18:00:00 are in the same rush hour, Friday 20:00:00 is not.
+        """
+        self.assertEqual(self.get_delivery_fee(cart_value=1200, weekday=4, second_of_day=54001), 600)
+        self.assertEqual(self.get_delivery_fee(cart_value=1200, weekday=4, second_of_day=64800), 600)
+        self.assertEqual(self.get_delivery_fee(cart_value=1200, weekday=4, second_of_day=72000), 500)
+        self.assertEqual((self.fee_cache.hits, self.fee_cache.misses), (1, 2))
+
+    def test_least_recently_used_fee_is_dropped(self):
+        self.get_delivery_fee(cart_value=1)
+        self.get_delivery_fee(cart_value=2)
+        self.get_delivery_fee(cart_value=1)
+        self.get_delivery_fee(cart_value=3)
+        self.assertEqual(len(self.fee_cache), 2)
+        self.get_delivery_fee(cart_value=1)
+        self.get_delivery_fee(cart_value=2)
+        self.assertEqual((self.fee_cache.hits, self.fee_cache.misses), (2, 4))
+
+    def test_policies_do_not_share_fees(self):
+        """A new or another named policy should not get the fees cached for a different policy.
+        """
+        other_policy = FeePolicy.from_config(test_config)
+        self.get_delivery_fee()
+        self.get_delivery_fee(fee_policy=other_policy)
+        self.get_delivery_fee()
+        self.assertEqual((self.fee_cache.hits, self.fee_cache.misses), (1, 2))
+        self.assertEqual(len(self.fee_cache), 2)
+
+    def test_expired_fee_is_calculated_again(self):
+        self.fee_cache = FeeCache(max_size=2, ttl=10)
+        with mock.patch("services.fee_cache.time.monotonic", return_value=100):
+            self.get_delivery_fee()
+            self.get_delivery_fee()
+        with mock.patch("services.fee_cache.time.monotonic", return_value=111):
+            self.get_delivery_fee()
+        self.assertEqual((self.fee_cache.hits, self.fee_cache.misses), (1, 2))
+
+    def test_discard_fee_policies(self):
+        """Only the fees of the discarded policies should be dropped.
+        """
+        other_policy = FeePolicy.from_config(test_config)
+        self.get_delivery_fee()
+        self.get_delivery_fee(fee_policy=other_policy)
+        self.fee_cache.discard_fee_policies([self.fee_policy])
+        self.assertEqual(len(self.fee_cache), 1)
+        self.get_delivery_fee(fee_policy=other_policy)
+        self.assertEqual((self.fee_cache.hits, self.fee_cache.misses), (1, 2))
+
+    def test_clear(self):
+        self.get_delivery_fee()
+        self.fee_cache.clear()
+        self.assertEqual(len(self.fee_cache), 0)
+        self.assertEqual((self.fee_cache.hits, self.fee_cache.misses), (0, 0))
@@ -62,6 +62,17 @@ class TestFeeCalculatorTotalDeliveryFee(unittest.TestCase):
         total_fee = self.calculator.calculate_total_delivery_fee(delivery)
         self.assertEqual(total_fee, 1500)
 
+    def test_calculate_delivery_fee_reused_calculator(self):
+        """The same calculator can price multiple orders, fees from previous orders
+        should not be added to the next one.
+        """
+        first_fee = self.calculator.calculate_delivery_fee(cart_value=790, delivery_distance=2235,
+                                                           number_of_items=4, time="2024-01-15T13:00:00Z")
+        second_fee = self.calculator.calculate_delivery_fee(cart_value=790, delivery_distance=2235,
+                                                            number_of_items=4, time="2024-01-15T13:00:00Z")
+        self.assertEqual(first_fee, 710)
+        self.assertEqual(second_fee, 710)
+
 
 class TestFeeCalculatorCartValueSurcharge(unittest.TestCase):
 
@@ -0,0 +1,331 @@
+import unittest
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+from contextlib import redirect_stdout
+from settings import settings
+from services import fee_policy as fee_policy_module
+from services.config_validator import InvalidConfigException
+from services.fee_cache import FeeCache
+from services.fee_config_loader import load_config_file, load_policies_file
+from services.fee_config_watcher import FeeConfigWatcher, reload_fee_policies, reload_fee_policy
+from services.fee_policy import FeePolicy, get_fee_policies, get_fee_policy, load_fee_policies, set_fee_policies, \
+    set_fee_policy
+import test_config
+
+EXAMPLE_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "fee_config.example.toml")
+
+
+def config_values(**changes) -> dict:
+    values = {name: getattr(test_config, name) for name in dir(test_config) if name.isupper()}
+    values["RUSH_HOURS"] = [{"day": 4, "start": "15:00:00", "end": "19:00:00", "fee": 1.2}]
+    values.update(changes)
+    return values
+
+
+class TestFeeConfigLoader(unittest.TestCase):
+
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+        self.directory = tempfile.TemporaryDirectory()
+
+    def write_config(self, values) -> str:
+        path = os.path.join(self.directory.name, "fee_config.json")
+        with open(path, "w") as config_file:
+            json.dump(values, config_file)
+        return path
+
+    def test_example_toml_config_equals_config(self):
+        """The example file has the same values as config.py, so the fees should be the same.
+        """
+        fee_policy = FeePolicy.from_config(load_config_file(EXAMPLE_CONFIG_PATH))
+        test_config_policy = FeePolicy.from_config(test_config)
+        for order in [(790, 2235, 4, "2024-01-15T13:00:00Z"), (1200, 2235, 4, "2024-01-19T15:00:01Z"),
+                      (1000, 50000, 100, "2024-01-19T19:00:00Z")]:
+            self.assertEqual(fee_policy.calculate_delivery_fee(*order), test_config_policy.calculate_delivery_fee(*order))
+
+    def test_json_config(self):
+        config = load_config_file(self.write_config(config_values(SURCHARGE_FEE=60)))
+        self.assertEqual(config.SURCHARGE_FEE, 60)
+        self.assertEqual(config.RUSH_HOURS[0].fee, 1.2)
+
+    def test_missing_value(self):
+        values = config_values()
+        del values["BULK_AMOUNT"]
+        path = self.write_config(values)
+        with self.assertRaises(InvalidConfigException) as context:
+            load_config_file(path)
+        self.assertEqual(context.exception.name, f"Error in {path}: BULK_AMOUNT is missing.")
+
+    def test_rush_hours_not_valid(self):
+        path = self.write_config(config_values(RUSH_HOURS=[{"day": 4, "start": "late"}]))
+        with self.assertRaises(InvalidConfigException) as context:
+            load_config_file(path)
+        self.assertEqual(context.exception.name, f"Error in {path}: Rush hours are not valid.")
+
+    def test_values_not_valid(self):
+        """Values that would fail when the policy is compiled should be rejected when the file is read.
+        """
+        for name, value, error in [("BULK_AMOUNT", "12", "BULK_AMOUNT must be a positive integer."),
+                                   ("BULK_CHARGE_FEE", None, "BULK_CHARGE_FEE must be a positive integer."),
+                                   ("SURCHARGE_FEE", True, "SURCHARGE_FEE must be a positive integer."),
+                                   ("ADDITIONAL_DISTANCE_AFTER_FIRST_KM", 0,
+                                    "ADDITIONAL_DISTANCE_AFTER_FIRST_KM must be over 0.")]:
+            path = self.write_config(config_values(**{name: value}))
+            with self.assertRaises(InvalidConfigException) as context:
+                load_config_file(path)
+            self.assertEqual(context.exception.name, f"Error in {path}: {error}")
+
+    def test_rush_hour_fee_not_valid(self):
+        """Rush hour fees that are not finite or not over 0 should be rejected when the file is read.
+        """
+        for fee in [float("nan"), float("inf"), 0, -1.2]:
+            path = self.write_config(config_values(RUSH_HOURS=[{"day": 4, "start": "15:00:00", "end": "19:00:00",
+                                                                "fee": fee}]))
+            with self.assertRaises(InvalidConfigException) as context:
+                load_config_file(path)
+            self.assertEqual(context.exception.name, f"Error in {path}: Rush hour fee must be a number over 0.")
+
+    def test_file_not_json(self):
+        path = os.path.join(self.directory.name, "fee_config.json")
+        with open(path, "w") as config_file:
+            config_file.write("not json")
+        with self.assertRaises(InvalidConfigException):
+            load_config_file(path)
+
+    def test_get_fee_policy_from_file(self):
+        """With FEE_CONFIG_PATH set, the policy should be compiled from the file.
+        """
+        settings.ENVIRONMENT = 'test-fee-config-file'
+        settings.FEE_CONFIG_PATH = self.write_config(config_values(MAX_DELIVERY_FEE=1000))
+        self.assertEqual(get_fee_policy().max_delivery_fee, 1000)
+
+    def test_get_fee_policy_error_is_remembered(self):
+        """While the config file is not valid, get_fee_policy should raise the error without reading the file again.
+        """
+        settings.ENVIRONMENT = 'test-fee-config-file'
+        settings.FEE_CONFIG_PATH = self.write_config(config_values(MAX_DELIVERY_FEE=-1))
+        with self.assertRaises(InvalidConfigException):
+            get_fee_policy()
+        with mock.patch("services.fee_policy.load_config_file") as load_config, \
+                self.assertRaises(InvalidConfigException) as context:
+            get_fee_policy()
+        load_config.assert_not_called()
+        self.assertEqual(context.exception.name,
+                         f"Error in {settings.FEE_CONFIG_PATH}: MAX_DELIVERY_FEE must be a positive integer.")
+        self.assertIsNone(set_fee_policy(FeePolicy.from_config(test_config)))
+        self.assertEqual(get_fee_policy().max_delivery_fee, test_config.MAX_DELIVERY_FEE)
+
+    def tearDown(self):
+        fee_policy_module._fee_policies.pop('test-fee-config-file', None)
+        fee_policy_module._fee_policy_errors.pop('test-fee-config-file', None)
+        settings.FEE_CONFIG_PATH = ""
+        settings.ENVIRONMENT = 'test'
+        self.directory.cleanup()
+
+
+class TestFeeConfigWatcher(unittest.TestCase):
+
+    def setUp(self):
+        settings.ENVIRONMENT = 'test-fee-config-watcher'
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "fee_config.json")
+        self.write_config(config_values())
+        settings.FEE_CONFIG_PATH = self.path
+        self.watcher = FeeConfigWatcher(path=self.path, interval=0.01)
+
+    def write_config(self, values):
+        with open(self.path, "w") as config_file:
+            json.dump(values, config_file)
+        # The modification time may not change between quick writes, so it is moved forward.
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+    def test_unchanged_file_is_not_reloaded(self):
+        self.assertEqual(self.watcher.check(), False)
+
+    def test_changed_file_swaps_policy(self):
+        old_policy = get_fee_policy()
+        self.write_config(config_values(MAX_DELIVERY_FEE=1000))
+        self.assertEqual(self.watcher.check(), True)
+        self.assertIsNot(get_fee_policy(), old_policy)
+        self.assertEqual(get_fee_policy().max_delivery_fee, 1000)
+        self.assertEqual(old_policy.max_delivery_fee, 1500)
+
+    def test_invalid_change_keeps_old_policy(self):
+        old_policy = get_fee_policy()
+        self.write_config(config_values(MAX_DELIVERY_FEE=-1))
+        self.assertEqual(self.watcher.check(), False)
+        self.assertIs(get_fee_policy(), old_policy)
+
+    def test_valid_change_replaces_invalid_config(self):
+        """A worker that started with a config that is not valid should get the policy once the file is fixed.
+        """
+        self.write_config(config_values(MAX_DELIVERY_FEE=-1))
+        with self.assertRaises(InvalidConfigException):
+            get_fee_policy()
+        self.write_config(config_values(MAX_DELIVERY_FEE=900))
+        self.assertEqual(self.watcher.check(), True)
+        self.assertEqual(get_fee_policy().max_delivery_fee, 900)
+
+    def test_values_not_valid_keep_old_policy(self):
+        old_policy = get_fee_policy()
+        for changes in [{"BULK_AMOUNT": "12"}, {"BULK_CHARGE_FEE": None}, {"ADDITIONAL_DISTANCE_AFTER_FIRST_KM": 0}]:
+            self.write_config(config_values(**changes))
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(self.watcher.check(), False)
+            self.assertIs(get_fee_policy(), old_policy)
+
+    def test_unexpected_reload_error_keeps_watcher_running(self):
+        """An error that is not an InvalidConfigException should be printed, and the watcher thread
+        should keep reloading the later changes.
+        """
+        reloads = []
+
+        def reload(path):
+            reloads.append(path)
+            if len(reloads) == 1:
+                raise ZeroDivisionError("division by zero")
+            reload_fee_policy(path)
+
+        get_fee_policy()
+        watcher = FeeConfigWatcher(path=self.path, interval=0.01, reload=reload)
+        with redirect_stdout(io.StringIO()) as output:
+            watcher.start()
+            self.write_config(config_values(MAX_DELIVERY_FEE=800))
+            for _ in range(200):
+                if reloads:
+                    break
+                watcher._stopped.wait(0.01)
+            self.write_config(config_values(MAX_DELIVERY_FEE=900))
+            for _ in range(200):
+                if get_fee_policy().max_delivery_fee == 900:
+                    break
+                watcher._stopped.wait(0.01)
+            watcher.stop()
+        self.assertIn("ZeroDivisionError", output.getvalue())
+        self.assertEqual(get_fee_policy().max_delivery_fee, 900)
+
+    def test_watcher_thread_reloads_policy(self):
+        get_fee_policy()
+        self.watcher.start()
+        self.write_config(config_values(MAX_DELIVERY_FEE=900))
+        for _ in range(200):
+            if get_fee_policy().max_delivery_fee == 900:
+                break
+            self.watcher._stopped.wait(0.01)
+        self.watcher.stop()
+        self.assertEqual(get_fee_policy().max_delivery_fee, 900)
+
+    def tearDown(self):
+        self.watcher.stop()
+        fee_policy_module._fee_policies.pop('test-fee-config-watcher', None)
+        fee_policy_module._fee_policy_errors.pop('test-fee-config-watcher', None)
+        settings.FEE_CONFIG_PATH = ""
+        settings.ENVIRONMENT = 'test'
+        self.directory.cleanup()
+
+
+class TestFeePolicies(unittest.TestCase):
+
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+        set_fee_policies(None)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "fee_policies.json")
+        self.write_policies(defaults=config_values(), policies={"helsinki": {}, "berlin": {"SURCHARGE_FEE": 60}})
+
+    def write_policies(self, **values):
+        with open(self.path, "w") as policies_file:
+            json.dump(values, policies_file)
+        # The modification time may not change between quick writes, so it is moved forward.
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+    def test_policies_use_defaults(self):
+        configs = load_policies_file(self.path)
+        self.assertEqual(set(configs), {"helsinki", "berlin"})
+        self.assertEqual(configs["helsinki"].SURCHARGE_FEE, test_config.SURCHARGE_FEE)
+        self.assertEqual(configs["berlin"].SURCHARGE_FEE, 60)
+
+    def test_policies_share_rush_hour_table(self):
+        """Policies with the same rush hours should share one compiled table.
+        """
+        fee_policies = load_fee_policies(self.path)
+        self.assertIs(fee_policies["helsinki"].rush_hour_table, fee_policies["berlin"].rush_hour_table)
+
+    def test_policy_missing_value(self):
+        values = config_values()
+        del values["BULK_AMOUNT"]
+        self.write_policies(policies={"helsinki": values})
+        with self.assertRaises(InvalidConfigException) as context:
+            load_fee_policies(self.path)
+        self.assertEqual(context.exception.name, f"Error in {self.path} policy helsinki: BULK_AMOUNT is missing.")
+
+    def test_policy_not_valid(self):
+        self.write_policies(defaults=config_values(), policies={"helsinki": {"MAX_DELIVERY_FEE": -1}})
+        with self.assertRaises(InvalidConfigException) as context:
+            load_fee_policies(self.path)
+        self.assertEqual(context.exception.name,
+                         f"Error in {self.path} policy helsinki: MAX_DELIVERY_FEE must be a positive integer.")
+
+    def test_policy_value_not_valid(self):
+        self.write_policies(defaults=config_values(), policies={"helsinki": {"ADDITIONAL_DISTANCE_AFTER_FIRST_KM": 0}})
+        with self.assertRaises(InvalidConfigException) as context:
+            load_fee_policies(self.path)
+        self.assertEqual(context.exception.name,
+                         f"Error in {self.path} policy helsinki: ADDITIONAL_DISTANCE_AFTER_FIRST_KM must be over 0.")
+
+    def test_policies_missing(self):
+        self.write_policies(defaults=config_values())
+        with self.assertRaises(InvalidConfigException):
+            load_fee_policies(self.path)
+
+    def test_get_fee_policies_from_file(self):
+        settings.FEE_POLICIES_PATH = self.path
+        self.assertEqual(get_fee_policies()["berlin"].surcharge_fee, 60)
+        self.assertIs(get_fee_policies(), get_fee_policies())
+
+    def test_get_fee_policies_error_is_remembered(self):
+        settings.FEE_POLICIES_PATH = self.path
+        self.write_policies(defaults=config_values(), policies={"helsinki": {"MAX_DELIVERY_FEE": -1}})
+        with self.assertRaises(InvalidConfigException):
+            get_fee_policies()
+        with mock.patch("services.fee_policy.load_fee_policies") as load_policies, \
+                self.assertRaises(InvalidConfigException):
+            get_fee_policies()
+        load_policies.assert_not_called()
+        self.write_policies(defaults=config_values(), policies={"helsinki": {}})
+        reload_fee_policies(self.path)
+        self.assertEqual(set(get_fee_policies()), {"helsinki"})
+
+    def test_get_fee_policies_without_file(self):
+        self.assertEqual(get_fee_policies(), {})
+
+    def test_watcher_swaps_policies(self):
+        settings.FEE_POLICIES_PATH = self.path
+        watcher = FeeConfigWatcher(path=self.path, interval=0.01, reload=reload_fee_policies)
+        old_policies = get_fee_policies()
+        self.write_policies(defaults=config_values(), policies={"berlin": {"SURCHARGE_FEE": 70}})
+        self.assertEqual(watcher.check(), True)
+        self.assertEqual(set(get_fee_policies()), {"berlin"})
+        self.assertEqual(get_fee_policies()["berlin"].surcharge_fee, 70)
+        self.assertEqual(old_policies["berlin"].surcharge_fee, 60)
+
+    def test_reload_drops_cached_fees_of_replaced_policies(self):
+        """The cache should not keep the fees, and so the policies, of a replaced policies file.
+        """
+        settings.FEE_POLICIES_PATH = self.path
+        fee_cache = FeeCache(max_size=10)
+        for fee_policy in get_fee_policies().values():
+            fee_cache.get_delivery_fee(fee_policy, 790, 2235, 4, 0, 46800)
+        self.assertEqual(len(fee_cache), 2)
+        reload_fee_policies(self.path, fee_cache=fee_cache)
+        self.assertEqual(len(fee_cache), 0)
+
+    def tearDown(self):
+        set_fee_policies(None)
+        settings.FEE_POLICIES_PATH = ""
+        self.directory.cleanup()
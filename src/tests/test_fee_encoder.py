@@ -0,0 +1,33 @@
+import unittest
+import json
+from models.fee_breakdown import FeeBreakdown
+from services.fee_encoder import encode_delivery_fee, encode_fee_breakdown, encode_result, encode_results
+
+
+class TestFeeEncoder(unittest.TestCase):
+
+    def test_encode_delivery_fee(self):
+        self.assertEqual(encode_delivery_fee(710), b'{"delivery_fee":710}')
+
+    def test_encode_fee_breakdown(self):
+        breakdown = FeeBreakdown(delivery_fee=1500, small_order_surcharge=0, distance_fee=1200,
+                                 number_of_items_surcharge=450, bulk_fee=120, rush_hour_multiplier=1.0,
+                                 max_fee_applied=True, free_delivery=False)
+        self.assertEqual(json.loads(encode_fee_breakdown(breakdown)), {"delivery_fee": 1500, "breakdown": {
+            "small_order_surcharge": 0, "distance_fee": 1200, "number_of_items_surcharge": 450, "bulk_fee": 120,
+            "rush_hour_multiplier": 1.0, "max_fee_applied": True, "free_delivery": False}})
+
+    def test_encode_result_error(self):
+        self.assertEqual(encode_result("Cart value must be a positive integer."),
+                         b'{"error":"Cart value must be a positive integer."}')
+
+    def test_encode_result_error_is_escaped(self):
+        error = 'Batch "a"\nä'
+        self.assertEqual(json.loads(encode_result(error)), {"error": error})
+
+    def test_encode_results(self):
+        self.assertEqual(json.loads(encode_results([710, 0, "Order must be valid JSON."])),
+                         [{"delivery_fee": 710}, {"delivery_fee": 0}, {"error": "Order must be valid JSON."}])
+
+    def test_encode_results_empty(self):
+        self.assertEqual(encode_results([]), b"[]")
@@ -0,0 +1,101 @@
+import unittest
+import itertools
+from datetime import time
+from settings import settings
+from services.fee_calculator import FeeCalculator
+from services.fee_policy import FeePolicy, InvalidConfigException, get_fee_policy
+import test_config
+from config import RushHours
+from tests.configs import copy_config
+
+
+class TestFeePolicy(unittest.TestCase):
+
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+        self.calculator = FeeCalculator()
+        self.fee_policy = FeePolicy.from_config(test_config)
+
+    def test_policy_is_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.fee_policy.max_delivery_fee = 0
+        with self.assertRaises(AttributeError):
+            self.fee_policy.new_value = 0
+        with self.assertRaises(AttributeError):
+            del self.fee_policy.max_delivery_fee
+
+    def test_invalid_config_is_not_compiled(self):
+        invalid_config = copy_config(test_config)
+        invalid_config.SURCHARGE_FEE = -1
+        with self.assertRaises(InvalidConfigException) as context:
+            FeePolicy.from_config(invalid_config)
+        self.assertEqual(context.exception.name, "Error in config.py: SURCHARGE_FEE must be a positive integer.")
+
+    def test_get_fee_policy_is_compiled_once(self):
+        self.assertIs(get_fee_policy(), get_fee_policy())
+
+    def test_fees_equal_to_fee_calculator(self):
+        """The policy should give the same fees as FeeCalculator, including overlapping rush hours.
+        """
+        multiple_rush_hours_config = copy_config(test_config)
+        multiple_rush_hours_config.RUSH_HOURS = [
+            RushHours(day=4, start=time(15, 00, 00), end=time(19, 00, 00), fee=1.2),
+            RushHours(day=0, start=time(9, 00, 00), end=time(12, 00, 00), fee=0.5),
+            RushHours(day=4, start=time(18, 00, 00), end=time(20, 00, 00), fee=1.5),
+        ]
+        self.calculator.config = multiple_rush_hours_config
+        fee_policy = FeePolicy.from_config(multiple_rush_hours_config)
+        orders = itertools.product([0, 890, 999, 1000, 19999, 20000],
+                                   [0, 499, 500, 1000, 1001, 1500, 1501, 2235, 50000],
+                                   [1, 4, 5, 12, 13, 100],
+                                   ["2024-01-15T13:00:00Z", "2024-01-19T15:00:00Z", "2024-01-19T18:30:00Z",
+                                    "2024-01-19T19:00:01Z", "2024-01-29T11:00:00Z"])
+        for order in orders:
+            self.assertEqual(fee_policy.calculate_delivery_fee(*order), self.calculator.calculate_delivery_fee(*order))
+
+    def test_fee_tables_equal_to_fee_calculator(self):
+        """The distance fees and the item fees, from the table and from the formula after it, should be
+        the same as with FeeCalculator.
+        """
+        config = copy_config(test_config)
+        config.ADDITIONAL_DISTANCE_AFTER_FIRST_KM = 333
+        config.MINIMUM_DELIVERY_DISTANCE = 1200
+        config.MAX_DELIVERY_FEE = 10 ** 15
+        fee_policy = FeePolicy.from_config(config)
+        max_items = len(fee_policy.number_of_items_fee_table) - 1
+        for delivery_distance in list(range(0, 3000)) + [9999, 10000, 10001, 10 ** 12]:
+            self.assertEqual(fee_policy.calculate_multiplied_delivery_fee(0, delivery_distance, 1, 1),
+                             self.calculator.calculate_minimum_cart_value_surcharge(0, 1000)
+                             + self.calculator.calculate_delivery_distance_surcharge(delivery_distance, 1200, 100, 200,
+                                                                                     333, 100), delivery_distance)
+        for number_of_items in list(range(1, 20)) + [max_items, max_items + 1]:
+            self.assertEqual(fee_policy.calculate_multiplied_delivery_fee(1000, 0, number_of_items, 1),
+                             100 + self.calculator.calculate_number_of_items_surcharge(number_of_items, 4, 50, 12, 120))
+
+    def test_policies_share_fee_tables(self):
+        other_policy = FeePolicy.from_config(test_config)
+        self.assertIs(other_policy.number_of_items_fee_table, self.fee_policy.number_of_items_fee_table)
+
+    def test_fee_breakdown(self):
+        """The breakdown should have the same fee as calculate_delivery_fee_at, and the same components
+        as the FeeCalculator steps.
+        """
+        orders = itertools.product([0, 890, 1000, 19999, 20000], [0, 499, 500, 1001, 2235, 50000], [1, 5, 12, 13, 100],
+                                   [(0, 46800), (4, 54001), (4, 72000)])
+        for cart_value, delivery_distance, number_of_items, (weekday, second_of_day) in orders:
+            breakdown = self.fee_policy.calculate_fee_breakdown_at(cart_value, delivery_distance, number_of_items,
+                                                                   weekday, second_of_day)
+            self.assertEqual(breakdown.delivery_fee, self.fee_policy.calculate_delivery_fee_at(
+                cart_value, delivery_distance, number_of_items, weekday, second_of_day))
+            self.assertEqual(breakdown.small_order_surcharge,
+                             self.calculator.calculate_minimum_cart_value_surcharge(cart_value, 1000))
+            self.assertEqual(breakdown.distance_fee, self.calculator.calculate_delivery_distance_surcharge(
+                delivery_distance, 500, 100, 200, 500, 100))
+            self.assertEqual(breakdown.number_of_items_surcharge + breakdown.bulk_fee,
+                             self.calculator.calculate_number_of_items_surcharge(number_of_items, 4, 50, 12, 120))
+            self.assertEqual(breakdown.bulk_fee, 120 if number_of_items > 12 else 0)
+            self.assertEqual(breakdown.rush_hour_multiplier, 1.2 if (weekday, second_of_day) == (4, 54001) else 1.0)
+            self.assertEqual(breakdown.free_delivery, cart_value >= 20000)
+            uncapped_fee = (breakdown.small_order_surcharge + breakdown.distance_fee + breakdown.number_of_items_surcharge
+                            + breakdown.bulk_fee) * breakdown.rush_hour_multiplier
+            self.assertEqual(breakdown.max_fee_applied, cart_value < 20000 and uncapped_fee > 1500)
@@ -0,0 +1,79 @@
+import unittest
+import csv
+import io
+import os
+import tempfile
+from contextlib import redirect_stdout
+from settings import settings
+from services.config_validator import InvalidConfigException
+from services.fee_simulation import FeeSimulation
+from services.vectorized_fee_calculator import VectorizedFeeCalculator
+from simulate_fees import main
+from tests.configs import copy_config
+
+ORDERS = [
+    {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"},
+    {"cart_value": 1000, "delivery_distance": 1000, "number_of_items": 13, "time": "2024-01-19T15:00:00Z"},
+    {"cart_value": 20000, "delivery_distance": 1501, "number_of_items": 1, "time": "2024-01-19T16:00:00Z"},
+    {"cart_value": 1500, "delivery_distance": 499, "number_of_items": 5, "time": "2024-01-17T10:00:00Z"},
+]
+
+
+class TestFeeSimulation(unittest.TestCase):
+
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+
+    def test_baseline_fees_match_vectorized_calculator(self):
+        simulation = FeeSimulation.from_orders(ORDERS)
+        result = simulation.run({"current": copy_config()})
+        columns = [[order[field] for order in ORDERS]
+                   for field in ("cart_value", "delivery_distance", "number_of_items", "time")]
+        expected_fees = VectorizedFeeCalculator(fee_config=copy_config()).calculate_delivery_fees(*columns)
+        self.assertEqual(result["fees"][0].tolist(), expected_fees.tolist())
+        self.assertEqual(result["deltas"][0].tolist(), [0, 0, 0, 0])
+        self.assertEqual(result["configs"]["current"]["total"], int(expected_fees.sum()))
+
+    def test_higher_surcharge_raises_fees_of_orders_with_surcharge(self):
+        """Orders with more than PRODUCT_AMOUNT_FOR_SURCHARGE items and no free delivery cost 10 cents more per
+        extra item, times 1.2 in the rush hour.
+        """
+        simulation = FeeSimulation.from_orders(ORDERS)
+        result = simulation.run({"current": copy_config(), "surcharge": copy_config(SURCHARGE_FEE=60)})
+        self.assertEqual(result["deltas"][1].tolist(), [0, 108, 0, 10])
+        statistics = result["configs"]["surcharge"]
+        self.assertEqual(statistics["total_change"], 118)
+        self.assertEqual((statistics["higher"], statistics["lower"]), (2, 0))
+        self.assertEqual(sum(statistics["histogram"]), len(ORDERS))
+        self.assertEqual(statistics["free_share"], 0.25)
+
+    def test_invalid_config_raises_error_with_config_name(self):
+        simulation = FeeSimulation.from_orders(ORDERS)
+        with self.assertRaises(InvalidConfigException) as context:
+            simulation.run({"current": copy_config(), "candidate": copy_config(SURCHARGE_FEE=-1)})
+        self.assertTrue(context.exception.name.startswith("Error in config candidate: "))
+
+    def test_orders_that_are_not_valid_are_skipped(self):
+        orders = [ORDERS[0], {"cart_value": -1}, "order", ORDERS[1]]
+        simulation = FeeSimulation.from_orders(orders)
+        self.assertEqual(len(simulation), 2)
+        self.assertEqual(simulation.order_indexes.tolist(), [0, 3])
+
+    def test_simulate_fees_writes_deltas(self):
+        with tempfile.TemporaryDirectory() as directory:
+            orders_path = os.path.join(directory, "orders.jsonl")
+            with open(orders_path, "w") as orders_file:
+                orders_file.write("\n".join(str(order).replace("'", '"') for order in ORDERS))
+            candidate_path = os.path.join(directory, "candidate.json")
+            with open(candidate_path, "w") as candidate_file:
+                candidate_file.write('{"SURCHARGE_FEE": 60}')
+            deltas_path = os.path.join(directory, "deltas.csv")
+            settings.FEE_CONFIG_PATH = ""
+            with redirect_stdout(io.StringIO()) as output:
+                exit_code = main([orders_path, candidate_path, "--deltas", deltas_path])
+            self.assertEqual(exit_code, 0)
+            self.assertIn(candidate_path, output.getvalue())
+            with open(deltas_path) as deltas_file:
+                rows = list(csv.reader(deltas_file))
+        self.assertEqual(rows[0], ["order", "current", candidate_path, f"{candidate_path} change"])
+        self.assertEqual([row[3] for row in rows[1:]], ["0", "108", "0", "10"])
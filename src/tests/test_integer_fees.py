@@ -0,0 +1,72 @@
+import unittest
+import itertools
+from datetime import time
+from settings import settings
+from integer_fee_report import find_differing_fees, find_differing_orders
+from services.fee_policy import FeePolicy
+from services.vectorized_fee_calculator import VectorizedFeeCalculator
+import test_config
+from config import RushHours
+from tests.configs import copy_config
+
+ORDERS = list(itertools.product([0, 890, 1000, 19999, 20000], [0, 499, 500, 1000, 1001, 1501, 2235, 50000],
+                                [1, 4, 5, 12, 13, 100],
+                                ["2024-01-15T13:00:00Z", "2024-01-19T15:00:00Z", "2024-01-19T19:00:01Z"]))
+
+
+def config_with_rush_hour_fee(fee: float):
+    return copy_config(RUSH_HOURS=[RushHours(day=4, start=time(15, 00, 00), end=time(19, 00, 00), fee=fee)])
+
+
+class TestIntegerFees(unittest.TestCase):
+
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+        settings.INTEGER_FEES = True
+
+    def test_basis_points(self):
+        fee_policy = FeePolicy(config_with_rush_hour_fee(1.25))
+        self.assertEqual(fee_policy.rush_hour_table.multipliers[4], (1.0, 1.2, 1.0))
+        self.assertEqual(fee_policy.rush_hour_table.basis_points[4], (10000, 12000, 10000))
+        self.assertEqual(fee_policy.rush_hour_table.multiplier_basis_points(4, 54000), 12000)
+
+    def test_same_fees_as_float_mode_with_test_config(self):
+        """With the multipliers of test_config, the integer mode should give the same fees as the float mode.
+        """
+        integer_policy = FeePolicy.from_config(test_config)
+        settings.INTEGER_FEES = False
+        float_policy = FeePolicy.from_config(test_config)
+        for order in ORDERS:
+            self.assertEqual(integer_policy.calculate_delivery_fee(*order), float_policy.calculate_delivery_fee(*order))
+
+    def test_integer_mode_rounds_down_exact_fee(self):
+        """A fee of 170 (a 70 small order surcharge and the 100 minimum fee) * 0.7 is 118.99999999999999
+        as a float, so the float mode gives 118 and the integer mode 119.
+        """
+        fee_policy = FeePolicy(config_with_rush_hour_fee(0.7))
+        self.assertEqual(fee_policy.calculate_basis_point_delivery_fee(930, 0, 1, 7000), 119)
+        self.assertEqual(fee_policy.calculate_multiplied_delivery_fee(930, 0, 1, 0.7), 118)
+
+    def test_vectorized_integer_mode(self):
+        config = config_with_rush_hour_fee(0.7)
+        fee_policy = FeePolicy(config)
+        vectorized_calculator = VectorizedFeeCalculator()
+        vectorized_calculator.config = config
+        orders = ORDERS + [(930, 0, 1, "2024-01-19T15:00:00Z")]
+        cart_values, delivery_distances, numbers_of_items, times = zip(*orders)
+        fees = vectorized_calculator.calculate_delivery_fees(cart_values, delivery_distances, numbers_of_items, times)
+        self.assertEqual(fees.tolist(), [fee_policy.calculate_delivery_fee(*order) for order in orders])
+
+    def test_report_differing_fees(self):
+        self.assertEqual(find_differing_fees(FeePolicy.from_config(test_config)), [])
+        differing_fees = find_differing_fees(FeePolicy(config_with_rush_hour_fee(0.7)))
+        self.assertEqual(differing_fees[0], (90, 0.7, 62, 63))
+        self.assertTrue(all(surcharge_multiplier == 0.7 for _, surcharge_multiplier, _, _ in differing_fees))
+
+    def test_report_differing_orders(self):
+        order = {"cart_value": 930, "delivery_distance": 0, "number_of_items": 1, "time": "2024-01-19T15:00:00Z"}
+        orders = [(1, order), (2, {**order, "time": "2024-01-19T20:00:00Z"}), (3, None), (4, {"cart_value": -1})]
+        self.assertEqual(find_differing_orders(FeePolicy(config_with_rush_hour_fee(0.7)), orders), [(1, order, 118, 119)])
+
+    def tearDown(self):
+        settings.INTEGER_FEES = False
@@ -0,0 +1,45 @@
+import unittest
+import asyncio
+import json
+import os
+import tempfile
+import httpx
+from settings import settings
+from benchmarks.load_test import format_result, load_orders, replay
+from main import app
+
+ORDER = {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}
+
+
+class TestLoadTest(unittest.TestCase):
+
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+
+    def replay(self, rps: float) -> dict:
+        return asyncio.run(replay(url="http://test/", orders=[ORDER, {**ORDER, "cart_value": -1}], requests=20,
+                                  rps=rps, concurrency=4, transport=httpx.ASGITransport(app=app)))
+
+    def test_replay(self):
+        """The orders should be sent in turn, and the rejected ones counted as errors.
+        """
+        result = self.replay(rps=0)
+        self.assertEqual(result["requests"], 20)
+        self.assertEqual(result["statuses"], {"200": 10, "400": 10})
+        self.assertEqual(result["error_rate"], 0.5)
+        self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+        self.assertIn("error rate 50.00% (200: 10, 400: 10)", format_result(result))
+
+    def test_replay_at_target_rate(self):
+        """20 requests at 200 requests per second should take at least the 0.095 s between the first and the last.
+        """
+        result = self.replay(rps=200)
+        self.assertGreaterEqual(result["elapsed"], 0.095)
+        self.assertEqual(sum(result["statuses"].values()), 20)
+
+    def test_load_orders(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "orders.jsonl")
+            with open(path, "w") as orders_file:
+                orders_file.write(json.dumps(ORDER) + "\n\n" + json.dumps(ORDER) + "\n")
+            self.assertEqual(load_orders(path), [ORDER, ORDER])
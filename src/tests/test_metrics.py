@@ -0,0 +1,87 @@
+import unittest
+import json
+import os
+import tempfile
+import threading
+from settings import settings
+from services.metrics import Metrics, clear_metrics_directory, render_snapshot
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+        self.directory = tempfile.TemporaryDirectory()
+        self.metrics = Metrics(directory=self.directory.name)
+
+    def test_threads_are_summed(self):
+        """Every thread records to its own shard, and the snapshot should sum them.
+        """
+        def record():
+            for _ in range(1000):
+                self.metrics.increment('delivery_fee_requests_total{endpoint="index"}')
+                self.metrics.observe('delivery_fee_stage_seconds{stage="pricing"}', 0.00002)
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot["counters"], {'delivery_fee_requests_total{endpoint="index"}': 4000})
+        histogram = snapshot["histograms"]['delivery_fee_stage_seconds{stage="pricing"}']
+        self.assertEqual(histogram[1], 4000)
+        self.assertAlmostEqual(histogram[-1], 0.08)
+
+    def test_shards_of_ended_threads_are_retired(self):
+        """Short lived threads should not keep their shards, but their metrics should still be counted.
+        """
+        for _ in range(1000):
+            thread = threading.Thread(target=self.metrics.increment, args=('delivery_fee_requests_total{endpoint="index"}',))
+            thread.start()
+            thread.join()
+        self.metrics.observe('delivery_fee_stage_seconds{stage="pricing"}', 0.00002)
+        self.assertLessEqual(len(self.metrics._shards), 2)
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot["counters"], {'delivery_fee_requests_total{endpoint="index"}': 1000})
+        self.assertEqual(len(self.metrics._shards), 1)
+        self.assertEqual(self.metrics.snapshot()["counters"], {'delivery_fee_requests_total{endpoint="index"}': 1000})
+
+    def test_count_errors(self):
+        self.metrics.count_errors([710, "Fee policy does not exist.", "Fee policy does not exist."])
+        self.assertEqual(self.metrics.snapshot()["counters"],
+                         {'delivery_fee_errors_total{error="Fee policy does not exist."}': 2})
+
+    def test_collect_sums_workers(self):
+        """The snapshots flushed by the other workers should be summed with the metrics of this process.
+        """
+        self.metrics.increment('delivery_fee_requests_total{endpoint="index"}', 2)
+        other_worker = {"counters": {'delivery_fee_requests_total{endpoint="index"}': 3,
+                                     'delivery_fee_requests_total{endpoint="batch"}': 1},
+                        "histograms": {}}
+        with open(self.metrics.snapshot_path(os.getpid() + 1), "w") as snapshot_file:
+            json.dump(other_worker, snapshot_file)
+        # The own flushed snapshot is older than the live metrics, so it is not summed.
+        self.metrics.flush()
+        self.assertEqual(self.metrics.collect()["counters"], {'delivery_fee_requests_total{endpoint="index"}': 5,
+                                                              'delivery_fee_requests_total{endpoint="batch"}': 1})
+
+    def test_clear_metrics_directory(self):
+        self.metrics.flush()
+        clear_metrics_directory(self.directory.name)
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_render(self):
+        self.metrics.increment('delivery_fee_errors_total{error="Say \\"hi\\"."}')
+        self.metrics.observe('delivery_fee_request_seconds{endpoint="index"}', 0.0002)
+        lines = render_snapshot(self.metrics.snapshot()).splitlines()
+        self.assertIn("# TYPE delivery_fee_errors_total counter", lines)
+        self.assertIn('delivery_fee_errors_total{error="Say \\"hi\\"."} 1', lines)
+        self.assertIn("# TYPE delivery_fee_request_seconds histogram", lines)
+        self.assertIn('delivery_fee_request_seconds_bucket{endpoint="index",le="0.0001"} 0', lines)
+        self.assertIn('delivery_fee_request_seconds_bucket{endpoint="index",le="0.00025"} 1', lines)
+        self.assertIn('delivery_fee_request_seconds_bucket{endpoint="index",le="+Inf"} 1', lines)
+        self.assertIn('delivery_fee_request_seconds_count{endpoint="index"} 1', lines)
+
+    def tearDown(self):
+        self.directory.cleanup()
@@ -0,0 +1,89 @@
+import unittest
+import asyncio
+from unittest import mock
+from settings import settings
+from services.metrics import Metrics
+from services.micro_batcher import MicroBatcher
+import main
+
+
+class TestMicroBatcher(unittest.TestCase):
+
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+        self.batches = []
+
+    def process_batch(self, items: list) -> list:
+        self.batches.append(list(items))
+        return [item * 2 for item in items]
+
+    def test_batch_is_processed_when_full(self):
+        """With a long wait, the batches should be processed as soon as they have max_batch_size items.
+        """
+        async def submit_all():
+            micro_batcher = MicroBatcher(process_batch=self.process_batch, max_batch_size=3, max_wait=60)
+            return await asyncio.wait_for(asyncio.gather(*(micro_batcher.submit(item) for item in range(6))), 5)
+
+        self.assertEqual(asyncio.run(submit_all()), [0, 2, 4, 6, 8, 10])
+        self.assertEqual(self.batches, [[0, 1, 2], [3, 4, 5]])
+
+    def test_batch_is_processed_after_wait(self):
+        async def submit_all():
+            micro_batcher = MicroBatcher(process_batch=self.process_batch, max_batch_size=100, max_wait=0.001)
+            return await asyncio.gather(*(micro_batcher.submit(item) for item in range(5)))
+
+        self.assertEqual(asyncio.run(submit_all()), [0, 2, 4, 6, 8])
+        self.assertEqual(self.batches, [[0, 1, 2, 3, 4]])
+
+    def test_exception_is_raised_to_every_caller(self):
+        def fail(items):
+            raise ValueError("Batch failed.")
+
+        async def submit_all():
+            micro_batcher = MicroBatcher(process_batch=fail, max_batch_size=100, max_wait=0)
+            return await asyncio.gather(*(micro_batcher.submit(item) for item in range(3)), return_exceptions=True)
+
+        results = asyncio.run(submit_all())
+        self.assertEqual([str(result) for result in results], ["Batch failed."] * 3)
+
+    def test_cancelled_caller_does_not_fail_batch(self):
+        async def submit_all():
+            micro_batcher = MicroBatcher(process_batch=self.process_batch, max_batch_size=100, max_wait=0.001)
+            cancelled = asyncio.create_task(micro_batcher.submit(1))
+            other = asyncio.create_task(micro_batcher.submit(2))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            return await other
+
+        self.assertEqual(asyncio.run(submit_all()), 4)
+        self.assertEqual(self.batches, [[1, 2]])
+
+
+class TestApiMicroBatching(unittest.TestCase):
+
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+        self.delivery = {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}
+
+    def test_concurrent_requests_are_priced_together(self):
+        """Concurrent requests should get the same fees and errors as with the index endpoint,
+        and the valid orders should be priced in one batch.
+        """
+        deliveries = [self.delivery, {**self.delivery, "cart_value": 20000}, {**self.delivery, "cart_value": -1},
+                      {**self.delivery, "time": "2024-01-19T15:00:00Z"}]
+
+        async def request_all():
+            return await asyncio.gather(*(main.index_micro_batched(delivery) for delivery in deliveries),
+                                        return_exceptions=True)
+
+        micro_batcher = MicroBatcher(process_batch=main.price_micro_batch, max_batch_size=10, max_wait=0.001)
+        with mock.patch.object(main, "metrics", Metrics()), mock.patch.object(main, "micro_batcher", micro_batcher):
+            responses = asyncio.run(request_all())
+            lines = main.metrics.render().splitlines()
+        self.assertEqual([response.body for response in (responses[0], responses[1], responses[3])],
+                         [b'{"delivery_fee":710}', b'{"delivery_fee":0}', b'{"delivery_fee":852}'])
+        self.assertEqual(responses[2].name, "Cart value must be a positive integer.")
+        self.assertIn('delivery_fee_micro_batch_size_bucket{le="2"} 0', lines)
+        self.assertIn('delivery_fee_micro_batch_size_bucket{le="4"} 1', lines)
+        self.assertIn("delivery_fee_micro_batch_size_sum 3", lines)
+        self.assertIn('delivery_fee_requests_total{endpoint="index"} 4', lines)
@@ -0,0 +1,77 @@
+import unittest
+import os
+import tempfile
+from settings import settings
+from services.fee_simulation import FeeSimulation
+from services.order_store import OrderStore, is_order_store, write_order_store
+from services.vectorized_fee_calculator import VectorizedFeeCalculator
+import test_config
+
+ORDERS = [
+    {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"},
+    {"cart_value": -1, "delivery_distance": 1000, "number_of_items": 13, "time": "2024-01-19T15:00:00Z"},
+    "order",
+    {"cart_value": 1000, "delivery_distance": 1000, "number_of_items": 13, "time": "2024-01-19T15:00:00Z"},
+    {"cart_value": 2 ** 31, "delivery_distance": 1000, "number_of_items": 13, "time": "2024-01-19T15:00:00Z"},
+    {"cart_value": 20000, "delivery_distance": 1501, "number_of_items": 1, "time": "2024-01-21T23:59:59Z"},
+]
+
+
+class TestOrderStore(unittest.TestCase):
+
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "orders.store")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_valid_orders_are_stored_as_columns(self):
+        self.assertEqual(write_order_store(self.path, ORDERS), (3, 3))
+        order_store = OrderStore(self.path)
+        self.assertEqual(len(order_store), 3)
+        self.assertEqual(order_store.order_indexes.tolist(), [0, 3, 5])
+        self.assertEqual(order_store.cart_values.tolist(), [790, 1000, 20000])
+        self.assertEqual(order_store.delivery_distances.tolist(), [2235, 1000, 1501])
+        self.assertEqual(order_store.numbers_of_items.tolist(), [4, 13, 1])
+        self.assertEqual(order_store.weekdays.tolist(), [0, 4, 6])
+        self.assertEqual(order_store.seconds_of_week.tolist(), [46800, 4 * 86400 + 54000, 7 * 86400 - 1])
+        self.assertEqual(os.path.getsize(self.path), 16 + 5 * 4 * 3)
+
+    def test_parsed_times_match_vectorized_calculator(self):
+        write_order_store(self.path, ORDERS)
+        weekdays, microseconds_of_day = VectorizedFeeCalculator().parse_times(
+            [ORDERS[index]["time"] for index in (0, 3, 5)])
+        order_store = OrderStore(self.path)
+        self.assertEqual(order_store.weekdays.tolist(), weekdays.tolist())
+        self.assertEqual(order_store.microseconds_of_day.tolist(), microseconds_of_day.tolist())
+
+    def test_simulation_from_store_gives_same_fees_as_from_orders(self):
+        write_order_store(self.path, ORDERS)
+        configs = {"current": test_config}
+        from_store = FeeSimulation.from_order_store(OrderStore(self.path)).calculate_fees(configs)
+        from_orders = FeeSimulation.from_orders(ORDERS).calculate_fees(configs)
+        self.assertEqual(from_store.tolist(), [[fee for index, fee in enumerate(from_orders[0].tolist())
+                                                if index != 2]])
+
+    def test_empty_store(self):
+        self.assertEqual(write_order_store(self.path, []), (0, 0))
+        order_store = OrderStore(self.path)
+        self.assertEqual(len(order_store), 0)
+        self.assertEqual(order_store.weekdays.tolist(), [])
+
+    def test_other_files_are_not_order_stores(self):
+        with open(self.path, "w") as orders_file:
+            orders_file.write('{"cart_value": 790}\n')
+        self.assertFalse(is_order_store(self.path))
+        with self.assertRaises(ValueError):
+            OrderStore(self.path)
+
+    def test_truncated_store_is_not_valid(self):
+        write_order_store(self.path, ORDERS)
+        with open(self.path, "r+b") as store_file:
+            store_file.truncate(30)
+        self.assertTrue(is_order_store(self.path))
+        with self.assertRaises(ValueError):
+            OrderStore(self.path)
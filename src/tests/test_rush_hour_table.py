@@ -0,0 +1,75 @@
+import unittest
+import random
+from datetime import datetime, time, timedelta
+from settings import settings
+from services.fee_calculator import FeeCalculator
+from services.rush_hour_table import RushHourTable, compile_rush_hour_table
+from config import RushHours
+
+
+class TestRushHourTable(unittest.TestCase):
+
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+        self.calculator = FeeCalculator()
+
+    def assert_same_multipliers(self, rush_hours: list):
+        """The table should give the same multiplier as FeeCalculator on every second where
+        a rush hour starts or ends, and on the seconds next to them.
+        """
+        table = RushHourTable(rush_hours)
+        monday = datetime(2024, 1, 15)
+        seconds = {0, 86399}
+        for rush_hour in rush_hours:
+            for time_of_day in (rush_hour.start, rush_hour.end):
+                second = time_of_day.hour * 3600 + time_of_day.minute * 60 + time_of_day.second
+                seconds.update(second + offset for offset in (-1, 0, 1, 2) if 0 <= second + offset < 86400)
+        for weekday in range(7):
+            for second in sorted(seconds):
+                order_time = (monday + timedelta(days=weekday, seconds=second)).strftime("%Y-%m-%dT%H:%M:%SZ")
+                expected = self.calculator.calculate_rush_hour_surcharge_multiplier(time=order_time, rush_hours=rush_hours)
+                self.assertEqual(table.multiplier(weekday, second), expected, order_time)
+
+    def test_no_rush_hours(self):
+        table = RushHourTable([])
+        self.assertEqual(table.breakpoints, ((0,),) * 7)
+        self.assertEqual(table.multiplier(4, 54001), 1.0)
+
+    def test_single_rush_hour(self):
+        self.assert_same_multipliers([RushHours(day=4, start=time(15, 00, 00), end=time(19, 00, 00), fee=1.2)])
+
+    def test_overlapping_rush_hours(self):
+        self.assert_same_multipliers([
+            RushHours(day=4, start=time(15, 00, 00), end=time(19, 00, 00), fee=1.2),
+            RushHours(day=4, start=time(18, 00, 00), end=time(20, 00, 00), fee=1.5),
+            RushHours(day=4, start=time(19, 00, 00), end=time(19, 00, 1), fee=1.1),
+            RushHours(day=0, start=time(9, 00, 00), end=time(12, 00, 00), fee=0.5),
+            RushHours(day=6, start=time(0, 00, 00), end=time(23, 59, 59), fee=1.35),
+        ])
+
+    def test_rush_hours_with_microseconds(self):
+        self.assert_same_multipliers([
+            RushHours(day=2, start=time(8, 00, 00, 500), end=time(9, 00, 00, 500), fee=1.2),
+        ])
+
+    def test_many_random_rush_hours(self):
+        generator = random.Random(2024)
+        rush_hours = []
+        for _ in range(40):
+            start = generator.randrange(0, 86399)
+            end = generator.randrange(start + 1, 86400)
+            rush_hours.append(RushHours(day=generator.randrange(7),
+                                        start=time(start // 3600, start // 60 % 60, start % 60),
+                                        end=time(end // 3600, end // 60 % 60, end % 60),
+                                        fee=generator.choice([0.5, 1.1, 1.15, 1.2, 1.25, 1.5, 2.0])))
+        self.assert_same_multipliers(rush_hours)
+
+    def test_same_rush_hours_share_table(self):
+        """Policies with equal rush hours should get the same compiled table.
+        """
+        rush_hours = [RushHours(day=4, start=time(15, 00, 00), end=time(19, 00, 00), fee=1.2)]
+        table = compile_rush_hour_table(rush_hours)
+        self.assertIs(compile_rush_hour_table(
+            [RushHours(day=4, start=time(15, 00, 00), end=time(19, 00, 00), fee=1.2)]), table)
+        self.assertIsNot(compile_rush_hour_table(
+            [RushHours(day=4, start=time(15, 00, 00), end=time(19, 00, 00), fee=1.5)]), table)
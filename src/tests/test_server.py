@@ -0,0 +1,89 @@
+import unittest
+import io
+import os
+import socket
+import tempfile
+from contextlib import redirect_stdout
+from unittest import mock
+from settings import settings
+import server
+
+
+class TestServer(unittest.TestCase):
+
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+        self.original_workers = settings.WORKERS
+
+    def test_worker_count_from_settings(self):
+        settings.WORKERS = 3
+        self.assertEqual(server.worker_count(), 3)
+
+    def test_worker_count_defaults_to_cpu_count(self):
+        settings.WORKERS = 0
+        with mock.patch("server.os.cpu_count", return_value=8):
+            self.assertEqual(server.worker_count(), 8)
+
+    def test_create_socket_reuse_port(self):
+        """With reuse_port, multiple sockets can be bound to the same port.
+        """
+        first_socket = server.create_socket(host="127.0.0.1", port=0, reuse_port=True)
+        port = first_socket.getsockname()[1]
+        second_socket = server.create_socket(host="127.0.0.1", port=port, reuse_port=True)
+        self.assertEqual(second_socket.getsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT), 1)
+        first_socket.close()
+        second_socket.close()
+
+    def test_invalid_config_does_not_start_workers(self):
+        with mock.patch("server.get_fee_policy", side_effect=server.InvalidConfigException(name="error")), \
+                mock.patch("server.uvicorn.Server") as uvicorn_server:
+            self.assertEqual(server.run(), 1)
+        uvicorn_server.assert_not_called()
+
+    def run_workers(self, serve) -> tuple:
+        """Runs the server with two forked workers that run serve instead of uvicorn.
+
+        Returns:
+            tuple: The exit code and the output of run.
+        """
+        settings.WORKERS = 2
+        settings.REUSE_PORT = True
+        with mock.patch("server.serve", serve), mock.patch("server.signal.signal"), \
+                redirect_stdout(io.StringIO()) as output:
+            exit_code = server.run()
+        settings.REUSE_PORT = False
+        return exit_code, output.getvalue()
+
+    def test_crashed_worker_is_restarted(self):
+        """A worker that crashes after it has run a while should be replaced, and the server should exit
+        cleanly when the workers stop.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            marker_path = os.path.join(directory, "crashed")
+
+            def serve(config, sock):
+                # The first worker to create the marker crashes, the others and the new worker stop cleanly.
+                try:
+                    os.close(os.open(marker_path, os.O_CREAT | os.O_EXCL))
+                except FileExistsError:
+                    os._exit(0)
+                os._exit(3)
+
+            with mock.patch("server.WORKER_MIN_UPTIME", 0):
+                exit_code, output = self.run_workers(serve)
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(output.count("crashed with the exit code 3, starting a new worker."), 1)
+
+    def test_worker_failing_on_start_stops_server(self):
+        """A worker that crashes right after it was started should not be restarted, and the exit code should be 1.
+        """
+        def serve(config, sock):
+            os._exit(3)
+
+        exit_code, output = self.run_workers(serve)
+        self.assertEqual(exit_code, 1)
+        self.assertIn("failed with the exit code 3.", output)
+        self.assertNotIn("starting a new worker", output)
+
+    def tearDown(self):
+        settings.WORKERS = self.original_workers
@@ -0,0 +1,23 @@
+import unittest
+from settings import settings
+from benchmarks.startup import UNWANTED_MODULES, check_budget, measure_import
+
+
+class TestStartup(unittest.TestCase):
+
+    def setUp(self):
+        settings.ENVIRONMENT = 'test'
+
+    def test_import_is_within_budget(self):
+        """Importing main in production should stay under the import time and module count budgets,
+        and should not load modules that are only needed by tests, the server process or bulk jobs.
+        """
+        result = measure_import(environment="dev")
+        self.assertEqual(check_budget(result["seconds"], result["modules"]), [])
+        self.assertIn("config", result["modules"])
+
+    def test_check_budget(self):
+        self.assertEqual(check_budget(0.1, ["main"]), [])
+        problems = check_budget(100, ["main", UNWANTED_MODULES[0]])
+        self.assertEqual(len(problems), 2)
+        self.assertIn(UNWANTED_MODULES[0], problems[1])
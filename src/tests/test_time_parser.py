@@ -0,0 +1,57 @@
+import unittest
+from datetime import time
+from services.time_parser import parse_time, seconds_of_day
+
+
+class TestTimeParser(unittest.TestCase):
+
+    def test_parse_time_valid(self):
+        """2024-01-19 is a Friday, 15:00:01 is 54001 seconds after midnight.
+        """
+        self.assertEqual(parse_time("2024-01-19T15:00:01Z"), (4, 54001))
+
+    def test_parse_time_leap_day(self):
+        self.assertEqual(parse_time("2024-02-29T00:00:00Z"), (3, 0))
+
+    def test_parse_time_end_of_day(self):
+        self.assertEqual(parse_time("2024-01-21T23:59:59Z"), (6, 86399))
+
+    def test_parse_time_not_str(self):
+        self.assertEqual(parse_time(20240115130000), None)
+
+    def test_parse_time_not_iso_format(self):
+        self.assertEqual(parse_time("2024-01-01 12:00:00"), None)
+
+    def test_parse_time_not_zero_padded(self):
+        self.assertEqual(parse_time("2024-1-5T1:0:0Z"), None)
+
+    def test_parse_time_lowercase_suffix(self):
+        self.assertEqual(parse_time("2024-01-15T13:00:00z"), None)
+
+    def test_parse_time_trailing_characters(self):
+        self.assertEqual(parse_time("2024-01-15T13:00:00Z\n"), None)
+
+    def test_parse_time_non_ascii_digits(self):
+        self.assertEqual(parse_time("٢٠٢٤-01-15T13:00:00Z"), None)
+
+    def test_parse_time_month_does_not_exist(self):
+        self.assertEqual(parse_time("2024-13-15T13:00:00Z"), None)
+
+    def test_parse_time_date_does_not_exist(self):
+        self.assertEqual(parse_time("2023-02-29T13:00:00Z"), None)
+
+    def test_parse_time_hour_does_not_exist(self):
+        self.assertEqual(parse_time("2024-01-15T24:00:00Z"), None)
+
+    def test_parse_time_second_does_not_exist(self):
+        self.assertEqual(parse_time("2024-01-15T13:00:60Z"), None)
+
+    def test_parse_time_year_zero(self):
+        self.assertEqual(parse_time("0000-01-15T13:00:00Z"), None)
+
+    def test_seconds_of_day(self):
+        self.assertEqual(seconds_of_day(time(15, 0, 1, 500)), 54001)
+
+    def test_seconds_of_day_round_up(self):
+        self.assertEqual(seconds_of_day(time(15, 0, 1, 500), round_up=True), 54002)
+        self.assertEqual(seconds_of_day(time(15, 0, 1), round_up=True), 54001)
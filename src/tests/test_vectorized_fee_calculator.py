@@ -0,0 +1,67 @@
+import unittest
+import itertools
+from datetime import time
+import numpy as np
+from settings import settings
+from services.fee_calculator import FeeCalculator
+from services.vectorized_fee_calculator import VectorizedFeeCalculator
+from config import RushHours
+from tests.configs import copy_config
+
+
+class TestVectorizedFeeCalculator(unittest.TestCase):
+
+    def setUp(self):
+        """The vectorized results are compared to FeeCalculator with the same orders,
+        covering the edges of every fee component and of the rush hours.
+        """
+        settings.ENVIRONMENT = 'test'
+        self.calculator = FeeCalculator()
+        self.vectorized_calculator = VectorizedFeeCalculator()
+        cart_values = [0, 1, 890, 999, 1000, 1001, 19999, 20000, 20001]
+        delivery_distances = [0, 499, 500, 999, 1000, 1001, 1499, 1500, 1501, 2235, 50000]
+        numbers_of_items = [1, 4, 5, 10, 12, 13, 14, 100]
+        times = ["2024-01-15T13:00:00Z", "2024-01-19T14:59:59Z", "2024-01-19T15:00:00Z", "2024-01-19T17:00:00Z",
+                 "2024-01-19T19:00:00Z", "2024-01-19T19:00:01Z", "2024-01-29T11:00:00Z", "2024-01-21T23:59:59Z"]
+        self.orders = list(itertools.product(cart_values, delivery_distances, numbers_of_items, times))
+
+    def assert_same_fees(self):
+        cart_values, delivery_distances, numbers_of_items, times = zip(*self.orders)
+        fees = self.vectorized_calculator.calculate_delivery_fees(cart_values=cart_values,
+                                                                  delivery_distances=delivery_distances,
+                                                                  numbers_of_items=numbers_of_items,
+                                                                  times=times)
+        expected_fees = [self.calculator.calculate_delivery_fee(*order) for order in self.orders]
+        self.assertEqual(fees.tolist(), expected_fees)
+
+    def test_fees_equal_to_fee_calculator(self):
+        self.assert_same_fees()
+
+    def test_fees_equal_to_fee_calculator_multiple_rush_hours(self):
+        """Overlapping rush hours and multipliers that are not exact floats
+        should give the same results as FeeCalculator.
+        """
+        multiple_rush_hours_config = copy_config()
+        multiple_rush_hours_config.RUSH_HOURS = [
+            RushHours(day=4, start=time(15, 00, 00), end=time(19, 00, 00), fee=1.2),
+            RushHours(day=0, start=time(9, 00, 00), end=time(12, 00, 00), fee=0.5),
+            RushHours(day=4, start=time(16, 00, 00), end=time(20, 00, 00), fee=1.1),
+            RushHours(day=4, start=time(17, 00, 00), end=time(23, 00, 00), fee=1.15),
+            RushHours(day=6, start=time(0, 00, 00), end=time(23, 59, 59), fee=1.35),
+        ]
+        self.calculator.config = multiple_rush_hours_config
+        self.vectorized_calculator.config = multiple_rush_hours_config
+        self.assert_same_fees()
+
+    def test_datetime64_times(self):
+        """Times can also be given as datetime64 values.
+        """
+        fees = self.vectorized_calculator.calculate_delivery_fees(
+            cart_values=[1200], delivery_distances=[2235], numbers_of_items=[4],
+            times=np.array(["2024-01-19T15:00:01"], dtype="datetime64[s]"))
+        self.assertEqual(fees.tolist(), [600])
+
+    def test_empty_columns(self):
+        fees = self.vectorized_calculator.calculate_delivery_fees(cart_values=[], delivery_distances=[],
+                                                                  numbers_of_items=[], times=[])
+        self.assertEqual(fees.tolist(), [])